@@ -3,6 +3,8 @@ Commission schemes for different brokers and instrument types.
 Supports both JPY and Standard pairs with proper P&L calculation.
 """
 import backtrader as bt
+import numpy as np
+import pandas as pd
 
 
 class DarwinexZeroCommission(bt.CommInfoBase):
@@ -36,6 +38,15 @@ class DarwinexZeroCommission(bt.CommInfoBase):
     total_commission = 0.0
     total_lots = 0.0
 
+    def __init__(self):
+        super().__init__()
+        # Params are fixed for the run: JPY pairs scale P&L by jpy_rate and
+        # convert to USD by dividing by the new price, standard pairs are
+        # already in USD
+        self._pnl_scale = self.p.jpy_rate if self.p.is_jpy_pair else 1.0
+        self._pnl_in_quote = bool(self.p.is_jpy_pair)
+        self._cash_adjusted = not self._stocklike
+
     def _getcommission(self, size, price, pseudoexec):
         """
         Return commission based on lot size.
@@ -66,30 +77,23 @@ class DarwinexZeroCommission(bt.CommInfoBase):
         we multiply P&L by 150 to compensate and get correct USD P&L.
         
         This is an EXACT replica of the original ForexCommission class
-        from sunrise_ogle_eurjpy_pro.py (lines 235-248).
+        from sunrise_ogle_eurjpy_pro.py (lines 235-248), with the JPY
+        branch folded into factors computed in __init__ (scale 1.0 and no
+        conversion for standard pairs).
         """
-        if self.p.is_jpy_pair:
-            # JPY pairs: compensate for size division
-            pnl_jpy = size * self.p.jpy_rate * (newprice - price)
-            if newprice > 0:
-                pnl_usd = pnl_jpy / newprice
-                return pnl_usd
-            return pnl_jpy
-        else:
-            # Standard pairs: direct USD P&L
-            return size * (newprice - price)
+        pnl = size * self._pnl_scale * (newprice - price)
+        if self._pnl_in_quote and newprice > 0:
+            return pnl / newprice
+        return pnl
 
     def cashadjust(self, size, price, newprice):
         """Adjust cash for non-stocklike instruments (forex)."""
-        if not self._stocklike:
-            if self.p.is_jpy_pair:
-                # Same compensation for cash adjustment
-                pnl_jpy = size * self.p.jpy_rate * (newprice - price)
-                if newprice > 0:
-                    return pnl_jpy / newprice
-                return pnl_jpy
-            else:
-                return size * (newprice - price)
+        if self._cash_adjusted:
+            # Same compensation as profitandloss
+            pnl = size * self._pnl_scale * (newprice - price)
+            if self._pnl_in_quote and newprice > 0:
+                return pnl / newprice
+            return pnl
         return 0.0
 
 # Alias for backward compatibility
@@ -219,10 +223,137 @@ class CFDIndexCommission(bt.CommInfoBase):
         return 0.0
 
 
+# =============================================================================
+# FOREX CSV DATA FEED - One-shot vectorized parse (Darwinex intraday CSV)
+# =============================================================================
+class ForexCSVData(bt.feeds.GenericCSVData):
+    """
+    Drop-in replacement for GenericCSVData on intraday Date,Time,OHLCV files.
+    
+    GenericCSVData splits and strptime()s every line in Python while loading.
+    This feed parses the whole file once with pandas (C parser, exact
+    round-trip floats), converts Date+Time to backtrader float dates with
+    the same formula as bt.date2num in one vectorized pass, and _load()
+    only copies the pre-parsed row into the lines.
+    
+    Accepts the same kwargs as GenericCSVData (column indices, dtformat,
+    tmformat, fromdate/todate, timeframe/compression). Daily timeframes or
+    a tz param fall back to the standard line-by-line parser, whose
+    session-end handling this fast path does not replicate.
+    
+    NOTE: Date filtering is still handled by Backtrader internally.
+    """
+    
+    def _use_fast_path(self):
+        return (
+            self.p.timeframe < bt.TimeFrame.Days
+            and self.p.tz is None
+            and self.p.time >= 0
+            and isinstance(self.p.dataname, str)
+            and isinstance(self.p.dtformat, str)
+            and isinstance(self.p.tmformat, str)
+        )
+
+    def _parse_rows(self):
+        return _parse_intraday_csv(
+            self.p.dataname,
+            bool(self.p.headers),
+            self.p.separator,
+            self.p.datetime, self.p.time,
+            self.p.open, self.p.high, self.p.low, self.p.close,
+            self.p.volume, self.p.openinterest,
+            f'{self.p.dtformat} {self.p.tmformat}',
+            self.p.nullvalue,
+        )
+
+    def start(self):
+        self._fast = self._use_fast_path()
+        if not self._fast:
+            super().start()
+            return
+        # Skip CSVDataBase.start (no file handle needed)
+        bt.feed.DataBase.start(self)
+        self._rows = self._parse_rows()
+        self._row_idx = 0
+
+    def preload(self):
+        if not self._fast:
+            return super().preload()
+        # CSVDataBase.preload() without closing the (never opened) file
+        while self.load():
+            pass
+        self._last()
+        self.home()
+        self._rows = []  # Preloaded into the lines, drop the parsed copy
+
+    def _load(self):
+        if not self._fast:
+            return super()._load()
+        if self._row_idx >= len(self._rows):
+            return False
+        dtnum, o, h, l, c, v, oi = self._rows[self._row_idx]
+        self._row_idx += 1
+        lines = self.lines
+        lines.datetime[0] = dtnum
+        lines.open[0] = o
+        lines.high[0] = h
+        lines.low[0] = l
+        lines.close[0] = c
+        lines.volume[0] = v
+        lines.openinterest[0] = oi
+        return True
+
+
+def _parse_intraday_csv(path, headers, separator, dt_col, tm_col,
+                        open_col, high_col, low_col, close_col, vol_col, oi_col,
+                        dt_format, nullvalue):
+    """
+    Parse a Date,Time,OHLCV CSV into (dtnum, o, h, l, c, v, oi) row tuples.
+    
+    Missing columns (index < 0) and empty fields become nullvalue, as in
+    GenericCSVData.
+    """
+    df = pd.read_csv(
+        path,
+        sep=separator,
+        header=None,
+        skiprows=1 if headers else 0,
+        dtype={dt_col: str, tm_col: str},
+        float_precision='round_trip',  # same values as float(token)
+    )
+    stamps = pd.to_datetime(df[dt_col] + ' ' + df[tm_col], format=dt_format)
+    
+    # bt.date2num: ordinal + (hour/24 + minute/1440 + second/86400), same
+    # operation order so every bar gets the identical float
+    secs = stamps.to_numpy(dtype='datetime64[s]').astype(np.int64)
+    day_secs = secs % 86400
+    ordinal = (secs // 86400 + 719163).astype(np.float64)
+    dtnum = ordinal + (
+        (day_secs // 3600) / 24.0
+        + (day_secs % 3600 // 60) / 1440.0
+        + (day_secs % 60) / 86400.0
+    )
+    
+    def column(idx):
+        if idx is None or idx < 0:
+            return np.full(len(df), nullvalue, dtype=np.float64)
+        return df[idx].to_numpy(dtype=np.float64, na_value=nullvalue)
+    
+    return list(zip(
+        dtnum.tolist(),
+        column(open_col).tolist(),
+        column(high_col).tolist(),
+        column(low_col).tolist(),
+        column(close_col).tolist(),
+        column(vol_col).tolist(),
+        column(oi_col).tolist(),
+    ))
+
+
 # =============================================================================
 # ETF CSV DATA FEED - Fixes Date/Time separate columns issue
 # =============================================================================
-class ETFCSVData(bt.feeds.GenericCSVData):
+class ETFCSVData(ForexCSVData):
     """
     Custom CSV Data Feed for ETFs that correctly handles separate Date and Time columns.
     
@@ -234,11 +365,29 @@ class ETFCSVData(bt.feeds.GenericCSVData):
         Date,Time,Open,High,Low,Close,Volume
         20200102,14:30:00,286.30,286.70,286.30,286.56,670000
     
+    File paths load through the ForexCSVData one-shot pandas parse (fixed
+    columns, no strptime per line); _loadline is the line-by-line path for
+    other data sources.
+    
     NOTE: Date filtering is handled by Backtrader internally, NOT in _loadline.
     This ensures warmup bars are available for indicators.
     """
     from datetime import datetime as _datetime
     
+    def _use_fast_path(self):
+        # Columns and format are fixed here, whatever the timeframe param says
+        return isinstance(self.p.dataname, str)
+
+    def _parse_rows(self):
+        return _parse_intraday_csv(
+            self.p.dataname,
+            bool(self.p.headers),
+            self.p.separator,
+            0, 1, 2, 3, 4, 5, 6, -1,
+            '%Y%m%d %H:%M:%S',
+            0.0,  # Open interest is always 0.0
+        )
+    
     def _loadline(self, linetokens):
         # Parse Date (column 0) and Time (column 1) 
         dt_str = linetokens[0]  # '20200102'
@@ -262,4 +411,4 @@ class ETFCSVData(bt.feeds.GenericCSVData):
         self.lines.volume[0] = float(linetokens[6])
         self.lines.openinterest[0] = 0.0
         
-        return True
\ No newline at end of file
+        return True
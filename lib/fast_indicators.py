@@ -0,0 +1,508 @@
+"""
+Array indicators for precomputing a whole (preloaded) feed in one pass.
+
+Numerically identical to the Backtrader built-ins they replace, so a
+strategy can swap bt.ind.EMA / bt.ind.ATR / bt.ind.CCI for these without
+changing a single trade:
+- SMA windows are summed with an exact math.fsum equivalent (as bt does)
+- EMA / SMMA use bt's recursion prev * (1 - alpha) + x * alpha, seeded
+  with the SMA of the first `period` values
+- Values are NaN until the indicator's Backtrader minperiod is reached
+
+Kernels are JIT-compiled with Numba when it is installed; without it they
+run as plain Python (math.fsum for windows), i.e. roughly Backtrader speed.
+
+Kernels use cache=True, so compiled code is reused across processes
+(only the first run after a kernel change compiles).
+
+For unbounded live streams the Stream* classes carry the same recursions
+as O(1) per-bar state machines (running sums instead of fsum windows, so
+values agree with the array versions to rounding). They are plain Python:
+a live checker updates them once per closed bar, and Numba cannot cache
+jitclasses, so compiling them cost seconds at every process start:
+- StreamEMA: previous value and alpha
+- StreamATR: previous close and the Wilder-smoothed TR
+- StreamCCI: ring buffers of typical prices and absolute deviations plus
+  their running sums
+
+Usage:
+    from lib.fast_indicators import ema, atr, cci, emas_atr, is_preloaded, line_values
+
+    if is_preloaded(self.data):        # not when any feed is resampled
+        close = line_values(self.data.close)
+        ema_10 = ema(close, 10)      # ema_10[i] == bt.ind.EMA(period=10) at bar i
+        (ema_10, ema_20), atr_14 = emas_atr(high, low, close, (10, 20), 14)   # one pass
+
+    arrays = cached_indicators(data_path, key, lambda: {'ema_10': ema(close, 10)})
+
+    stream = StreamCCI(20)
+    value = stream.update(high, low, close)   # once per closed bar
+"""
+import hashlib
+import math
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+# =============================================================================
+# KERNELS
+# =============================================================================
+
+@njit(cache=True)
+def _fsum_exact(values):
+    """Correctly rounded sum, same algorithm and rounding as math.fsum."""
+    partials = np.empty(values.size + 1)
+    m = 0
+    for k in range(values.size):
+        x = values[k]
+        i = 0
+        for j in range(m):
+            y = partials[j]
+            if abs(x) < abs(y):
+                x, y = y, x
+            hi = x + y
+            lo = y - (hi - x)
+            if lo != 0.0:
+                partials[i] = lo
+                i += 1
+            x = hi
+        partials[i] = x
+        m = i + 1
+
+    hi = 0.0
+    if m > 0:
+        n = m - 1
+        hi = partials[n]
+        lo = 0.0
+        while n > 0:
+            x = hi
+            n -= 1
+            y = partials[n]
+            hi = x + y
+            yr = hi - x
+            lo = y - yr
+            if lo != 0.0:
+                break
+        # Round-half-even correction across the remaining partials
+        if n > 0 and ((lo < 0.0 and partials[n - 1] < 0.0) or (lo > 0.0 and partials[n - 1] > 0.0)):
+            y = lo * 2.0
+            x = hi + y
+            yr = x - hi
+            if y == yr:
+                hi = x
+    return hi
+
+
+# Inside JIT kernels use the compiled clone; in plain Python math.fsum is faster
+_fsum = _fsum_exact if NUMBA_AVAILABLE else math.fsum
+
+
+@njit(cache=True)
+def _sma(src, start, period):
+    """Simple moving average of src, whose first valid value is src[start]."""
+    out = np.full(src.size, np.nan)
+    for i in range(start + period - 1, src.size):
+        out[i] = _fsum(src[i - period + 1:i + 1]) / period
+    return out
+
+
+@njit(cache=True)
+def _smooth(src, start, period, alpha):
+    """Exponential smoothing seeded with the SMA of src[start:start + period]."""
+    out = np.full(src.size, np.nan)
+    seed = start + period - 1
+    if seed >= src.size:
+        return out
+    prev = _fsum(src[start:seed + 1]) / period
+    out[seed] = prev
+    alpha1 = 1.0 - alpha
+    for i in range(seed + 1, src.size):
+        prev = prev * alpha1 + src[i] * alpha
+        out[i] = prev
+    return out
+
+
+@njit(cache=True)
+def _ema_atr_sweep(close, high, low, ema_periods, atr_period):
+    """
+    Several EMAs of close plus the ATR in one pass over the bars.
+
+    Same seeds and recursions as _smooth (EMA from bar 0, ATR from the
+    first true range at bar 1), so every value matches ema() / atr().
+    """
+    n = close.size
+    k = ema_periods.size
+    emas = np.full((k, n), np.nan)
+    out_atr = np.full(n, np.nan)
+
+    # Seeds: SMA of the first period values of each series
+    prev = np.empty(k)
+    alpha = np.empty(k)
+    alpha1 = np.empty(k)
+    for j in range(k):
+        period = ema_periods[j]
+        alpha[j] = 2.0 / (1.0 + period)
+        alpha1[j] = 1.0 - alpha[j]
+        prev[j] = np.nan
+        if period - 1 < n:
+            prev[j] = _fsum(close[:period]) / period
+            emas[j, period - 1] = prev[j]
+    atr_prev = np.nan
+    atr_alpha = 1.0 / atr_period
+    atr_alpha1 = 1.0 - atr_alpha
+    if atr_period < n:
+        tr = np.empty(atr_period)
+        for i in range(1, atr_period + 1):
+            tr[i - 1] = max(high[i], close[i - 1]) - min(low[i], close[i - 1])
+        atr_prev = _fsum(tr) / atr_period
+        out_atr[atr_period] = atr_prev
+
+    # Single sweep: each bar's close/high/low is read once for all outputs
+    for i in range(1, n):
+        x = close[i]
+        for j in range(k):
+            if i >= ema_periods[j]:
+                prev[j] = prev[j] * alpha1[j] + x * alpha[j]
+                emas[j, i] = prev[j]
+        if i > atr_period:
+            tr_i = max(high[i], close[i - 1]) - min(low[i], close[i - 1])
+            atr_prev = atr_prev * atr_alpha1 + tr_i * atr_alpha
+            out_atr[i] = atr_prev
+    return emas, out_atr
+
+
+# =============================================================================
+# FEED ACCESS
+# =============================================================================
+
+def is_preloaded(data) -> bool:
+    """
+    Whether Cerebro preloaded the whole feed before the strategy's __init__.
+
+    Cerebro skips the preload when any feed is resampled or replayed
+    (base_timeframe_minutes / htf_data_minutes in run_backtest.py): the line
+    buffers are then still empty in __init__ and grow bar by bar, so there
+    is nothing to precompute over.
+    """
+    return len(data.close.array) > 0
+
+
+def line_values(line) -> np.ndarray:
+    """
+    Float64 copy of a preloaded line buffer.
+
+    A copy rather than np.asarray: a zero-copy view keeps the line's
+    array.array exporting its buffer, and Backtrader can no longer grow it.
+    """
+    return np.array(line.array, dtype=np.float64)
+
+
+# =============================================================================
+# INDICATORS
+# =============================================================================
+
+def ema(close: np.ndarray, period: int) -> np.ndarray:
+    """
+    Exponential moving average (bt.ind.EMA).
+
+    Args:
+        close: Price array (float64)
+        period: EMA period
+
+    Returns:
+        EMA array, NaN for the first period - 1 bars
+    """
+    return _smooth(close, 0, period, 2.0 / (1.0 + period))
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    """
+    Average True Range with Wilder smoothing (bt.ind.ATR).
+
+    Args:
+        high, low, close: Price arrays (float64, same length)
+        period: ATR period
+
+    Returns:
+        ATR array, NaN for the first period bars
+    """
+    tr = np.full(close.size, np.nan)
+    prev_close = close[:-1]
+    tr[1:] = np.maximum(high[1:], prev_close) - np.minimum(low[1:], prev_close)
+    return _smooth(tr, 1, period, 1.0 / period)
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """
+    True range of every bar, for the DataFrame-based live checkers.
+
+    Same values as pd.concat([hl, hc, lc], axis=1).max(axis=1) over
+    close.shift(1): the first bar is high - low, and a NaN candidate is
+    skipped (np.fmax) rather than propagated.
+
+    Args:
+        high, low, close: Price arrays (float64, same length)
+
+    Returns:
+        True range array (new, safe to modify)
+    """
+    prev_close = close[:-1]
+    tr = high - low
+    tr[1:] = np.fmax(
+        np.fmax(tr[1:], np.abs(high[1:] - prev_close)),
+        np.abs(low[1:] - prev_close),
+    )
+    return tr
+
+
+def emas_atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, ema_periods,
+             atr_period: int):
+    """
+    Several EMAs of close and the ATR in one fused pass.
+
+    Equivalent to [ema(close, p) for p in ema_periods] plus
+    atr(high, low, close, atr_period), but reads the price arrays once
+    instead of once per indicator.
+
+    Args:
+        high, low, close: Price arrays (float64, same length)
+        ema_periods: Sequence of EMA periods
+        atr_period: ATR period
+
+    Returns:
+        (EMA rows, one per period, as a 2-D array; ATR array)
+    """
+    return _ema_atr_sweep(close, high, low, np.asarray(ema_periods, dtype=np.int64), atr_period)
+
+
+def cci(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int,
+        factor: float = 0.015) -> np.ndarray:
+    """
+    Commodity Channel Index (bt.ind.CCI).
+
+    Mean deviation follows Backtrader: SMA of |tp - SMA(tp)| over the same
+    period, so the first value appears at bar 2 * period - 2.
+
+    Args:
+        high, low, close: Price arrays (float64, same length)
+        period: CCI period
+        factor: Lambert constant (0.015)
+
+    Returns:
+        CCI array, NaN during warm-up (inf/NaN on zero mean deviation)
+    """
+    tp = (high + low + close) / 3.0
+    dev = tp - _sma(tp, 0, period)
+    meandev = _sma(np.abs(dev), period - 1, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return dev / (factor * meandev)
+
+
+# =============================================================================
+# DISK CACHE
+# =============================================================================
+
+INDICATOR_CACHE_DIR = Path('temp_reports') / 'indicator_cache'
+_CACHE_VERSION = 1  # Bump when kernel output changes so stale files are ignored
+
+# In-process LRU on top of the disk cache: sweeps that build the same
+# strategy many times in one process skip even the .npz read
+_MEMORY_CACHE = OrderedDict()
+_MEMORY_CACHE_SIZE = 32
+
+
+def cached_indicators(data_path, key, compute):
+    """
+    Load indicator arrays from the in-process or on-disk cache, computing
+    them on a miss.
+
+    Sweeps rerun the same instrument with the same periods many times; the
+    arrays only depend on the source file and the key, so later runs just
+    read one .npz, or reuse the arrays a previous run in this process
+    already loaded.
+
+    Args:
+        data_path: Source CSV (path, mtime and size are part of the key),
+                   or None to always compute
+        key: Tuple with a stable repr identifying the computation
+             (periods, bar count, first/last bar)
+        compute: Callable returning a dict of name -> ndarray
+
+    Returns:
+        Dict of name -> ndarray (cached or freshly computed). The arrays
+        are shared with later runs, so they are marked read-only.
+    """
+    try:
+        stat = os.stat(data_path)
+    except (TypeError, OSError):
+        return compute()
+
+    ident = (_CACHE_VERSION, os.path.abspath(data_path), stat.st_mtime_ns, stat.st_size, key)
+    digest = hashlib.sha1(repr(ident).encode()).hexdigest()
+    cache_path = INDICATOR_CACHE_DIR / f'{digest}.npz'
+
+    arrays = _MEMORY_CACHE.get(digest)
+    if arrays is not None:
+        _MEMORY_CACHE.move_to_end(digest)
+        return arrays
+
+    try:
+        with np.load(cache_path) as cached:
+            arrays = {name: cached[name] for name in cached.files}
+    except Exception:
+        arrays = None  # Missing or unreadable -> recompute
+
+    if arrays is None:
+        arrays = compute()
+        try:
+            INDICATOR_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            # Write under a per-process name, then rename: parallel sweeps never
+            # read a half-written file
+            tmp_path = INDICATOR_CACHE_DIR / f'{digest}.{os.getpid()}.tmp.npz'
+            np.savez(tmp_path, **arrays)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+
+    # Shared with later runs: a stray in-place write must not leak between them
+    for arr in arrays.values():
+        arr.flags.writeable = False
+    _MEMORY_CACHE[digest] = arrays
+    if len(_MEMORY_CACHE) > _MEMORY_CACHE_SIZE:
+        _MEMORY_CACHE.popitem(last=False)
+    return arrays
+
+
+# =============================================================================
+# STREAMING INDICATORS
+# =============================================================================
+
+class StreamEMA:
+    """
+    Streaming EMA (bt.ind.EMA), one update per closed bar.
+
+    Attributes:
+        value: Current EMA, NaN until period bars have been seen
+        prev: EMA of the previous bar (for slope checks)
+    """
+    __slots__ = ('period', 'alpha', 'count', 'seed_sum', 'value', 'prev')
+
+    def __init__(self, period):
+        self.period = period
+        self.alpha = 2.0 / (1.0 + period)
+        self.count = 0
+        self.seed_sum = 0.0
+        self.value = math.nan
+        self.prev = math.nan
+
+    def update(self, close):
+        self.prev = self.value
+        self.count += 1
+        if self.count < self.period:
+            self.seed_sum += close
+        elif self.count == self.period:
+            self.value = (self.seed_sum + close) / self.period
+        else:
+            self.value = self.value * (1.0 - self.alpha) + close * self.alpha
+        return self.value
+
+
+class StreamATR:
+    """
+    Streaming ATR with Wilder smoothing (bt.ind.ATR).
+
+    The first bar only provides the previous close, so value stays NaN
+    for the first period bars, as in the array version.
+    """
+    __slots__ = ('period', 'count', 'seed_sum', 'prev_close', 'value')
+
+    def __init__(self, period):
+        self.period = period
+        self.count = 0
+        self.seed_sum = 0.0
+        self.prev_close = math.nan
+        self.value = math.nan
+
+    def update(self, high, low, close):
+        prev_close = self.prev_close
+        self.prev_close = close
+        if math.isnan(prev_close):
+            return self.value
+        tr = max(high, prev_close) - min(low, prev_close)
+        self.count += 1
+        if self.count < self.period:
+            self.seed_sum += tr
+        elif self.count == self.period:
+            self.value = (self.seed_sum + tr) / self.period
+        else:
+            alpha = 1.0 / self.period
+            self.value = self.value * (1.0 - alpha) + tr * alpha
+        return self.value
+
+
+class StreamCCI:
+    """
+    Streaming CCI (bt.ind.CCI).
+
+    Both the typical-price mean and Backtrader's mean deviation (SMA of
+    |tp - SMA(tp)|) come from ring buffers with running sums. The sums are
+    re-added from the rings once per lap so rounding drift stays bounded.
+    """
+    __slots__ = ('period', 'factor', 'count', 'idx', 'tp_ring', 'tp_sum',
+                 'dev_ring', 'dev_sum', 'value')
+
+    def __init__(self, period, factor=0.015):
+        self.period = period
+        self.factor = factor
+        self.count = 0
+        self.idx = 0
+        self.tp_ring = [0.0] * period
+        self.tp_sum = 0.0
+        self.dev_ring = [0.0] * period
+        self.dev_sum = 0.0
+        self.value = math.nan
+
+    def update(self, high, low, close):
+        tp = (high + low + close) / 3.0
+        idx = self.idx
+        self.tp_sum += tp - self.tp_ring[idx]
+        self.tp_ring[idx] = tp
+        self.count += 1
+
+        dev = math.nan
+        absdev = 0.0
+        if self.count >= self.period:
+            dev = tp - self.tp_sum / self.period
+            absdev = abs(dev)
+        self.dev_sum += absdev - self.dev_ring[idx]
+        self.dev_ring[idx] = absdev
+
+        self.idx = idx + 1
+        if self.idx == self.period:
+            self.idx = 0
+            self.tp_sum = sum(self.tp_ring)
+            self.dev_sum = sum(self.dev_ring)
+
+        if self.count >= 2 * self.period - 1:
+            meandev = self.dev_sum / self.period
+            if meandev != 0.0:
+                self.value = dev / (self.factor * meandev)
+            elif dev != 0.0:
+                self.value = math.inf if dev > 0.0 else -math.inf
+            else:
+                self.value = math.nan
+        return self.value
@@ -67,6 +67,41 @@ def check_day_filter(dt: datetime, allowed_days: List[int], enabled: bool = True
     return dt.weekday() in allowed_days
 
 
+def hour_bitmask(allowed_hours: List[int], enabled: bool = True) -> int:
+    """
+    Precompute check_time_filter as a 24-bit mask (bit h set = hour h allowed).
+    
+    Hot loops then test an hour with one shift instead of a list scan:
+        (mask >> dt.hour) & 1
+    
+    Args:
+        allowed_hours: List of allowed hours (0-23)
+        enabled: If False, every hour is allowed
+    
+    Returns:
+        Bitmask with the same answers as check_time_filter
+    """
+    if not enabled or not allowed_hours:
+        return (1 << 24) - 1
+    return sum(1 << h for h in set(allowed_hours))
+
+
+def day_bitmask(allowed_days: List[int], enabled: bool = True) -> int:
+    """
+    Precompute check_day_filter as a 7-bit mask (bit d set = weekday d allowed).
+    
+    Args:
+        allowed_days: List of allowed weekdays (0=Monday, 6=Sunday)
+        enabled: If False, every day is allowed
+    
+    Returns:
+        Bitmask with the same answers as check_day_filter
+    """
+    if not enabled or not allowed_days:
+        return (1 << 7) - 1
+    return sum(1 << d for d in set(allowed_days))
+
+
 # =============================================================================
 # ATR FILTERS
 # =============================================================================
@@ -33,6 +33,7 @@ import pandas as pd
 import numpy as np
 
 from .base_checker import BaseChecker, Signal, SignalDirection
+from lib.fast_indicators import true_range
 
 
 class ALTAIRChecker(BaseChecker):
@@ -217,17 +218,14 @@ class ALTAIRChecker(BaseChecker):
     @staticmethod
     def _atr_wilder(df: pd.DataFrame, period: int) -> pd.Series:
         """ATR using Wilder's RMA (matches backtrader bt.ind.ATR)."""
-        high = df["high"]
-        low = df["low"]
-        close = df["close"]
+        high = df["high"].to_numpy(dtype=float)
+        low = df["low"].to_numpy(dtype=float)
+        close = df["close"].to_numpy(dtype=float)
 
-        tr1 = high - low
-        tr2 = (high - close.shift(1)).abs()
-        tr3 = (low - close.shift(1)).abs()
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+        tr = true_range(high, low, close)
 
         # Wilder RMA: alpha = 1/period
-        return tr.ewm(alpha=1.0 / period, adjust=False).mean()
+        return pd.Series(tr, index=df.index).ewm(alpha=1.0 / period, adjust=False).mean()
 
     def _compute_dtosc(self, df: pd.DataFrame):
         """Compute DT Oscillator (fast + slow lines).
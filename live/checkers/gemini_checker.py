@@ -26,6 +26,7 @@ import numpy as np
 
 from .base_checker import BaseChecker, Signal, SignalDirection
 from lib.filters import check_time_filter, check_day_filter, check_sl_pips_filter, check_atr_filter
+from lib.fast_indicators import true_range
 from live.timezone import broker_to_utc
 
 
@@ -182,20 +183,17 @@ class GEMINIChecker(BaseChecker):
     
     def _calculate_atr(self, df: pd.DataFrame) -> float:
         """Calculate ATR using Wilder's RMA (matches backtrader bt.ind.ATR)."""
-        high = df["high"]
-        low = df["low"]
-        close = df["close"]
+        high = df["high"].to_numpy(dtype=float)
+        low = df["low"].to_numpy(dtype=float)
+        close = df["close"].to_numpy(dtype=float)
         
         if len(close) < 2:
             return 0.0
         
-        tr1 = high - low
-        tr2 = abs(high - close.shift(1))
-        tr3 = abs(low - close.shift(1))
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+        tr = true_range(high, low, close)
         
         # Wilder's RMA (matches backtrader bt.ind.ATR default SmoothedMovingAverage)
-        atr_series = tr.ewm(alpha=1.0 / self.atr_length, adjust=False).mean()
+        atr_series = pd.Series(tr, index=df.index).ewm(alpha=1.0 / self.atr_length, adjust=False).mean()
         return float(atr_series.iloc[-1]) if len(atr_series) > 0 else 0.0
     
     def _calculate_roc(self, prices: list, period: int) -> float:
@@ -17,6 +17,7 @@ from enum import Enum
 import pandas as pd
 
 from .base_checker import BaseChecker, Signal, SignalDirection
+from lib.fast_indicators import StreamEMA, StreamATR, StreamCCI
 from lib.filters import check_time_filter, check_day_filter, check_sl_pips_filter, check_atr_filter
 from live.timezone import broker_to_utc
 
@@ -66,6 +67,9 @@ class KOIChecker(BaseChecker):
             params.get("ema_5_period", 120),
         ]
         
+        # Streaming indicators, fed one closed bar per check
+        self._reset_indicators()
+        
         self.logger.info(f"[{self.config_name}] Checker initialized")
     
     def reset_state(self) -> None:
@@ -86,56 +90,44 @@ class KOIChecker(BaseChecker):
             "current_bar": self.current_bar_index,
         }
     
-    def _calculate_emas(self, df: pd.DataFrame) -> Dict[str, pd.Series]:
-        """Calculate all 5 EMAs."""
-        close = df["close"]
-        result = {}
-        for i, period in enumerate(self.ema_periods, 1):
-            result[f"ema_{i}"] = close.ewm(span=period, adjust=False).mean()
-        return result
+    def _reset_indicators(self) -> None:
+        """Create fresh streaming indicators (backtrader semantics)."""
+        self._ema_streams = [StreamEMA(period) for period in self.ema_periods]
+        self._atr_stream = StreamATR(self.params.get("atr_length", 10))
+        self._cci_stream = StreamCCI(self.params.get("cci_period", 20), 0.015)
+        self._last_bar_time = None
     
-    def _calculate_atr(self, df: pd.DataFrame) -> pd.Series:
-        """Calculate ATR from DataFrame."""
-        high = df["high"]
-        low = df["low"]
-        close = df["close"]
-        
-        tr1 = high - low
-        tr2 = abs(high - close.shift(1))
-        tr3 = abs(low - close.shift(1))
+    def _update_indicators(self, df: pd.DataFrame) -> None:
+        """
+        Feed bars not seen yet into the streaming EMA/ATR/CCI.
         
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        atr_period = self.params.get("atr_length", 10)
-        # Wilder's RMA (matches backtrader bt.ind.ATR default SmoothedMovingAverage)
-        return tr.ewm(alpha=1.0 / atr_period, adjust=False).mean()
-    
-    def _calculate_cci(self, df: pd.DataFrame) -> pd.Series:
-        """Calculate CCI matching backtrader's implementation exactly.
-
-        Backtrader chain (cci.py + deviation.py):
-          tp = (H + L + C) / 3
-          tpmean = SMA(tp, period)
-          absdev = abs(tp - tpmean)          # per-bar rolling SMA used
-          meandev = SMA(absdev, period)       # SMA of absolute deviations
-          cci = (tp - tpmean) / (0.015 * meandev)
-
-        Previous implementation used Lambert's original formula
-        (window-mean for all elements) which differs from backtrader's
-        approach of using per-bar rolling SMA values.
+        Each call normally adds one closed bar, so indicator work per check
+        is O(1) instead of recomputing every series over the whole window.
+        The streams are rebuilt from the full window on the first call,
+        after a gap (last fed bar no longer in df) or when df has no time
+        column to align on.
         """
-        high = df["high"]
-        low = df["low"]
-        close = df["close"]
-
-        typical_price = (high + low + close) / 3
-        cci_period = self.params.get("cci_period", 20)
-
-        sma_tp = typical_price.rolling(window=cci_period).mean()
-        absdev = (typical_price - sma_tp).abs()
-        mean_dev = absdev.rolling(window=cci_period).mean()
-
-        cci = (typical_price - sma_tp) / (0.015 * mean_dev)
-        return cci
+        start = 0
+        if self._last_bar_time is not None and "time" in df.columns:
+            times = df["time"]
+            n_new = int((times > self._last_bar_time).sum())
+            if n_new < len(df) and times.iloc[-n_new - 1] == self._last_bar_time:
+                start = len(df) - n_new
+        if start == 0:
+            self._reset_indicators()
+        
+        high = df["high"].to_numpy(dtype=float)
+        low = df["low"].to_numpy(dtype=float)
+        close = df["close"].to_numpy(dtype=float)
+        for i in range(start, len(df)):
+            h, l, c = high[i], low[i], close[i]
+            for stream in self._ema_streams:
+                stream.update(c)
+            self._atr_stream.update(h, l, c)
+            self._cci_stream.update(h, l, c)
+        
+        if "time" in df.columns:
+            self._last_bar_time = df["time"].iloc[-1]
     
     def _check_bullish_engulfing(self, df: pd.DataFrame) -> bool:
         """
@@ -172,23 +164,16 @@ class KOIChecker(BaseChecker):
         
         return True
     
-    def _check_emas_ascending(self, emas: Dict[str, pd.Series]) -> tuple:
+    def _check_emas_ascending(self) -> tuple:
         """
         Check if all 5 EMAs are individually ascending.
         
         Each EMA's current value must be > its previous value.
         Returns: (is_valid, failed_ema_index or None)
         """
-        for i in range(1, 6):
-            ema_key = f"ema_{i}"
-            ema = emas.get(ema_key)
-            if ema is None or len(ema) < 2:
-                return False, i
-            
-            current = float(ema.iloc[-1])
-            previous = float(ema.iloc[-2])
-            
-            if current <= previous:
+        for i, ema in enumerate(self._ema_streams, 1):
+            # NaN (still warming up) fails the comparison below
+            if not ema.value > ema.prev:
                 return False, i
         
         return True, None
@@ -217,13 +202,11 @@ class KOIChecker(BaseChecker):
         if df is None or len(df) < min_bars:
             return self._create_no_signal("Insufficient data")
         
-        # Calculate indicators
-        emas = self._calculate_emas(df)
-        atr_series = self._calculate_atr(df)
-        cci_series = self._calculate_cci(df)
+        # Update streaming indicators with the new bar(s)
+        self._update_indicators(df)
         
-        current_atr = float(atr_series.iloc[-1])
-        current_cci = float(cci_series.iloc[-1])
+        current_atr = float(self._atr_stream.value)
+        current_cci = float(self._cci_stream.value)
         current_close = float(df["close"].iloc[-1])
         current_high = float(df["high"].iloc[-1])
         current_low = float(df["low"].iloc[-1])
@@ -274,7 +257,7 @@ class KOIChecker(BaseChecker):
                 return self._create_no_signal("No bullish engulfing")
             
             # Check 5 EMAs ascending
-            emas_valid, failed_ema = self._check_emas_ascending(emas)
+            emas_valid, failed_ema = self._check_emas_ascending()
             if not emas_valid:
                 ema_period = self.ema_periods[failed_ema - 1] if failed_ema else '?'
                 reason = f"EMAs not all ascending (EMA{failed_ema}={ema_period} failed)"
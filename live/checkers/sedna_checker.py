@@ -37,6 +37,7 @@ from lib.filters import (
     detect_pullback,
     check_pullback_breakout,
 )
+from lib.fast_indicators import true_range
 from live.timezone import broker_to_utc
 
 
@@ -152,18 +153,14 @@ class SEDNAChecker(BaseChecker):
     
     def _calculate_atr(self, df: pd.DataFrame) -> pd.Series:
         """Calculate ATR from DataFrame."""
-        high = df["high"]
-        low = df["low"]
-        close = df["close"]
+        high = df["high"].to_numpy(dtype=float)
+        low = df["low"].to_numpy(dtype=float)
+        close = df["close"].to_numpy(dtype=float)
         
-        tr1 = high - low
-        tr2 = abs(high - close.shift(1))
-        tr3 = abs(low - close.shift(1))
-        
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+        tr = true_range(high, low, close)
         atr_period = self.params.get("atr_length", 14)
         # Wilder's RMA (matches backtrader bt.ind.ATR default SmoothedMovingAverage)
-        return tr.ewm(alpha=1.0 / atr_period, adjust=False).mean()
+        return pd.Series(tr, index=df.index).ewm(alpha=1.0 / atr_period, adjust=False).mean()
     
     def _calculate_average_atr(self, atr_series: pd.Series) -> float:
         """Calculate average ATR over specified period."""
@@ -31,6 +31,7 @@ import pandas as pd
 import numpy as np
 
 from .base_checker import BaseChecker, Signal, SignalDirection
+from lib.fast_indicators import true_range
 
 
 class VEGAChecker(BaseChecker):
@@ -196,17 +197,14 @@ class VEGAChecker(BaseChecker):
         if len(df) < period + 1:
             return float("nan")
 
-        high = df["high"]
-        low = df["low"]
-        close = df["close"]
+        high = df["high"].to_numpy(dtype=float)
+        low = df["low"].to_numpy(dtype=float)
+        close = df["close"].to_numpy(dtype=float)
 
-        tr1 = high - low
-        tr2 = abs(high - close.shift(1))
-        tr3 = abs(low - close.shift(1))
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+        tr = true_range(high, low, close)
 
         # Wilder's RMA (alpha = 1/period)
-        atr_series = tr.ewm(alpha=1.0 / period, adjust=False).mean()
+        atr_series = pd.Series(tr, index=df.index).ewm(alpha=1.0 / period, adjust=False).mean()
         return float(atr_series.iloc[-1])
 
     def _calculate_atr_hybrid(
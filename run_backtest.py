@@ -26,7 +26,7 @@ from strategies.vega_strategy import VEGAStrategy
 from strategies.connors_strategy import CONNORSStrategy
 from strategies.altair_strategy import ALTAIRStrategy
 from strategies.lyra_strategy import LYRAStrategy
-from lib.commission import ForexCommission, ETFCommission, CFDIndexCommission, ETFCSVData
+from lib.commission import ForexCommission, ETFCommission, CFDIndexCommission, ETFCSVData, ForexCSVData
 from config.settings_altair import ALTAIR_STRATEGIES_CONFIG, ALTAIR_BROKER_CONFIG, STOCK_SYMBOLS
 from config.settings_lyra import LYRA_STRATEGIES_CONFIG, LYRA_BROKER_CONFIG
 
@@ -118,10 +118,10 @@ def run_backtest(config_name):
         # ETFs / CFD indices: Use custom ETFCSVData for correct datetime parsing
         data = ETFCSVData(**feed_kwargs)
     else:
-        # Forex: Use GenericCSVData with timeframe for correct datetime
+        # Forex: GenericCSVData-compatible feed with a one-shot vectorized parse
         feed_kwargs['timeframe'] = bt.TimeFrame.Minutes
         feed_kwargs['compression'] = 5
-        data = bt.feeds.GenericCSVData(**feed_kwargs)
+        data = ForexCSVData(**feed_kwargs)
     
     # Add data to cerebro
     #
@@ -166,7 +166,7 @@ def run_backtest(config_name):
             htf_kwargs = dict(feed_kwargs)
             htf_kwargs['timeframe'] = bt.TimeFrame.Minutes
             htf_kwargs['compression'] = 5
-            data_htf_src = bt.feeds.GenericCSVData(**htf_kwargs)
+            data_htf_src = ForexCSVData(**htf_kwargs)
 
         data_htf = cerebro.resampledata(
             data_htf_src,
@@ -212,7 +212,7 @@ def run_backtest(config_name):
         else:
             ref_kwargs['timeframe'] = bt.TimeFrame.Minutes
             ref_kwargs['compression'] = 5
-            ref_data = bt.feeds.GenericCSVData(**ref_kwargs)
+            ref_data = ForexCSVData(**ref_kwargs)
 
         # Optional resampling for reference data (e.g. M5 -> H1 for VEGA)
         resample_ref = params.get('resample_reference_minutes')
@@ -323,12 +323,11 @@ def run_backtest(config_name):
     # Add strategy with parameters
     cerebro.addstrategy(StrategyClass, **params)
     
-    # Add observers
-    try:
+    # Add observers (chart only: strategies track equity and trades themselves,
+    # so non-plot runs skip the per-bar observer updates)
+    if config.get('run_plot', False):
         cerebro.addobserver(bt.observers.BuySell, barplot=False)
         cerebro.addobserver(bt.observers.Value)
-    except Exception:
-        pass
     
     # Run backtest
     print(f'\nStarting Cash: ${cerebro.broker.getvalue():,.2f}')
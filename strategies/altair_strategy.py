@@ -652,10 +652,9 @@ class ALTAIRStrategy(bt.Strategy):
     def _update_plot_lines(self, entry=None, sl=None, tp=None):
         if not self.entry_exit_lines:
             return
-        nan = float('nan')
-        self.entry_exit_lines.lines.entry[0] = entry if entry else nan
-        self.entry_exit_lines.lines.stop_loss[0] = sl if sl else nan
-        self.entry_exit_lines.lines.take_profit[0] = tp if tp else nan
+        self.entry_exit_lines.lines.entry[0] = entry if entry else math.nan
+        self.entry_exit_lines.lines.stop_loss[0] = sl if sl else math.nan
+        self.entry_exit_lines.lines.take_profit[0] = tp if tp else math.nan
 
     # =========================================================================
     # ENTRY EXECUTION
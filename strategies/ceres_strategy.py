@@ -50,6 +50,7 @@ from lib.filters import (
     check_efficiency_ratio_filter,
 )
 from lib.indicators import EfficiencyRatio
+from lib.fast_indicators import atr, is_preloaded, line_values
 from lib.position_sizing import calculate_position_size
 
 
@@ -209,7 +210,22 @@ class CERESStrategy(bt.Strategy):
     # =====================================================================
 
     def __init__(self):
-        self.atr = bt.ind.ATR(self.data, period=self.p.atr_length)
+        # ATR, indexed by data bar in next(): precomputed once as a plain list
+        # when the feed is preloaded (same values as bt.ind.ATR, see
+        # lib/fast_indicators.py); resampled runs aren't preloaded, so they
+        # keep the indicator and read its line buffer as it grows
+        d = self.data
+        if is_preloaded(d):
+            self._atr_arr = atr(
+                line_values(d.high), line_values(d.low), line_values(d.close),
+                self.p.atr_length,
+            ).tolist()
+        else:
+            self.atr = bt.ind.ATR(d, period=self.p.atr_length)
+            self._atr_arr = self.atr.lines[0].array
+        # First bar with a valid ATR (the minperiod bt.ind.ATR gave next())
+        self._warmup = self.p.atr_length + 1
+        self._i = 0  # Current bar index into _atr_arr
 
         # HTF ER (optional)
         self.htf_er = None
@@ -519,7 +535,7 @@ class CERESStrategy(bt.Strategy):
     def _get_average_atr(self):
         """Get average ATR over configured period."""
         if len(self.atr_history) < self.p.atr_avg_period:
-            val = float(self.atr[0])
+            val = self._atr_arr[self._i]
             return val if not math.isnan(val) else 0
         recent = self.atr_history[-self.p.atr_avg_period:]
         return sum(recent) / len(recent)
@@ -528,12 +544,11 @@ class CERESStrategy(bt.Strategy):
         """Update plot overlay lines."""
         if not self.entry_exit_lines:
             return
-        nan = float('nan')
-        self.entry_exit_lines.lines.entry[0] = entry if entry else nan
-        self.entry_exit_lines.lines.stop_loss[0] = sl if sl else nan
-        self.entry_exit_lines.lines.take_profit[0] = tp if tp else nan
-        self.entry_exit_lines.lines.window_high_line[0] = hh if hh else nan
-        self.entry_exit_lines.lines.window_low_line[0] = ll if ll else nan
+        self.entry_exit_lines.lines.entry[0] = entry if entry else math.nan
+        self.entry_exit_lines.lines.stop_loss[0] = sl if sl else math.nan
+        self.entry_exit_lines.lines.take_profit[0] = tp if tp else math.nan
+        self.entry_exit_lines.lines.window_high_line[0] = hh if hh else math.nan
+        self.entry_exit_lines.lines.window_low_line[0] = ll if ll else math.nan
 
     def _is_day_scan_ready(self):
         """Check if we should start scanning (first bar of day + delay).
@@ -818,10 +833,15 @@ class CERESStrategy(bt.Strategy):
     # =====================================================================
 
     def next(self):
+        # ATR warm-up (backtrader only gates next() on the remaining
+        # indicator objects' minperiod)
+        if len(self.data) < self._warmup:
+            return
+        self._i = len(self.data) - 1
         self._portfolio_values.append(self.broker.get_value())
 
         # Track ATR
-        current_atr = float(self.atr[0]) if not math.isnan(float(self.atr[0])) else 0
+        current_atr = self._atr_arr[self._i]
         if current_atr > 0:
             self.atr_history.append(current_atr)
 
@@ -1283,7 +1303,7 @@ class CERESStrategy(bt.Strategy):
         })
 
         # Determine exit reason
-        last_reason = getattr(self, 'last_exit_reason', None)
+        last_reason = self.last_exit_reason
         if last_reason and last_reason in ('EOD_CLOSE',):
             reason = last_reason
         elif pnl > 0:
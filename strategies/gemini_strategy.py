@@ -414,7 +414,7 @@ class GEMINIStrategy(bt.Strategy):
             report_dir.mkdir(exist_ok=True)
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             report_path = report_dir / f"GEMINI_trades_{timestamp}.txt"
-            self.trade_report_file = open(report_path, 'w', encoding='utf-8')
+            self.trade_report_file = open(report_path, 'w', encoding='utf-8', buffering=1 << 16)
             self.trade_report_file.write("=== GEMINI STRATEGY TRADE REPORT ===\n")
             self.trade_report_file.write(f"Generated: {datetime.now()}\n")
             self.trade_report_file.write("\n")
@@ -480,18 +480,19 @@ class GEMINIStrategy(bt.Strategy):
                 'cross_bars': cross_bars,
             }
             self.trade_reports.append(entry)
-            self.trade_report_file.write(f"ENTRY #{len(self.trade_reports)}\n")
-            self.trade_report_file.write(f"Time: {dt.strftime('%Y-%m-%d %H:%M:%S')}\n")
-            self.trade_report_file.write(f"Entry Price: {entry_price:.5f}\n")
-            self.trade_report_file.write(f"Stop Loss: {self.stop_level:.5f}\n")
-            self.trade_report_file.write(f"Take Profit: {self.take_level:.5f}\n")
-            self.trade_report_file.write(f"SL Pips: {sl_pips:.1f}\n")
-            self.trade_report_file.write(f"ATR (avg): {atr:.6f}\n")
-            self.trade_report_file.write(f"Cross Bars: {cross_bars}\n")
-            self.trade_report_file.write(f"ROC Angle: {roc_angle:.1f}\n")
-            self.trade_report_file.write(f"Harmony Angle: {harmony_angle:.1f}\n")
-            self.trade_report_file.write("-" * 50 + "\n\n")
-            self.trade_report_file.flush()
+            self.trade_report_file.write(
+                f"ENTRY #{len(self.trade_reports)}\n"
+                f"Time: {dt.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"Entry Price: {entry_price:.5f}\n"
+                f"Stop Loss: {self.stop_level:.5f}\n"
+                f"Take Profit: {self.take_level:.5f}\n"
+                f"SL Pips: {sl_pips:.1f}\n"
+                f"ATR (avg): {atr:.6f}\n"
+                f"Cross Bars: {cross_bars}\n"
+                f"ROC Angle: {roc_angle:.1f}\n"
+                f"Harmony Angle: {harmony_angle:.1f}\n"
+                + "-" * 50 + "\n\n"
+            )
         except Exception as e:
             pass
 
@@ -503,12 +504,13 @@ class GEMINIStrategy(bt.Strategy):
             self.trade_reports[-1]['pnl'] = pnl
             self.trade_reports[-1]['exit_reason'] = reason
             self.trade_reports[-1]['exit_time'] = dt
-            self.trade_report_file.write(f"EXIT #{len(self.trade_reports)}\n")
-            self.trade_report_file.write(f"Time: {dt.strftime('%Y-%m-%d %H:%M:%S')}\n")
-            self.trade_report_file.write(f"Exit Reason: {reason}\n")
-            self.trade_report_file.write(f"P&L: ${pnl:.2f}\n")
-            self.trade_report_file.write("=" * 80 + "\n\n")
-            self.trade_report_file.flush()
+            self.trade_report_file.write(
+                f"EXIT #{len(self.trade_reports)}\n"
+                f"Time: {dt.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"Exit Reason: {reason}\n"
+                f"P&L: ${pnl:.2f}\n"
+                + "=" * 80 + "\n\n"
+            )
         except:
             pass
 
@@ -521,10 +523,9 @@ class GEMINIStrategy(bt.Strategy):
         if not self.entry_exit_lines:
             return
         
-        nan = float('nan')
-        self.entry_exit_lines.lines.entry[0] = entry_price if entry_price else nan
-        self.entry_exit_lines.lines.stop_loss[0] = stop_level if stop_level else nan
-        self.entry_exit_lines.lines.take_profit[0] = take_level if take_level else nan
+        self.entry_exit_lines.lines.entry[0] = entry_price if entry_price else math.nan
+        self.entry_exit_lines.lines.stop_loss[0] = stop_level if stop_level else math.nan
+        self.entry_exit_lines.lines.take_profit[0] = take_level if take_level else math.nan
 
     # =========================================================================
     # DATETIME HELPER
@@ -27,6 +27,8 @@ Analysis Findings (USDCHF 5 years):
 Author: Ivan
 Version: 2.1.0
 """
+import math
+
 import backtrader as bt
 import numpy as np
 from datetime import datetime, timedelta
@@ -387,9 +389,9 @@ class GLIESEStrategy(bt.Strategy):
             self.entry_exit_lines.lines.take_profit[0] = self.take_level
         else:
             # Clear lines when not in position
-            self.entry_exit_lines.lines.entry[0] = float('nan')
-            self.entry_exit_lines.lines.stop_loss[0] = float('nan')
-            self.entry_exit_lines.lines.take_profit[0] = float('nan')
+            self.entry_exit_lines.lines.entry[0] = math.nan
+            self.entry_exit_lines.lines.stop_loss[0] = math.nan
+            self.entry_exit_lines.lines.take_profit[0] = math.nan
     
     def _check_time_exit(self):
         """Check if trade should be closed due to time limit."""
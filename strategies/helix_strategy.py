@@ -366,7 +366,7 @@ class HELIXStrategy(bt.Strategy):
             report_dir.mkdir(exist_ok=True)
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             report_path = report_dir / f"HELIX_trades_{timestamp}.txt"
-            self.trade_report_file = open(report_path, 'w', encoding='utf-8')
+            self.trade_report_file = open(report_path, 'w', encoding='utf-8', buffering=1 << 16)
             self.trade_report_file.write("=== HELIX STRATEGY TRADE REPORT ===\n")
             self.trade_report_file.write(f"Generated: {datetime.now()}\n")
             self.trade_report_file.write(f"KAMA: period={self.p.kama_period}, fast={self.p.kama_fast}, slow={self.p.kama_slow}\n")
@@ -410,21 +410,22 @@ class HELIXStrategy(bt.Strategy):
                 'pullback_bars': pullback_bars,
             }
             self.trade_reports.append(entry)
-            self.trade_report_file.write(f"ENTRY #{len(self.trade_reports)}\n")
-            self.trade_report_file.write(f"Time: {dt.strftime('%Y-%m-%d %H:%M:%S')}\n")
-            self.trade_report_file.write(f"Entry Price: {entry_price:.5f}\n")
-            self.trade_report_file.write(f"Stop Loss: {self.stop_level:.5f}\n")
-            self.trade_report_file.write(f"Take Profit: {self.take_level:.5f}\n")
-            self.trade_report_file.write(f"SL Pips: {sl_pips:.1f}\n")
-            self.trade_report_file.write(f"ATR (avg): {atr:.6f}\n")
-            self.trade_report_file.write(f"SE: {se_value:.3f}\n")
-            self.trade_report_file.write(f"SE StdDev: {se_stddev:.4f}\n")
-            self.trade_report_file.write(f"Breakout Waited: {breakout_waited_bars} bars\n")
-            self.trade_report_file.write(f"Pullback Bars: {pullback_bars}\n")
-            if self.p.use_cci_filter:
-                self.trade_report_file.write(f"CCI (HL2): {cci:.2f}\n")
-            self.trade_report_file.write("-" * 50 + "\n\n")
-            self.trade_report_file.flush()
+            cci_line = f"CCI (HL2): {cci:.2f}\n" if self.p.use_cci_filter else ""
+            self.trade_report_file.write(
+                f"ENTRY #{len(self.trade_reports)}\n"
+                f"Time: {dt.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"Entry Price: {entry_price:.5f}\n"
+                f"Stop Loss: {self.stop_level:.5f}\n"
+                f"Take Profit: {self.take_level:.5f}\n"
+                f"SL Pips: {sl_pips:.1f}\n"
+                f"ATR (avg): {atr:.6f}\n"
+                f"SE: {se_value:.3f}\n"
+                f"SE StdDev: {se_stddev:.4f}\n"
+                f"Breakout Waited: {breakout_waited_bars} bars\n"
+                f"Pullback Bars: {pullback_bars}\n"
+                f"{cci_line}"
+                + "-" * 50 + "\n\n"
+            )
         except Exception as e:
             pass
 
@@ -436,12 +437,13 @@ class HELIXStrategy(bt.Strategy):
             self.trade_reports[-1]['pnl'] = pnl
             self.trade_reports[-1]['exit_reason'] = reason
             self.trade_reports[-1]['exit_time'] = dt
-            self.trade_report_file.write(f"EXIT #{len(self.trade_reports)}\n")
-            self.trade_report_file.write(f"Time: {dt.strftime('%Y-%m-%d %H:%M:%S')}\n")
-            self.trade_report_file.write(f"Exit Reason: {reason}\n")
-            self.trade_report_file.write(f"P&L: ${pnl:.2f}\n")
-            self.trade_report_file.write("=" * 80 + "\n\n")
-            self.trade_report_file.flush()
+            self.trade_report_file.write(
+                f"EXIT #{len(self.trade_reports)}\n"
+                f"Time: {dt.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"Exit Reason: {reason}\n"
+                f"P&L: ${pnl:.2f}\n"
+                + "=" * 80 + "\n\n"
+            )
         except:
             pass
 
@@ -454,10 +456,9 @@ class HELIXStrategy(bt.Strategy):
         if not self.entry_exit_lines:
             return
         
-        nan = float('nan')
-        self.entry_exit_lines.lines.entry[0] = entry_price if entry_price else nan
-        self.entry_exit_lines.lines.stop_loss[0] = stop_level if stop_level else nan
-        self.entry_exit_lines.lines.take_profit[0] = take_level if take_level else nan
+        self.entry_exit_lines.lines.entry[0] = entry_price if entry_price else math.nan
+        self.entry_exit_lines.lines.stop_loss[0] = stop_level if stop_level else math.nan
+        self.entry_exit_lines.lines.take_profit[0] = take_level if take_level else math.nan
 
     # =========================================================================
     # DATETIME HELPER
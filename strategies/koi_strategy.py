@@ -12,21 +12,159 @@ EXIT SYSTEM:
 - Take Profit: Entry + (ATR x TP multiplier)
 """
 from __future__ import annotations
-import math
+import bisect
 from pathlib import Path
 from datetime import datetime
-from collections import defaultdict
 
 import backtrader as bt
 import numpy as np
 
-from lib.filters import (
-    check_time_filter,
-    check_day_filter,
-    check_atr_filter,
-    check_sl_pips_filter,
-)
+from lib.filters import hour_bitmask, day_bitmask
 from lib.position_sizing import calculate_position_size
+from lib.fast_indicators import emas_atr, cci, cached_indicators, is_preloaded, line_values
+
+# Optional: numba for the breakout scan and Monte Carlo kernels (plain
+# Python loop / NumPy blocks without it)
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# datetime.toordinal() of 1970-01-01 (backtrader float dates are ordinal days)
+_ORDINAL_1970 = 719163.0
+
+# Force signal/order debug prints for every KOI run (the print_signals
+# param still enables them per config)
+PRINT_SIGNALS = False
+
+
+def _noop(*args, **kwargs):
+    """Stand-in for the trade-report hooks when reporting is off."""
+
+
+# One record per logged trade (exit fields stay -1 / NaN / None while open)
+_TRADE_LOG_DTYPE = np.dtype([
+    ('entry_bar', np.int32),
+    ('entry_price', np.float64),
+    ('size', np.float64),
+    ('atr', np.float64),
+    ('cci', np.float64),
+    ('sl_pips', np.float64),
+    ('stop_level', np.float64),
+    ('take_level', np.float64),
+    ('exit_bar', np.int32),
+    ('pnl', np.float64),
+    ('exit_reason', object),
+])
+
+
+# Summary quality labels: value < thresholds[k] -> labels[k], else the last label
+_RATIO_THRESHOLDS = (0.5, 1.0, 2.0)  # Sharpe, Sortino, Calmar
+_SHARPE_LABELS = ("Poor", "Marginal", "Good", "Excellent")
+_CALMAR_LABELS = ("Poor", "Acceptable", "Good", "Excellent")
+_CAGR_THRESHOLDS = (8, 12, 20)
+_CAGR_LABELS = ("Below Market", "Market-level", "Good", "Exceptional")
+_DD_THRESHOLDS = (10, 20, 30)
+_DD_LABELS = ("Excellent", "Acceptable", "High", "Dangerous")
+_MC_THRESHOLDS = (1.5, 2.0)
+_MC_LABELS = ("Good", "Caution", "Warning")
+
+
+def _classify(value, thresholds, labels):
+    """Label of the first threshold above value (NaN gets the last label)."""
+    return labels[bisect.bisect_right(thresholds, value)]
+
+
+# =============================================================================
+# BREAKOUT WINDOW KERNEL
+# =============================================================================
+
+@njit(cache=True)
+def _next_breakout(signal, high, offset, window, start):
+    """
+    Run the breakout window state machine from bar start (SCANNING, flat).
+
+    A signal bar arms the window at its high + offset; a later bar whose
+    high clears that level within window bars triggers the entry. A bar
+    that closes the window only resets it (no new pattern on that bar).
+
+    Returns:
+        (trigger bar, pattern bar), or (-1, -1) if nothing triggers before
+        the end of the data
+    """
+    pattern = -1
+    level = 0.0
+    for i in range(start, signal.size):
+        if pattern < 0:
+            if signal[i]:
+                pattern = i
+                level = high[i] + offset
+        elif i - pattern > window:
+            pattern = -1
+        elif high[i] > level:
+            return i, pattern
+    return -1, -1
+
+
+# =============================================================================
+# MONTE CARLO KERNELS
+# =============================================================================
+
+@njit(parallel=True, cache=True)
+def _mc_max_drawdowns(pnl, n_sims, seed, start_cash):
+    """
+    Max drawdown (%) of n_sims shuffled trade sequences.
+
+    Each simulation reseeds from seed + i, shuffles its own copy of pnl
+    (Fisher-Yates) and walks the equity path in scalar locals, so runs are
+    reproducible for a given seed whatever the thread count.
+    """
+    n = pnl.size
+    out = np.empty(n_sims)
+    for i in prange(n_sims):
+        np.random.seed(seed + i)
+        buf = pnl.copy()
+        for k in range(n - 1, 0, -1):
+            j = np.random.randint(0, k + 1)
+            buf[k], buf[j] = buf[j], buf[k]
+        equity = start_cash
+        peak = equity
+        max_dd = 0.0
+        for k in range(n):
+            equity += buf[k]
+            if equity > peak:
+                peak = equity
+            dd = (peak - equity) / peak * 100.0 if peak > 0 else 0.0
+            if dd > max_dd:
+                max_dd = dd
+        out[i] = max_dd
+    return out
+
+
+def _mc_max_drawdowns_blocks(pnl, n_sims, start_cash):
+    """NumPy version of _mc_max_drawdowns (global RNG), used without numba."""
+    n = pnl.size
+    # Simulations run in blocks of shuffled equity paths (one row per
+    # simulation), bounding each (sims x trades) matrix at ~16 MB
+    block = max(1, min(n_sims, 2_000_000 // n))
+    out = np.empty(n_sims)
+    for start in range(0, n_sims, block):
+        rows = min(block, n_sims - start)
+        perm = np.argsort(np.random.random((rows, n)), axis=1)
+        paths = start_cash + np.cumsum(pnl[perm], axis=1)
+        # The starting balance is the first peak of every path
+        peaks = np.maximum(np.maximum.accumulate(paths, axis=1), start_cash)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dd = np.where(peaks > 0, (peaks - paths) / peaks * 100.0, 0.0)
+        out[start:start + rows] = np.maximum(dd.max(axis=1), 0.0)
+    return out
 
 
 class KOIStrategy(bt.Strategy):
@@ -100,15 +238,122 @@ class KOIStrategy(bt.Strategy):
 
     def __init__(self):
         d = self.data
+        if not is_preloaded(d):
+            raise ValueError(
+                '[KOI] ERROR: needs a preloaded feed (indicators and entry signals '
+                'are precomputed); base_timeframe_minutes / htf_data_minutes '
+                'resampling is not supported')
+        
+        # Indicators: precomputed once over the preloaded feed and indexed by
+        # bar in next() (same values as bt.ind.EMA/CCI/ATR, see lib/fast_indicators.py)
+        # Bar timestamps: backtrader float days (ordinal 1 = 0001-01-01) -> datetime64[s],
+        # truncated to the second with bt.num2date's 10us float-error tolerance
+        # (so end-of-session 23:59:59.99999 stays on its own day); calendar
+        # fields as int arrays, kept on self only where next()/stop() use them
+        epoch_secs = np.floor(
+            (line_values(d.datetime) - _ORDINAL_1970) * 86400.0 + 1e-5
+        ).astype(np.int64)
+        self._dt64 = epoch_secs.astype('datetime64[s]')
+        day_secs = epoch_secs % 86400
+        hour = day_secs // 3600
+        self._minute_of_day = (day_secs // 60).astype(np.int16)  # 0..1439
+        weekday = (epoch_secs // 86400 + 3) % 7  # 1970-01-01 was a Thursday
+        
+        open_ = line_values(d.open)
+        close = line_values(d.close)
+        high = line_values(d.high)
+        self._close = close  # Bar-indexed price arrays for next() (no line lookups)
+        self._high = high
+        low = line_values(d.low)
+        ema_periods = (
+            self.p.ema_1_period, self.p.ema_2_period, self.p.ema_3_period,
+            self.p.ema_4_period, self.p.ema_5_period,
+        )
+        
+        def compute_indicators():
+            # 5 EMAs + ATR in one fused pass; CCI needs its own windows
+            emas, atr_arr = emas_atr(high, low, close, ema_periods, self.p.atr_length)
+            arrays = {f'ema_{k}': row for k, row in enumerate(emas, 1)}
+            arrays['cci'] = cci(high, low, close, self.p.cci_period)
+            arrays['atr'] = atr_arr
+            return arrays
+        
+        # Cached on disk per (data file, periods, bar range) for repeated sweep runs
+        dt_array = d.datetime.array
+        cache_key = (
+            'KOI', ema_periods, self.p.cci_period, self.p.atr_length,
+            close.size, dt_array[0] if close.size else None, dt_array[-1] if close.size else None,
+        )
+        arrays = cached_indicators(getattr(d.p, 'dataname', None), cache_key, compute_indicators)
+        self.ema_1 = arrays['ema_1']
+        self.ema_2 = arrays['ema_2']
+        self.ema_3 = arrays['ema_3']
+        self.ema_4 = arrays['ema_4']
+        self.ema_5 = arrays['ema_5']
+        self.cci = arrays['cci']
+        self.atr = arrays['atr']
+        
+        # All 5 EMAs ascending, one bool per bar. Written as "no EMA fell"
+        # so a NaN previous value passes, exactly like the per-bar check
+        ema_stack = np.stack([self.ema_1, self.ema_2, self.ema_3, self.ema_4, self.ema_5], axis=1)
+        emas_asc = np.zeros(close.size, dtype=np.bool_)
+        emas_asc[1:] = ~np.any(ema_stack[1:] <= ema_stack[:-1], axis=1)
+        del ema_stack
+        
+        # Bullish engulfing mask: bearish bar [i-1] fully engulfed by bullish bar [i]
+        engulf = np.zeros(close.size, dtype=np.bool_)
+        engulf[1:] = (
+            (close[:-1] < open_[:-1])
+            & (close[1:] > open_[1:])
+            & (open_[1:] <= close[:-1])
+            & (close[1:] >= open_[:-1])
+        )
+        
+        # First bar where every indicator is valid (the minperiod backtrader
+        # derived from the indicator objects: EMA=period, CCI=2*period-1, ATR=period+1)
+        self._warmup = max(
+            *ema_periods,
+            2 * self.p.cci_period - 1,
+            self.p.atr_length + 1,
+        )
+        self._i = 0  # Current bar index into the indicator arrays
+        
+        # Per-run price constants
+        self._inv_pip = 1.0 / self.p.pip_value
+        self._breakout_offset = self.p.breakout_level_offset_pips * self.p.pip_value
+        self._print_signals = PRINT_SIGNALS or bool(self.p.print_signals)
+        
+        # Position sizing pair type, fixed for the run
+        if self.p.is_etf:
+            self._pair_type = 'ETF'
+        elif self.p.is_jpy_pair:
+            self._pair_type = 'JPY'
+        else:
+            self._pair_type = 'STANDARD'
+        
+        # ATR / SL pips filter bounds (a disabled filter accepts any value)
+        inf = float('inf')
+        self._atr_min, self._atr_max = (
+            (self.p.atr_min, self.p.atr_max) if self.p.use_atr_filter else (-inf, inf)
+        )
+        self._sl_pips_min, self._sl_pips_max = (
+            (self.p.sl_pips_min, self.p.sl_pips_max) if self.p.use_sl_pips_filter else (-inf, inf)
+        )
         
-        # Indicators
-        self.ema_1 = bt.ind.EMA(d.close, period=self.p.ema_1_period)
-        self.ema_2 = bt.ind.EMA(d.close, period=self.p.ema_2_period)
-        self.ema_3 = bt.ind.EMA(d.close, period=self.p.ema_3_period)
-        self.ema_4 = bt.ind.EMA(d.close, period=self.p.ema_4_period)
-        self.ema_5 = bt.ind.EMA(d.close, period=self.p.ema_5_period)
-        self.cci = bt.ind.CCI(d, period=self.p.cci_period)
-        self.atr = bt.ind.ATR(d, period=self.p.atr_length)
+        # Time/day filters as bitmasks (bit h = hour h allowed, bit d = weekday d)
+        self._hour_mask = hour_bitmask(self.p.allowed_hours, self.p.use_time_filter)
+        self._day_mask = day_bitmask(self.p.allowed_days, self.p.use_day_filter)
+        
+        # Entry signal per bar: session AND engulfing AND EMAs ascending AND CCI
+        # in range AND a usable ATR (> 0, not NaN). Position/order state is the
+        # only per-bar part left in next(). CCI is written as "not outside the
+        # band" so NaN passes, like the original per-bar comparisons
+        session_ok = (
+            ((self._hour_mask >> hour) & 1).astype(np.bool_)
+            & ((self._day_mask >> weekday) & 1).astype(np.bool_)
+        )
+        cci_ok = ~((self.cci <= self.p.cci_threshold) | (self.cci >= self.p.cci_max_threshold))
+        self._entry_signal = session_ok & engulf & emas_asc & cci_ok & (self.atr > 0)
         
         # Orders
         self.order = None
@@ -122,12 +367,12 @@ class KOIStrategy(bt.Strategy):
         self.last_entry_bar = None
         self.last_exit_reason = None
         
-        # Breakout state machine
-        self.state = "SCANNING"
-        self.pattern_detected_bar = None
-        self.breakout_level = None
-        self.pattern_atr = None
-        self.pattern_cci = None
+        # Breakout window: only depends on the bar arrays while flat, so
+        # _next_breakout() finds the next trigger in one compiled scan and
+        # next() just waits for that bar. None = rescan on the next flat bar
+        # (the machine restarts from SCANNING after any position/order)
+        self._trigger_bar = None
+        self._pattern_bar = -1
         
         # Stats
         self.trades = 0
@@ -135,164 +380,141 @@ class KOIStrategy(bt.Strategy):
         self.losses = 0
         self.gross_profit = 0.0
         self.gross_loss = 0.0
-        self._portfolio_values = []
-        self._trade_pnls = []
+        # One slot per bar of the preloaded feed, filled in next(). Stays
+        # float64: per-bar returns (~1e-5) feed Sharpe/Sortino and would be
+        # quantized at float32's ~7 significant digits of a $100k equity
+        self._portfolio_values = np.empty(self.data.buflen(), dtype=np.float64)
+        self._n_values = 0
+        # Closed trades as parallel arrays (P&L, bar index of the close);
+        # at most one close per bar, so the feed length bounds the count
+        self._trade_pnl = np.empty(self.data.buflen(), dtype=np.float64)
+        self._trade_bar = np.empty(self.data.buflen(), dtype=np.int32)
+        self._n_trades = 0
         self._starting_cash = self.broker.get_cash()
-        self._first_bar_dt = None
-        self._last_bar_dt = None
+        self._first_bar_idx = None
+        self._last_bar_idx = None
         
         # Trade reporting (KOI generates its own log like original)
-        self.trade_reports = []
-        self.trade_report_file = None
-        self._current_trade_idx = None  # Index of active trade in trade_reports
+        self._report_lines = None  # Report text, None when export_reports is off
+        self._trade_log = None  # Structured trade records, allocated with the report
+        self._n_logged = 0
+        self._report_path = None
+        self._current_trade_idx = None  # Index of active trade in _trade_log
         self._entry_fill_bar = -1  # Bar where buy filled (skip EOD close on same bar)
         self._init_trade_reporting()
+        if self._report_lines is None:
+            # Reporting off (or init failed): skip the per-trade hooks entirely
+            self._record_trade_entry = self._record_trade_exit = _noop
 
     # =========================================================================
     # TRADE REPORTING (same as original koi_eurusd_pro.py)
     # =========================================================================
     
     def _init_trade_reporting(self):
-        """Initialize trade report file."""
+        """Initialize trade report buffer (written to disk once in stop())."""
         if not self.p.export_reports:
             return
         try:
             report_dir = Path("logs")
             report_dir.mkdir(exist_ok=True)
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            report_path = report_dir / f"KOI_trades_{timestamp}.txt"
-            self.trade_report_file = open(report_path, 'w', encoding='utf-8')
-            self.trade_report_file.write("=== KOI STRATEGY TRADE REPORT ===\n")
-            self.trade_report_file.write(f"Generated: {datetime.now()}\n")
-            self.trade_report_file.write(f"EMAs: {self.p.ema_1_period}, {self.p.ema_2_period}, "
-                                        f"{self.p.ema_3_period}, {self.p.ema_4_period}, {self.p.ema_5_period}\n")
-            self.trade_report_file.write(f"CCI: {self.p.cci_period}/{self.p.cci_threshold}\n")
-            self.trade_report_file.write(f"Breakout: {self.p.breakout_level_offset_pips}pips, {self.p.breakout_window_candles}bars\n")
-            self.trade_report_file.write(f"SL: {self.p.atr_sl_multiplier}x ATR | TP: {self.p.atr_tp_multiplier}x ATR\n")
+            self._report_path = report_dir / f"KOI_trades_{timestamp}.txt"
+            lines = [
+                "=== KOI STRATEGY TRADE REPORT ===\n",
+                f"Generated: {datetime.now()}\n",
+                f"EMAs: {self.p.ema_1_period}, {self.p.ema_2_period}, "
+                f"{self.p.ema_3_period}, {self.p.ema_4_period}, {self.p.ema_5_period}\n",
+                f"CCI: {self.p.cci_period}/{self.p.cci_threshold}\n",
+                f"Breakout: {self.p.breakout_level_offset_pips}pips, {self.p.breakout_window_candles}bars\n",
+                f"SL: {self.p.atr_sl_multiplier}x ATR | TP: {self.p.atr_tp_multiplier}x ATR\n",
+            ]
             if self.p.use_sl_pips_filter:
-                self.trade_report_file.write(f"SL Filter: {self.p.sl_pips_min}-{self.p.sl_pips_max} pips\n")
+                lines.append(f"SL Filter: {self.p.sl_pips_min}-{self.p.sl_pips_max} pips\n")
             if self.p.use_atr_filter:
-                self.trade_report_file.write(f"ATR Filter: {self.p.atr_min}-{self.p.atr_max}\n")
+                lines.append(f"ATR Filter: {self.p.atr_min}-{self.p.atr_max}\n")
             if self.p.use_time_filter:
-                self.trade_report_file.write(f"Time Filter: {list(self.p.allowed_hours)}\n")
-            self.trade_report_file.write("\n")
-            print(f"Trade report: {report_path}")
+                lines.append(f"Time Filter: {list(self.p.allowed_hours)}\n")
+            lines.append("\n")
+            self._report_lines = lines
+            # At most one entry per bar, so the feed length bounds the count
+            self._trade_log = np.empty(self.data.buflen(), dtype=_TRADE_LOG_DTYPE)
+            print(f"Trade report: {self._report_path}")
         except Exception as e:
             print(f"Trade reporting init failed: {e}")
 
     def _record_trade_entry(self, dt, entry_price, size, atr, cci, sl_pips):
-        """Record entry to trade report file."""
-        if not self.trade_report_file:
+        """Record entry to trade report buffer."""
+        if self._report_lines is None:
             return
         try:
-            entry = {
-                'entry_time': dt,
-                'entry_price': entry_price,
-                'size': size,
-                'atr': atr,
-                'cci': cci,
-                'sl_pips': sl_pips,
-                'stop_level': self.stop_level,
-                'take_level': self.take_level,
-            }
-            self.trade_reports.append(entry)
-            self._current_trade_idx = len(self.trade_reports) - 1
-            self.trade_report_file.write(f"ENTRY #{len(self.trade_reports)}\n")
-            self.trade_report_file.write(f"Time: {dt.strftime('%Y-%m-%d %H:%M:%S')}\n")
-            self.trade_report_file.write(f"Entry Price: {entry_price:.5f}\n")
-            self.trade_report_file.write(f"Stop Loss: {self.stop_level:.5f}\n")
-            self.trade_report_file.write(f"Take Profit: {self.take_level:.5f}\n")
-            self.trade_report_file.write(f"SL Pips: {sl_pips:.1f}\n")
-            self.trade_report_file.write(f"ATR: {atr:.6f}\n")
-            self.trade_report_file.write(f"CCI: {cci:.2f}\n")
-            self.trade_report_file.write("-" * 50 + "\n\n")
-            self.trade_report_file.flush()
+            n = self._n_logged
+            self._trade_log[n] = (
+                self._i, entry_price, size, atr, cci, sl_pips,
+                self.stop_level, self.take_level, -1, np.nan, None,
+            )
+            self._n_logged = n + 1
+            self._current_trade_idx = n
+            self._report_lines.append(
+                f"ENTRY #{n + 1}\n"
+                f"Time: {dt.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"Entry Price: {entry_price:.5f}\n"
+                f"Stop Loss: {self.stop_level:.5f}\n"
+                f"Take Profit: {self.take_level:.5f}\n"
+                f"SL Pips: {sl_pips:.1f}\n"
+                f"ATR: {atr:.6f}\n"
+                f"CCI: {cci:.2f}\n"
+                + "-" * 50 + "\n\n"
+            )
         except Exception as e:
             pass
 
     def _record_trade_exit(self, dt, pnl, reason):
-        """Record exit to trade report file."""
-        if not self.trade_report_file or not self.trade_reports:
+        """Record exit to trade report buffer."""
+        if self._report_lines is None or not self._n_logged:
             return
         # Skip recording for phantom trades (e.g. accidental shorts)
         if self._current_trade_idx is None:
             return
         try:
-            last_trade = self.trade_reports[self._current_trade_idx]
+            last_trade = self._trade_log[self._current_trade_idx]
+            last_trade['exit_bar'] = len(self.data) - 1
             last_trade['pnl'] = pnl
             last_trade['exit_reason'] = reason
-            last_trade['exit_time'] = dt
-            self.trade_report_file.write(f"EXIT #{len(self.trade_reports)}\n")
-            self.trade_report_file.write(f"Time: {dt.strftime('%Y-%m-%d %H:%M:%S')}\n")
-            self.trade_report_file.write(f"Exit Reason: {reason}\n")
-            self.trade_report_file.write(f"P&L: ${pnl:.2f}\n")
-            self.trade_report_file.write("=" * 80 + "\n\n")
-            self.trade_report_file.flush()
+            self._report_lines.append(
+                f"EXIT #{self._n_logged}\n"
+                f"Time: {dt.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"Exit Reason: {reason}\n"
+                f"P&L: ${pnl:.2f}\n"
+                + "=" * 80 + "\n\n"
+            )
             self._current_trade_idx = None
         except:
             pass
 
+    def _write_trade_report(self):
+        """Write the buffered trade report in one go."""
+        if self._report_lines is None:
+            return
+        try:
+            with open(self._report_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                f.writelines(self._report_lines)
+            print(f"\nTrade report saved.")
+        except Exception as e:
+            print(f"Trade report write failed: {e}")
+
     # =========================================================================
     # DATETIME HELPER
     # =========================================================================
     
     def _get_datetime(self, offset=0) -> datetime:
-        """Get correct datetime combining date and time."""
-        try:
-            dt_date = self.data.datetime.date(offset)
-            dt_time = self.data.datetime.time(offset)
-            return datetime.combine(dt_date, dt_time)
-        except Exception:
-            return self.data.datetime.datetime(offset)
+        """Get bar datetime from the precomputed datetime64 array (offset = bars ago)."""
+        return self._dt64[len(self.data) - 1 + offset].item()
 
     # =========================================================================
-    # PATTERN DETECTION (EXACT from original koi_eurusd_pro.py)
+    # EOD EXIT CHECK
     # =========================================================================
     
-    def _check_bullish_engulfing(self) -> bool:
-        """Check for bullish engulfing pattern."""
-        try:
-            prev_open = float(self.data.open[-1])
-            prev_close = float(self.data.close[-1])
-            if prev_close >= prev_open:
-                return False
-            
-            curr_open = float(self.data.open[0])
-            curr_close = float(self.data.close[0])
-            if curr_close <= curr_open:
-                return False
-            
-            if curr_open > prev_close or curr_close < prev_open:
-                return False
-            
-            return True
-        except:
-            return False
-
-    def _check_emas_ascending(self) -> bool:
-        """Check if ALL 5 EMAs are individually ascending."""
-        try:
-            emas = [self.ema_1, self.ema_2, self.ema_3, self.ema_4, self.ema_5]
-            for ema in emas:
-                if float(ema[0]) <= float(ema[-1]):
-                    return False
-            return True
-        except:
-            return False
-
-    def _check_cci_condition(self) -> bool:
-        """Check if CCI > threshold and < max_threshold."""
-        try:
-            cci_val = float(self.cci[0])
-            if cci_val <= self.p.cci_threshold:
-                return False
-            if cci_val >= self.p.cci_max_threshold:
-                return False
-            return True
-        except:
-            return False
-
-    def _check_eod_close(self, dt):
+    def _check_eod_close(self):
         """
         Check if position should be force-closed at end of day (ETFs only).
         
@@ -301,7 +523,7 @@ class KOIStrategy(bt.Strategy):
         if self.p.eod_close_hour is None or self.p.eod_close_minute is None:
             return False
         
-        current_minutes = dt.hour * 60 + dt.minute
+        current_minutes = self._minute_of_day[self._i]
         eod_minutes = self.p.eod_close_hour * 60 + self.p.eod_close_minute
         
         if current_minutes >= eod_minutes:
@@ -319,10 +541,10 @@ class KOIStrategy(bt.Strategy):
             # Force close at market
             self.close()
             
-            if self.p.print_signals:
+            if self._print_signals:
                 print(
-                    f'{dt} [{self.data._name}] === EOD CLOSE @ '
-                    f'{self.data.close[0]:.2f} (forced {self.p.eod_close_hour}:'
+                    f'{self._get_datetime()} [{self.data._name}] === EOD CLOSE @ '
+                    f'{self._close[self._i]:.2f} (forced {self.p.eod_close_hour}:'
                     f'{self.p.eod_close_minute:02d} UTC) ==='
                 )
             
@@ -330,74 +552,33 @@ class KOIStrategy(bt.Strategy):
         
         return False
 
-    def _check_entry_conditions(self, dt: datetime) -> bool:
-        """Check all entry conditions."""
-        if self.position or self.order:
-            return False
-        
-        if not check_time_filter(dt, self.p.allowed_hours, self.p.use_time_filter):
-            return False
-        
-        if not check_day_filter(dt, self.p.allowed_days, self.p.use_day_filter):
-            return False
-        
-        if not self._check_bullish_engulfing():
-            return False
-        
-        if not self._check_emas_ascending():
-            return False
-        
-        if not self._check_cci_condition():
-            return False
-        
-        return True
-
-    # =========================================================================
-    # BREAKOUT STATE MACHINE
-    # =========================================================================
-    
-    def _reset_breakout_state(self):
-        """Reset breakout window state."""
-        self.state = "SCANNING"
-        self.pattern_detected_bar = None
-        self.breakout_level = None
-        self.pattern_atr = None
-        self.pattern_cci = None
-
     # =========================================================================
     # ENTRY EXECUTION
     # =========================================================================
     
     def _execute_entry(self, dt: datetime, atr_now: float, cci_now: float):
         """Execute entry with all filters applied."""
-        # ATR filter
-        if not check_atr_filter(atr_now, self.p.atr_min, self.p.atr_max, self.p.use_atr_filter):
+        # ATR filter (atr_now is never NaN here: the entry signal needs ATR > 0)
+        if not self._atr_min <= atr_now <= self._atr_max:
             return
         
-        entry_price = float(self.data.close[0])
+        entry_price = self._close[self._i]
         self.stop_level = entry_price - (atr_now * self.p.atr_sl_multiplier)
         self.take_level = entry_price + (atr_now * self.p.atr_tp_multiplier)
         
-        sl_pips = abs(entry_price - self.stop_level) / self.p.pip_value
+        sl_pips = abs(entry_price - self.stop_level) * self._inv_pip
         
         # SL pips filter
-        if not check_sl_pips_filter(sl_pips, self.p.sl_pips_min, self.p.sl_pips_max, self.p.use_sl_pips_filter):
+        if not self._sl_pips_min <= sl_pips <= self._sl_pips_max:
             return
         
         # Position sizing
-        if self.p.is_etf:
-            pair_type = 'ETF'
-        elif self.p.is_jpy_pair:
-            pair_type = 'JPY'
-        else:
-            pair_type = 'STANDARD'
-        
         bt_size = calculate_position_size(
             entry_price=entry_price,
             stop_loss=self.stop_level,
             equity=self.broker.get_value(),
             risk_percent=self.p.risk_percent,
-            pair_type=pair_type,
+            pair_type=self._pair_type,
             lot_size=self.p.lot_size,
             jpy_rate=self.p.jpy_rate,
             pip_value=self.p.pip_value,
@@ -407,9 +588,15 @@ class KOIStrategy(bt.Strategy):
         if bt_size <= 0:
             return
         
-        self.order = self.buy(size=bt_size)
+        # Entry with SL/TP children: both activate on the fill and cancel each other (OCO)
+        self.order, self.stop_order, self.limit_order = self.buy_bracket(
+            size=bt_size,
+            exectype=bt.Order.Market,
+            stopprice=self.stop_level,
+            limitprice=self.take_level,
+        )
         
-        if self.p.print_signals:
+        if self._print_signals:
             print(f">>> KOI BUY {dt:%Y-%m-%d %H:%M} price={entry_price:.5f} "
                   f"SL={self.stop_level:.5f} TP={self.take_level:.5f} CCI={cci_now:.0f} SL_pips={sl_pips:.1f}")
         
@@ -421,68 +608,52 @@ class KOIStrategy(bt.Strategy):
     
     def next(self):
         """Main loop with breakout window state machine."""
-        self._portfolio_values.append(self.broker.get_value())
+        # Indicator warm-up (backtrader no longer gates next() on minperiod)
+        if len(self.data) < self._warmup:
+            return
+        self._i = i = len(self.data) - 1
         
-        dt = self._get_datetime()
+        self._portfolio_values[self._n_values] = self.broker.get_value()
+        self._n_values += 1
         
         # Track date range for data-driven annualization
-        if self._first_bar_dt is None:
-            self._first_bar_dt = dt
-        self._last_bar_dt = dt
-        current_bar = len(self)
+        if self._first_bar_idx is None:
+            self._first_bar_idx = self._i
+        self._last_bar_idx = self._i
         
         if self.order:
+            self._trigger_bar = None
             return
         
         if self.position:
+            self._trigger_bar = None
             # Skip EOD close on bar where buy just filled (prevents cancel race condition)
-            if len(self) != self._entry_fill_bar and self._check_eod_close(dt):
-                return
-            if self.state != "SCANNING":
-                self._reset_breakout_state()
+            if len(self) != self._entry_fill_bar:
+                self._check_eod_close()
             return
         
-        # State machine for breakout window
+        # Breakout window (no position or pending order here, so the
+        # precomputed signal is the whole entry check)
         if self.p.use_breakout_window:
-            if self.state == "SCANNING":
-                if self._check_entry_conditions(dt):
-                    atr_now = float(self.atr[0]) if not math.isnan(float(self.atr[0])) else 0
-                    cci_now = float(self.cci[0])
-                    if atr_now <= 0:
-                        return
-                    
-                    self.pattern_detected_bar = current_bar
-                    offset = self.p.breakout_level_offset_pips * self.p.pip_value
-                    self.breakout_level = float(self.data.high[0]) + offset
-                    self.pattern_atr = atr_now
-                    self.pattern_cci = cci_now
-                    self.state = "WAITING_BREAKOUT"
-                    return
-            
-            elif self.state == "WAITING_BREAKOUT":
-                bars_since = current_bar - self.pattern_detected_bar
-                
-                if bars_since > self.p.breakout_window_candles:
-                    self._reset_breakout_state()
-                    return
-                
-                if float(self.data.high[0]) > self.breakout_level:
-                    self._execute_entry(dt, self.pattern_atr, self.pattern_cci)
-                    self._reset_breakout_state()
-                    return
+            if self._trigger_bar is None:
+                self._trigger_bar, self._pattern_bar = _next_breakout(
+                    self._entry_signal, self._high, self._breakout_offset,
+                    self.p.breakout_window_candles, i,
+                )
+            if i == self._trigger_bar:
+                pattern = self._pattern_bar
+                self._execute_entry(self._get_datetime(), self.atr[pattern], self.cci[pattern])
+                self._trigger_bar = None  # Window closes on the trigger bar either way
         else:
-            if self._check_entry_conditions(dt):
-                atr_now = float(self.atr[0]) if not math.isnan(float(self.atr[0])) else 0
-                cci_now = float(self.cci[0])
-                if atr_now > 0:
-                    self._execute_entry(dt, atr_now, cci_now)
+            if self._entry_signal[i]:
+                self._execute_entry(self._get_datetime(), self.atr[i], self.cci[i])
 
     # =========================================================================
     # ORDER NOTIFICATIONS
     # =========================================================================
     
     def notify_order(self, order):
-        """Order notification with OCA for SL/TP."""
+        """Order notification for the entry bracket (SL/TP as OCO children)."""
         if order.status in [order.Submitted, order.Accepted]:
             return
 
@@ -492,24 +663,10 @@ class KOIStrategy(bt.Strategy):
                 self.last_entry_bar = len(self)
                 self._entry_fill_bar = len(self)  # Track fill bar for EOD close race prevention
                 
-                if self.p.print_signals:
+                if self._print_signals:
                     print(f"[OK] KOI BUY EXECUTED at {order.executed.price:.5f} size={order.executed.size}")
-
-                # Place protective OCA orders
-                if self.stop_level and self.take_level:
-                    self.stop_order = self.sell(
-                        size=order.executed.size,
-                        exectype=bt.Order.Stop,
-                        price=self.stop_level,
-                        oco=self.limit_order
-                    )
-                    self.limit_order = self.sell(
-                        size=order.executed.size,
-                        exectype=bt.Order.Limit,
-                        price=self.take_level,
-                        oco=self.stop_order
-                    )
                 
+                # SL/TP were submitted with the entry (buy_bracket) and are live now
                 self.order = None
 
             else:  # Exit order (SL/TP)
@@ -523,7 +680,7 @@ class KOIStrategy(bt.Strategy):
                 if self.last_exit_reason != "EOD_CLOSE":
                     self.last_exit_reason = exit_reason
                 
-                if self.p.print_signals:
+                if self._print_signals:
                     print(f"[EXIT] at {order.executed.price:.5f} reason={exit_reason}")
 
                 self.stop_order = None
@@ -533,19 +690,20 @@ class KOIStrategy(bt.Strategy):
                 self.take_level = None
 
         elif order.status in [order.Canceled, order.Margin, order.Rejected]:
-            is_expected_cancel = (self.stop_order and self.limit_order)
-            if not is_expected_cancel and self.p.print_signals:
+            is_expected_cancel = (order is not self.order and self.stop_order and self.limit_order)
+            if not is_expected_cancel and self._print_signals:
                 print(f"Order {order.getstatusname()}: {order.ref}")
             
             if self.order and order.ref == self.order.ref:
                 # Buy order rejected/margin — write N/A exit for orphan entry
-                if self._current_trade_idx is not None and self.trade_report_file:
-                    self.trade_report_file.write(f"EXIT #{self._current_trade_idx + 1}\n")
-                    self.trade_report_file.write("Time: N/A\n")
-                    self.trade_report_file.write(f"Exit Reason: {order.getstatusname()}\n")
-                    self.trade_report_file.write("P&L: $0.00\n")
-                    self.trade_report_file.write("=" * 80 + "\n\n")
-                    self.trade_report_file.flush()
+                if self._current_trade_idx is not None and self._report_lines is not None:
+                    self._report_lines.append(
+                        f"EXIT #{self._current_trade_idx + 1}\n"
+                        "Time: N/A\n"
+                        f"Exit Reason: {order.getstatusname()}\n"
+                        "P&L: $0.00\n"
+                        + "=" * 80 + "\n\n"
+                    )
                 self._current_trade_idx = None
                 self.order = None
             if self.stop_order and order.ref == self.stop_order.ref: self.stop_order = None
@@ -567,16 +725,49 @@ class KOIStrategy(bt.Strategy):
             self.losses += 1
             self.gross_loss += abs(pnl)
         
-        self._trade_pnls.append({
-            'date': dt,
-            'year': dt.year,
-            'pnl': pnl,
-            'is_winner': pnl > 0
-        })
+        n = self._n_trades
+        self._trade_pnl[n] = pnl
+        self._trade_bar[n] = len(self.data) - 1
+        self._n_trades = n + 1
         
-        reason = getattr(self, 'last_exit_reason', 'UNKNOWN')
+        reason = self.last_exit_reason
         self._record_trade_exit(dt, pnl, reason)
 
+    @property
+    def trade_reports(self):
+        """Logged trades as dicts, exit fields only once closed (read by runners)."""
+        if self._trade_log is None:
+            return []
+        dt64 = self._dt64
+        reports = []
+        for rec in self._trade_log[:self._n_logged]:
+            entry = {
+                'entry_time': dt64[rec['entry_bar']].item(),
+                'entry_price': rec['entry_price'].item(),
+                'size': rec['size'].item(),
+                'atr': rec['atr'].item(),
+                'cci': rec['cci'].item(),
+                'sl_pips': rec['sl_pips'].item(),
+                'stop_level': rec['stop_level'].item(),
+                'take_level': rec['take_level'].item(),
+            }
+            if rec['exit_bar'] >= 0:
+                entry['pnl'] = rec['pnl'].item()
+                entry['exit_reason'] = rec['exit_reason']
+                entry['exit_time'] = dt64[rec['exit_bar']].item()
+            reports.append(entry)
+        return reports
+
+    @property
+    def _trade_pnls(self):
+        """Closed trades as date/year/pnl/is_winner dicts (read by external tools)."""
+        n = self._n_trades
+        dates = self._dt64[self._trade_bar[:n]].tolist()
+        return [
+            {'date': dt, 'year': dt.year, 'pnl': pnl, 'is_winner': pnl > 0}
+            for dt, pnl in zip(dates, self._trade_pnl[:n].tolist())
+        ]
+
     # =========================================================================
     # STATISTICS (same as original)
     # =========================================================================
@@ -599,51 +790,45 @@ class KOIStrategy(bt.Strategy):
         monte_carlo_dd_95 = 0.0
         monte_carlo_dd_99 = 0.0
         
-        # Max Drawdown
-        if self._portfolio_values:
-            peak = self._portfolio_values[0]
-            for value in self._portfolio_values:
-                if value > peak:
-                    peak = value
-                drawdown = (peak - value) / peak * 100.0
-                if drawdown > max_drawdown_pct:
-                    max_drawdown_pct = drawdown
-        
-        # Daily returns for Sharpe/Sortino
-        daily_returns = []
-        if self._trade_pnls:
-            daily_pnl = defaultdict(float)
-            for trade in self._trade_pnls:
-                date_key = trade['date'].date()
-                daily_pnl[date_key] += trade['pnl']
-            
-            equity = self._starting_cash
-            sorted_dates = sorted(daily_pnl.keys())
-            for date in sorted_dates:
-                pnl = daily_pnl[date]
-                if equity > 0:
-                    daily_ret = pnl / equity
-                    daily_returns.append(daily_ret)
-                    equity += pnl
+        # Closed-trade columns
+        n_trades = self._n_trades
+        trade_pnl = self._trade_pnl[:n_trades]
+        trade_dt64 = self._dt64[self._trade_bar[:n_trades]]
+        trade_years = trade_dt64.astype('datetime64[Y]').astype(np.int64) + 1970
+        trade_win = trade_pnl > 0
+        
+        # Trim to the filled bars (external tools read _portfolio_values after the run)
+        self._portfolio_values = self._portfolio_values[:self._n_values]
+        portfolio_values = self._portfolio_values
+        
+        # Max Drawdown (one scratch array, updated in place)
+        if portfolio_values.size:
+            peaks = np.maximum.accumulate(portfolio_values)
+            drawdowns = np.subtract(peaks, portfolio_values)
+            drawdowns /= peaks
+            max_drawdown_pct = max(0.0, float(drawdowns.max()) * 100.0)
+        
+        # Bar returns of the equity curve, shared by Sharpe and Sortino
+        bar_returns = np.diff(portfolio_values)
+        if bar_returns.size:
+            bar_returns /= portfolio_values[:-1]
         
         # Compute data-driven periods_per_year from actual bar dates
-        if self._first_bar_dt and self._last_bar_dt:
-            data_days = (self._last_bar_dt - self._first_bar_dt).days
+        if self._first_bar_idx is not None:
+            first_bar_dt = self._dt64[self._first_bar_idx].item()
+            last_bar_dt = self._dt64[self._last_bar_idx].item()
+            data_days = (last_bar_dt - first_bar_dt).days
             data_years = max(data_days / 365.25, 0.1)
-            periods_per_year = len(self._portfolio_values) / data_years
+            periods_per_year = portfolio_values.size / data_years
         else:
             periods_per_year = 252 * 24 * 12  # Fallback: forex 5-min
         
         # SHARPE RATIO (same calculation as original sunrise_ogle)
         sharpe_ratio = 0.0
-        if len(self._portfolio_values) > 10:
-            returns = []
-            for i in range(1, len(self._portfolio_values)):
-                ret = (self._portfolio_values[i] - self._portfolio_values[i-1]) / self._portfolio_values[i-1]
-                returns.append(ret)
+        if portfolio_values.size > 10:
+            returns_array = bar_returns
             
-            if len(returns) > 0:
-                returns_array = np.array(returns)
+            if len(returns_array) > 0:
                 mean_return = np.mean(returns_array)
                 std_return = np.std(returns_array)
                 if std_return > 0:
@@ -651,14 +836,10 @@ class KOIStrategy(bt.Strategy):
         
         # SORTINO RATIO (same calculation as original sunrise_ogle)
         sortino_ratio = 0.0
-        if len(self._portfolio_values) > 10:
-            returns = []
-            for i in range(1, len(self._portfolio_values)):
-                ret = (self._portfolio_values[i] - self._portfolio_values[i-1]) / self._portfolio_values[i-1]
-                returns.append(ret)
+        if portfolio_values.size > 10:
+            returns_array = bar_returns
             
-            if len(returns) > 0:
-                returns_array = np.array(returns)
+            if len(returns_array) > 0:
                 mean_return = np.mean(returns_array)
                 negative_returns = returns_array[returns_array < 0]
                 if len(negative_returns) > 0:
@@ -667,11 +848,11 @@ class KOIStrategy(bt.Strategy):
                         sortino_ratio = (mean_return * periods_per_year) / (downside_dev * np.sqrt(periods_per_year))
         
         # CAGR
-        if self._portfolio_values and self._trade_pnls and self._starting_cash > 0:
+        if portfolio_values.size and n_trades and self._starting_cash > 0:
             total_return = final_value / self._starting_cash
             if total_return > 0:
-                first_date = self._trade_pnls[0]['date']
-                last_date = self._trade_pnls[-1]['date']
+                first_date = trade_dt64[0].item()
+                last_date = trade_dt64[-1].item()
                 days = (last_date - first_date).days
                 years = max(days / 365.25, 0.1)
                 cagr = (pow(total_return, 1.0 / years) - 1.0) * 100.0
@@ -683,128 +864,112 @@ class KOIStrategy(bt.Strategy):
         # =================================================================
         # MONTE CARLO SIMULATION
         # =================================================================
-        if self._trade_pnls and len(self._trade_pnls) >= 20:
+        if n_trades >= 20:
             n_simulations = 10000
-            pnl_list = [t['pnl'] for t in self._trade_pnls]
-            mc_max_drawdowns = []
-            
-            for _ in range(n_simulations):
-                shuffled_pnl = np.random.permutation(pnl_list)
-                equity = self._starting_cash
-                peak = equity
-                max_dd = 0.0
-                
-                for pnl in shuffled_pnl:
-                    equity += pnl
-                    if equity > peak:
-                        peak = equity
-                    dd = (peak - equity) / peak * 100.0 if peak > 0 else 0.0
-                    if dd > max_dd:
-                        max_dd = dd
-                
-                mc_max_drawdowns.append(max_dd)
+            if NUMBA_AVAILABLE:
+                # Seed drawn from the global RNG, so np.random.seed() still pins results
+                seed = int(np.random.randint(0, 2**31 - n_simulations))
+                mc_max_drawdowns = _mc_max_drawdowns(
+                    trade_pnl, n_simulations, seed, float(self._starting_cash)
+                )
+            else:
+                mc_max_drawdowns = _mc_max_drawdowns_blocks(trade_pnl, n_simulations, self._starting_cash)
             
-            mc_max_drawdowns = np.array(mc_max_drawdowns)
-            monte_carlo_dd_95 = np.percentile(mc_max_drawdowns, 95)
-            monte_carlo_dd_99 = np.percentile(mc_max_drawdowns, 99)
+            monte_carlo_dd_95, monte_carlo_dd_99 = np.percentile(mc_max_drawdowns, [95, 99])
         
         # =================================================================
         # YEARLY STATISTICS
         # =================================================================
-        yearly_stats = defaultdict(lambda: {
-            'trades': 0, 'wins': 0, 'pnl': 0.0,
-            'gross_profit': 0.0, 'gross_loss': 0.0
-        })
-        
-        for trade in self._trade_pnls:
-            year = trade['year']
-            yearly_stats[year]['trades'] += 1
-            yearly_stats[year]['pnl'] += trade['pnl']
-            if trade['is_winner']:
-                yearly_stats[year]['wins'] += 1
-                yearly_stats[year]['gross_profit'] += trade['pnl']
-            else:
-                yearly_stats[year]['gross_loss'] += abs(trade['pnl'])
+        # Years as offsets from the first trade year; one bincount per column
+        # (sums in trade order), years without trades are skipped when printing
+        first_year = int(trade_years.min()) if n_trades else 0
+        year_idx = trade_years - first_year
+        n_years = int(year_idx.max()) + 1 if n_trades else 0
+        yr_trades = np.bincount(year_idx, minlength=n_years)
+        yr_wins = np.bincount(year_idx, weights=trade_win, minlength=n_years)
+        yr_pnl = np.bincount(year_idx, weights=trade_pnl, minlength=n_years)
+        yr_gp = np.bincount(year_idx, weights=np.where(trade_win, trade_pnl, 0.0), minlength=n_years)
+        yr_gl = np.bincount(year_idx, weights=np.where(trade_win, 0.0, np.abs(trade_pnl)), minlength=n_years)
         
         # =================================================================
-        # PRINT SUMMARY
+        # PRINT SUMMARY (lines collected, printed in one write)
         # =================================================================
-        print("\n" + "=" * 70)
-        print("=== KOI STRATEGY SUMMARY ===")
-        print("=" * 70)
-        
-        print(f"Total Trades: {self.trades}")
-        print(f"Wins: {self.wins} | Losses: {self.losses}")
-        print(f"Win Rate: {win_rate:.1f}%")
-        print(f"Profit Factor: {profit_factor:.2f}")
-        print(f"Gross Profit: ${self.gross_profit:,.2f}")
-        print(f"Gross Loss: ${self.gross_loss:,.2f}")
-        print(f"Net P&L: ${total_pnl:,.0f}")
-        print(f"Final Value: ${final_value:,.0f}")
+        out = []
+        out.append("\n" + "=" * 70)
+        out.append("=== KOI STRATEGY SUMMARY ===")
+        out.append("=" * 70)
+        
+        out.append(f"Total Trades: {self.trades}")
+        out.append(f"Wins: {self.wins} | Losses: {self.losses}")
+        out.append(f"Win Rate: {win_rate:.1f}%")
+        out.append(f"Profit Factor: {profit_factor:.2f}")
+        out.append(f"Gross Profit: ${self.gross_profit:,.2f}")
+        out.append(f"Gross Loss: ${self.gross_loss:,.2f}")
+        out.append(f"Net P&L: ${total_pnl:,.0f}")
+        out.append(f"Final Value: ${final_value:,.0f}")
         
         # Advanced Metrics with quality indicators
-        print(f"\n{'='*70}")
-        print("ADVANCED RISK METRICS")
-        print(f"{'='*70}")
+        out.append(f"\n{'='*70}")
+        out.append("ADVANCED RISK METRICS")
+        out.append(f"{'='*70}")
         
-        sharpe_status = "Poor" if sharpe_ratio < 0.5 else "Marginal" if sharpe_ratio < 1.0 else "Good" if sharpe_ratio < 2.0 else "Excellent"
-        print(f"Sharpe Ratio:        {sharpe_ratio:>8.2f}  [{sharpe_status}]")
+        sharpe_status = _classify(sharpe_ratio, _RATIO_THRESHOLDS, _SHARPE_LABELS)
+        out.append(f"Sharpe Ratio:        {sharpe_ratio:>8.2f}  [{sharpe_status}]")
         
-        sortino_status = "Poor" if sortino_ratio < 0.5 else "Marginal" if sortino_ratio < 1.0 else "Good" if sortino_ratio < 2.0 else "Excellent"
-        print(f"Sortino Ratio:       {sortino_ratio:>8.2f}  [{sortino_status}]")
+        sortino_status = _classify(sortino_ratio, _RATIO_THRESHOLDS, _SHARPE_LABELS)
+        out.append(f"Sortino Ratio:       {sortino_ratio:>8.2f}  [{sortino_status}]")
         
-        cagr_status = "Below Market" if cagr < 8 else "Market-level" if cagr < 12 else "Good" if cagr < 20 else "Exceptional"
-        print(f"CAGR:                {cagr:>7.2f}%  [{cagr_status}]")
+        cagr_status = _classify(cagr, _CAGR_THRESHOLDS, _CAGR_LABELS)
+        out.append(f"CAGR:                {cagr:>7.2f}%  [{cagr_status}]")
         
-        dd_status = "Excellent" if max_drawdown_pct < 10 else "Acceptable" if max_drawdown_pct < 20 else "High" if max_drawdown_pct < 30 else "Dangerous"
-        print(f"Max Drawdown:        {max_drawdown_pct:>7.2f}%  [{dd_status}]")
+        dd_status = _classify(max_drawdown_pct, _DD_THRESHOLDS, _DD_LABELS)
+        out.append(f"Max Drawdown:        {max_drawdown_pct:>7.2f}%  [{dd_status}]")
         
-        calmar_status = "Poor" if calmar_ratio < 0.5 else "Acceptable" if calmar_ratio < 1.0 else "Good" if calmar_ratio < 2.0 else "Excellent"
-        print(f"Calmar Ratio:        {calmar_ratio:>8.2f}  [{calmar_status}]")
+        calmar_status = _classify(calmar_ratio, _RATIO_THRESHOLDS, _CALMAR_LABELS)
+        out.append(f"Calmar Ratio:        {calmar_ratio:>8.2f}  [{calmar_status}]")
         
         # Monte Carlo Analysis
         if monte_carlo_dd_95 > 0:
             mc_ratio = monte_carlo_dd_95 / max_drawdown_pct if max_drawdown_pct > 0 else 0
-            mc_status = "Good" if mc_ratio < 1.5 else "Caution" if mc_ratio < 2.0 else "Warning"
-            print(f"\nMonte Carlo Analysis (10,000 simulations):")
-            print(f"  95th Percentile DD: {monte_carlo_dd_95:>6.2f}%  [{mc_status}]")
-            print(f"  99th Percentile DD: {monte_carlo_dd_99:>6.2f}%")
-            print(f"  Historical vs MC95: {mc_ratio:.2f}x")
+            mc_status = _classify(mc_ratio, _MC_THRESHOLDS, _MC_LABELS)
+            out.append(f"\nMonte Carlo Analysis (10,000 simulations):")
+            out.append(f"  95th Percentile DD: {monte_carlo_dd_95:>6.2f}%  [{mc_status}]")
+            out.append(f"  99th Percentile DD: {monte_carlo_dd_99:>6.2f}%")
+            out.append(f"  Historical vs MC95: {mc_ratio:.2f}x")
         
-        print(f"{'='*70}")
+        out.append(f"{'='*70}")
         
         # Yearly Statistics
-        print(f"\n{'='*70}")
-        print("YEARLY STATISTICS")
-        print(f"{'='*70}")
-        print(f"{'Year':<6} {'Trades':>7} {'WR%':>7} {'PF':>7} {'PnL':>12}")
-        print(f"{'-'*45}")
+        out.append(f"\n{'='*70}")
+        out.append("YEARLY STATISTICS")
+        out.append(f"{'='*70}")
+        out.append(f"{'Year':<6} {'Trades':>7} {'WR%':>7} {'PF':>7} {'PnL':>12}")
+        out.append(f"{'-'*45}")
         
-        for year in sorted(yearly_stats.keys()):
-            stats = yearly_stats[year]
-            wr = (stats['wins'] / stats['trades'] * 100) if stats['trades'] > 0 else 0
-            year_pf = (stats['gross_profit'] / stats['gross_loss']) if stats['gross_loss'] > 0 else float('inf')
-            print(f"{year:<6} {stats['trades']:>7} {wr:>6.1f}% {year_pf:>7.2f} ${stats['pnl']:>10,.0f}")
+        for k in np.flatnonzero(yr_trades).tolist():
+            year_trades = int(yr_trades[k])
+            wr = yr_wins[k] / year_trades * 100
+            year_pf = (yr_gp[k] / yr_gl[k]) if yr_gl[k] > 0 else float('inf')
+            out.append(f"{first_year + k:<6} {year_trades:>7} {wr:>6.1f}% {year_pf:>7.2f} ${yr_pnl[k]:>10,.0f}")
         
-        print(f"{'='*70}")
+        out.append(f"{'='*70}")
         
         # Active filters
-        print(f"\n{'='*70}")
-        print("ACTIVE FILTERS")
-        print(f"{'='*70}")
+        out.append(f"\n{'='*70}")
+        out.append("ACTIVE FILTERS")
+        out.append(f"{'='*70}")
         if self.p.use_time_filter:
-            print(f"  Time Filter: hours {list(self.p.allowed_hours)}")
+            out.append(f"  Time Filter: hours {list(self.p.allowed_hours)}")
         if self.p.use_day_filter:
-            print(f"  Day Filter: days {list(self.p.allowed_days)}")
+            out.append(f"  Day Filter: days {list(self.p.allowed_days)}")
         if self.p.use_sl_pips_filter:
-            print(f"  SL Pips Filter: {self.p.sl_pips_min}-{self.p.sl_pips_max}")
+            out.append(f"  SL Pips Filter: {self.p.sl_pips_min}-{self.p.sl_pips_max}")
         if self.p.use_atr_filter:
-            print(f"  ATR Filter: {self.p.atr_min}-{self.p.atr_max}")
+            out.append(f"  ATR Filter: {self.p.atr_min}-{self.p.atr_max}")
         if not any([self.p.use_time_filter, self.p.use_day_filter, self.p.use_sl_pips_filter, self.p.use_atr_filter]):
-            print("  No filters active")
-        print("=" * 70)
+            out.append("  No filters active")
+        out.append("=" * 70)
+        print("\n".join(out))
         
-        # Close report file
-        if self.trade_report_file:
-            self.trade_report_file.close()
-            print(f"\nTrade report saved.")
\ No newline at end of file
+        # Write report file
+        self._write_trade_report()
\ No newline at end of file
@@ -44,6 +44,7 @@ from lib.filters import (
     check_sl_pips_filter,
 )
 from lib.position_sizing import calculate_position_size
+from lib.fast_indicators import atr, is_preloaded, line_values
 
 
 class SessionMarker(bt.Indicator):
@@ -152,7 +153,22 @@ class LUYTENStrategy(bt.Strategy):
     # =====================================================================
 
     def __init__(self):
-        self.atr = bt.ind.ATR(self.data, period=self.p.atr_length)
+        # ATR, indexed by data bar in next(): precomputed once as a plain list
+        # when the feed is preloaded (same values as bt.ind.ATR, see
+        # lib/fast_indicators.py); resampled runs aren't preloaded, so they
+        # keep the indicator and read its line buffer as it grows
+        d = self.data
+        if is_preloaded(d):
+            self._atr_arr = atr(
+                line_values(d.high), line_values(d.low), line_values(d.close),
+                self.p.atr_length,
+            ).tolist()
+        else:
+            self.atr = bt.ind.ATR(d, period=self.p.atr_length)
+            self._atr_arr = self.atr.lines[0].array
+        # First bar with a valid ATR (the minperiod bt.ind.ATR gave next())
+        self._warmup = self.p.atr_length + 1
+        self._i = 0  # Current bar index into _atr_arr
         self.session_marker = SessionMarker(self.data)
 
         # HTF ROC filter (needs datas[1] from resampledata in run_backtest)
@@ -440,7 +456,7 @@ class LUYTENStrategy(bt.Strategy):
     def _get_average_atr(self):
         """Get average ATR over configured period."""
         if len(self.atr_history) < self.p.atr_avg_period:
-            val = float(self.atr[0])
+            val = self._atr_arr[self._i]
             return val if not math.isnan(val) else 0
         recent = self.atr_history[-self.p.atr_avg_period:]
         return sum(recent) / len(recent)
@@ -610,10 +626,15 @@ class LUYTENStrategy(bt.Strategy):
     # =====================================================================
 
     def next(self):
+        # ATR warm-up (backtrader only gates next() on the remaining
+        # indicator objects' minperiod)
+        if len(self.data) < self._warmup:
+            return
+        self._i = len(self.data) - 1
         self._portfolio_values.append(self.broker.get_value())
 
         # Track ATR
-        current_atr = float(self.atr[0]) if not math.isnan(float(self.atr[0])) else 0
+        current_atr = self._atr_arr[self._i]
         if current_atr > 0:
             self.atr_history.append(current_atr)
 
@@ -1081,7 +1102,7 @@ class LUYTENStrategy(bt.Strategy):
         })
 
         # Determine exit reason
-        last_reason = getattr(self, 'last_exit_reason', None)
+        last_reason = self.last_exit_reason
         if last_reason and last_reason in ('EOD_CLOSE',):
             reason = last_reason
         elif pnl > 0:
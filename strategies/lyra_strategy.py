@@ -670,10 +670,9 @@ class LYRAStrategy(bt.Strategy):
     def _update_plot_lines(self, entry=None, sl=None, tp=None):
         if not self.entry_exit_lines:
             return
-        nan = float('nan')
-        self.entry_exit_lines.lines.entry[0] = entry if entry is not None else nan
-        self.entry_exit_lines.lines.stop_loss[0] = sl if sl is not None else nan
-        self.entry_exit_lines.lines.take_profit[0] = tp if tp is not None else nan
+        self.entry_exit_lines.lines.entry[0] = entry if entry is not None else math.nan
+        self.entry_exit_lines.lines.stop_loss[0] = sl if sl is not None else math.nan
+        self.entry_exit_lines.lines.take_profit[0] = tp if tp is not None else math.nan
 
     def _execute_exit(self, dt, reason):
         self.last_exit_reason = reason
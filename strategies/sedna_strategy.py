@@ -19,16 +19,16 @@ EXIT SYSTEM:
 """
 from __future__ import annotations
 import math
+from array import array
 from pathlib import Path
 from datetime import datetime
-from collections import defaultdict
 
 import backtrader as bt
 import numpy as np
 
 from lib.filters import (
-    check_time_filter,
-    check_day_filter,
+    hour_bitmask,
+    day_bitmask,
     check_atr_filter,
     check_sl_pips_filter,
     check_efficiency_ratio_filter,
@@ -37,6 +37,11 @@ from lib.filters import (
 )
 from lib.indicators import EfficiencyRatio, KAMA
 from lib.position_sizing import calculate_position_size
+from lib.fast_indicators import ema, atr, is_preloaded, line_values
+
+
+def _noop(*args, **kwargs):
+    """Stand-in for the trade-report hooks when reporting is off."""
 
 
 class EntryExitLines(bt.Indicator):
@@ -48,7 +53,9 @@ class EntryExitLines(bt.Indicator):
     - Stop Loss level (red dashed)
     - Take Profit level (blue dashed)
     
-    Lines persist until position is closed.
+    Lines persist until position is closed. The strategy only records
+    (start, end, levels) segments on fills and writes them into the line
+    buffers in one NumPy pass at the end of the run.
     """
     lines = ('entry', 'stop_loss', 'take_profit')
     
@@ -66,7 +73,7 @@ class EntryExitLines(bt.Indicator):
         pass
     
     def next(self):
-        # Values are set externally by the strategy
+        # Values are filled in bulk by the strategy in stop()
         pass
 
 
@@ -182,19 +189,35 @@ class SEDNAStrategy(bt.Strategy):
             slow=self.p.kama_slow
         )
         
-        # EMA on HL2 for KAMA comparison (period=1 = raw HL2)
-        self.hl2_ema = bt.ind.EMA(self.hl2, period=self.p.hl2_ema_period)
-        self.hl2_ema.plotinfo.subplot = False  # Plot on price chart
-        self.hl2_ema.plotinfo.plotname = 'HL2 EMA'
-        
-        # CCI on HL2 (instead of HLC3)
-        # CCI = (HL2 - SMA(HL2)) / (0.015 * Mean Deviation)
-        self.cci_sma = bt.ind.SMA(self.hl2, period=self.p.cci_period)
-        self.cci_sma.plotinfo.plot = False  # Hide from plot (internal use)
-        self.cci = bt.ind.CCI(d, period=self.p.cci_period)  # We'll override calculation
-        
-        # ATR
-        self.atr = bt.ind.ATR(d, period=self.p.atr_length)
+        # EMA on HL2 (period=1 = raw HL2) and ATR, indexed by data bar in
+        # next(): precomputed once as plain lists when the feed is preloaded
+        # (same values as bt.ind.EMA/ATR, see lib/fast_indicators.py);
+        # resampled runs aren't preloaded, so they keep the indicators and read
+        # their line buffers as they grow
+        if is_preloaded(d):
+            high = line_values(d.high)
+            low = line_values(d.low)
+            close = line_values(d.close)
+            self._hl2_ema_arr = ema((high + low) / 2.0, self.p.hl2_ema_period).tolist()
+            self._atr_arr = atr(high, low, close, self.p.atr_length).tolist()
+        else:
+            self.hl2_ema = bt.ind.EMA(self.hl2, period=self.p.hl2_ema_period)
+            self.hl2_ema.plotinfo.subplot = False  # Plot on price chart
+            self.hl2_ema.plotinfo.plotname = 'HL2 EMA'
+            self.atr = bt.ind.ATR(d, period=self.p.atr_length)
+            self._hl2_ema_arr = self.hl2_ema.lines[0].array
+            self._atr_arr = self.atr.lines[0].array
+        
+        # CCI on HL2 (instead of HLC3) is computed per bar in _calculate_cci_hl2()
+        
+        # First bar where the precomputed values and the CCI window are valid
+        # (the minperiod backtrader derived from the bt.ind.EMA/CCI/ATR objects
+        # these replace: EMA=period, CCI=2*period-1, ATR=period+1)
+        self._warmup = max(
+            self.p.hl2_ema_period,
+            2 * self.p.cci_period - 1,
+            self.p.atr_length + 1,
+        )
         
         # HTF Efficiency Ratio (scaled period to simulate higher timeframe)
         # Example: 5m data, HTF=15m -> multiplier=3, ER period=10*3=30 bars
@@ -211,6 +234,24 @@ class SEDNAStrategy(bt.Strategy):
             self.entry_exit_lines = EntryExitLines(d)
         else:
             self.entry_exit_lines = None
+        # Plot segments (start_bar, end_bar, entry, sl, tp), end exclusive
+        self._plot_segments = []
+        self._plot_start = None
+        
+        # Raw line buffers, indexed by bar (self._i) in the per-bar checks
+        # instead of going through LineBuffer.__getitem__ + float()
+        self._open_arr = d.open.array
+        self._high_arr = d.high.array
+        self._low_arr = d.low.array
+        self._close_arr = d.close.array
+        self._kama_arr = self.kama.lines[0].array
+        self._htf_er_arr = self.htf_er.lines[0].array if self.htf_er is not None else None
+        self._i = 0  # Current bar index into the arrays above
+        self._cci_now = 0.0  # CCI(HL2) of the last _check_cci_condition() call
+        
+        # Time/day filters as bitmasks, fixed for the run (one shift per check)
+        self._hour_mask = hour_bitmask(self.p.allowed_hours, self.p.use_time_filter)
+        self._day_mask = day_bitmask(self.p.allowed_days, self.p.use_day_filter)
         
         # Orders
         self.order = None
@@ -250,7 +291,9 @@ class SEDNAStrategy(bt.Strategy):
         self.gross_profit = 0.0
         self.gross_loss = 0.0
         self._portfolio_values = []
-        self._trade_pnls = []
+        # Closed trades as parallel columns (close datetime, P&L)
+        self._trade_dates = []
+        self._trade_pnl = []
         self._starting_cash = self.broker.get_cash()
         self._first_bar_dt = None
         self._last_bar_dt = None
@@ -261,6 +304,9 @@ class SEDNAStrategy(bt.Strategy):
         self._current_trade_idx = None  # Index of active trade in trade_reports
         self._entry_fill_bar = -1  # Bar where buy filled (skip EOD close on same bar)
         self._init_trade_reporting()
+        if self.trade_report_file is None:
+            # Reporting off (or init failed): skip the per-trade hooks entirely
+            self._record_trade_entry = self._record_trade_exit = _noop
 
     # =========================================================================
     # CCI ON HL2 CALCULATION
@@ -268,36 +314,33 @@ class SEDNAStrategy(bt.Strategy):
     
     def _calculate_cci_hl2(self) -> float:
         """Calculate CCI using HL2 instead of typical price (HLC3)."""
-        try:
-            # Get HL2 values for period
-            hl2_values = []
-            for i in range(self.p.cci_period):
-                h = float(self.data.high[-i])
-                l = float(self.data.low[-i])
-                hl2_values.append((h + l) / 2.0)
-            
-            # Current HL2
-            current_hl2 = (float(self.data.high[0]) + float(self.data.low[0])) / 2.0
-            
-            # SMA of HL2
-            sma_hl2 = sum(hl2_values) / len(hl2_values)
-            
-            # Mean deviation
-            mean_dev = sum(abs(v - sma_hl2) for v in hl2_values) / len(hl2_values)
-            
-            if mean_dev == 0:
-                return 0.0
-            
-            # CCI
-            cci = (current_hl2 - sma_hl2) / (0.015 * mean_dev)
-            return cci
-        except:
+        # Get HL2 values for period (current bar first)
+        highs = self._high_arr
+        lows = self._low_arr
+        i = self._i
+        hl2_values = [(highs[k] + lows[k]) / 2.0 for k in range(i, i - self.p.cci_period, -1)]
+        
+        # Current HL2
+        current_hl2 = hl2_values[0]
+        
+        # SMA of HL2
+        sma_hl2 = sum(hl2_values) / len(hl2_values)
+        
+        # Mean deviation
+        mean_dev = sum(abs(v - sma_hl2) for v in hl2_values) / len(hl2_values)
+        
+        if mean_dev == 0:
             return 0.0
+        
+        # CCI
+        cci = (current_hl2 - sma_hl2) / (0.015 * mean_dev)
+        return cci
     
     def _get_average_atr(self) -> float:
         """Get average ATR over the specified period."""
         if len(self.atr_history) < self.p.atr_avg_period:
-            return float(self.atr[0]) if not math.isnan(float(self.atr[0])) else 0
+            current_atr = self._atr_arr[self._i]
+            return current_atr if not math.isnan(current_atr) else 0
         
         recent_atr = self.atr_history[-self.p.atr_avg_period:]
         return sum(recent_atr) / len(recent_atr)
@@ -315,25 +358,29 @@ class SEDNAStrategy(bt.Strategy):
             report_dir.mkdir(exist_ok=True)
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             report_path = report_dir / f"SEDNA_trades_{timestamp}.txt"
-            self.trade_report_file = open(report_path, 'w', encoding='utf-8')
-            self.trade_report_file.write("=== SEDNA STRATEGY TRADE REPORT ===\n")
-            self.trade_report_file.write(f"Generated: {datetime.now()}\n")
-            self.trade_report_file.write(f"KAMA: period={self.p.kama_period}, fast={self.p.kama_fast}, slow={self.p.kama_slow}\n")
+            # Large buffer: events are written whole and flushed on close in stop()
+            self.trade_report_file = open(report_path, 'w', encoding='utf-8', buffering=1 << 16)
+            lines = [
+                "=== SEDNA STRATEGY TRADE REPORT ===\n",
+                f"Generated: {datetime.now()}\n",
+                f"KAMA: period={self.p.kama_period}, fast={self.p.kama_fast}, slow={self.p.kama_slow}\n",
+            ]
             if self.p.use_cci_filter:
-                self.trade_report_file.write(f"CCI (HL2): {self.p.cci_period}/{self.p.cci_threshold}\n")
+                lines.append(f"CCI (HL2): {self.p.cci_period}/{self.p.cci_threshold}\n")
             else:
-                self.trade_report_file.write("CCI: DISABLED\n")
-            self.trade_report_file.write(f"Breakout: {self.p.breakout_level_offset_pips}pips, {self.p.breakout_window_candles}bars\n")
-            self.trade_report_file.write(f"SL: {self.p.atr_sl_multiplier}x ATR | TP: {self.p.atr_tp_multiplier}x ATR\n")
+                lines.append("CCI: DISABLED\n")
+            lines.append(f"Breakout: {self.p.breakout_level_offset_pips}pips, {self.p.breakout_window_candles}bars\n")
+            lines.append(f"SL: {self.p.atr_sl_multiplier}x ATR | TP: {self.p.atr_tp_multiplier}x ATR\n")
             if self.p.use_sl_pips_filter:
-                self.trade_report_file.write(f"SL Filter: {self.p.sl_pips_min}-{self.p.sl_pips_max} pips\n")
+                lines.append(f"SL Filter: {self.p.sl_pips_min}-{self.p.sl_pips_max} pips\n")
             if self.p.use_atr_filter:
-                self.trade_report_file.write(f"ATR Filter: {self.p.atr_min}-{self.p.atr_max} (avg {self.p.atr_avg_period})\n")
+                lines.append(f"ATR Filter: {self.p.atr_min}-{self.p.atr_max} (avg {self.p.atr_avg_period})\n")
             if self.p.use_time_filter:
-                self.trade_report_file.write(f"Time Filter: {list(self.p.allowed_hours)}\n")
+                lines.append(f"Time Filter: {list(self.p.allowed_hours)}\n")
             if self.p.use_htf_filter:
-                self.trade_report_file.write(f"HTF Filter: ER(period={self.p.htf_er_period}, TF={self.p.htf_timeframe_minutes}m) >= {self.p.htf_er_threshold}\n")
-            self.trade_report_file.write("\n")
+                lines.append(f"HTF Filter: ER(period={self.p.htf_er_period}, TF={self.p.htf_timeframe_minutes}m) >= {self.p.htf_er_threshold}\n")
+            lines.append("\n")
+            self.trade_report_file.write("".join(lines))
             print(f"Trade report: {report_path}")
         except Exception as e:
             print(f"Trade reporting init failed: {e}")
@@ -355,17 +402,18 @@ class SEDNAStrategy(bt.Strategy):
             }
             self.trade_reports.append(entry)
             self._current_trade_idx = len(self.trade_reports) - 1
-            self.trade_report_file.write(f"ENTRY #{len(self.trade_reports)}\n")
-            self.trade_report_file.write(f"Time: {dt.strftime('%Y-%m-%d %H:%M:%S')}\n")
-            self.trade_report_file.write(f"Entry Price: {entry_price:.5f}\n")
-            self.trade_report_file.write(f"Stop Loss: {self.stop_level:.5f}\n")
-            self.trade_report_file.write(f"Take Profit: {self.take_level:.5f}\n")
-            self.trade_report_file.write(f"SL Pips: {sl_pips:.1f}\n")
-            self.trade_report_file.write(f"ATR (avg): {atr:.6f}\n")
-            if self.p.use_cci_filter:
-                self.trade_report_file.write(f"CCI (HL2): {cci:.2f}\n")
-            self.trade_report_file.write("-" * 50 + "\n\n")
-            self.trade_report_file.flush()
+            cci_line = f"CCI (HL2): {cci:.2f}\n" if self.p.use_cci_filter else ""
+            self.trade_report_file.write(
+                f"ENTRY #{len(self.trade_reports)}\n"
+                f"Time: {dt.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"Entry Price: {entry_price:.5f}\n"
+                f"Stop Loss: {self.stop_level:.5f}\n"
+                f"Take Profit: {self.take_level:.5f}\n"
+                f"SL Pips: {sl_pips:.1f}\n"
+                f"ATR (avg): {atr:.6f}\n"
+                f"{cci_line}"
+                + "-" * 50 + "\n\n"
+            )
         except Exception as e:
             pass
 
@@ -381,12 +429,13 @@ class SEDNAStrategy(bt.Strategy):
             last_trade['pnl'] = pnl
             last_trade['exit_reason'] = reason
             last_trade['exit_time'] = dt
-            self.trade_report_file.write(f"EXIT #{len(self.trade_reports)}\n")
-            self.trade_report_file.write(f"Time: {dt.strftime('%Y-%m-%d %H:%M:%S')}\n")
-            self.trade_report_file.write(f"Exit Reason: {reason}\n")
-            self.trade_report_file.write(f"P&L: ${pnl:.2f}\n")
-            self.trade_report_file.write("=" * 80 + "\n\n")
-            self.trade_report_file.flush()
+            self.trade_report_file.write(
+                f"EXIT #{len(self.trade_reports)}\n"
+                f"Time: {dt.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"Exit Reason: {reason}\n"
+                f"P&L: ${pnl:.2f}\n"
+                + "=" * 80 + "\n\n"
+            )
             self._current_trade_idx = None
         except:
             pass
@@ -395,23 +444,31 @@ class SEDNAStrategy(bt.Strategy):
     # PLOT LINES UPDATE
     # =========================================================================
     
-    def _update_plot_lines(self, entry_price=None, stop_level=None, take_level=None):
+    def _fill_plot_lines(self):
         """
-        Update entry/exit plot lines on chart.
-        
-        Args:
-            entry_price: Entry price level (or None to clear)
-            stop_level: Stop loss level (or None to clear)
-            take_level: Take profit level (or None to clear)
+        Write the recorded entry/SL/TP segments into the plot line buffers.
+
+        One NumPy fill per line at the end of the run replaces three line
+        writes on every bar of an open position. Bars outside a segment
+        stay NaN, which hides the line when flat.
         """
         if not self.entry_exit_lines:
             return
-        
-        # Use NaN to hide line when no position
-        nan = float('nan')
-        self.entry_exit_lines.lines.entry[0] = entry_price if entry_price else nan
-        self.entry_exit_lines.lines.stop_loss[0] = stop_level if stop_level else nan
-        self.entry_exit_lines.lines.take_profit[0] = take_level if take_level else nan
+        lines = self.entry_exit_lines.lines
+        n_bars = len(lines.entry.array)
+        if self._plot_start is not None:  # Position still open at the end
+            self._plot_segments.append(
+                (self._plot_start, n_bars, self.last_entry_price, self.stop_level, self.take_level)
+            )
+            self._plot_start = None
+
+        cols = np.full((3, n_bars), np.nan)
+        for start, end, entry_price, stop_level, take_level in self._plot_segments:
+            cols[0, start:end] = entry_price or np.nan
+            cols[1, start:end] = stop_level or np.nan
+            cols[2, start:end] = take_level or np.nan
+        for line, col in zip((lines.entry, lines.stop_loss, lines.take_profit), cols):
+            line.array[:] = array('d', col.tobytes())
 
     # =========================================================================
     # DATETIME HELPER
@@ -432,32 +489,25 @@ class SEDNAStrategy(bt.Strategy):
     
     def _check_bullish_engulfing(self) -> bool:
         """Check for bullish engulfing pattern (same as KOI)."""
-        try:
-            prev_open = float(self.data.open[-1])
-            prev_close = float(self.data.close[-1])
-            if prev_close >= prev_open:
-                return False
-            
-            curr_open = float(self.data.open[0])
-            curr_close = float(self.data.close[0])
-            if curr_close <= curr_open:
-                return False
-            
-            if curr_open > prev_close or curr_close < prev_open:
-                return False
-            
-            return True
-        except:
+        i = self._i
+        prev_open = self._open_arr[i - 1]
+        prev_close = self._close_arr[i - 1]
+        if prev_close >= prev_open:
+            return False
+        
+        curr_open = self._open_arr[i]
+        curr_close = self._close_arr[i]
+        if curr_close <= curr_open:
             return False
+        
+        if curr_open > prev_close or curr_close < prev_open:
+            return False
+        
+        return True
 
     def _check_kama_condition(self) -> bool:
         """Check if EMA(HL2) is above KAMA (replaces 5 EMAs ascending)."""
-        try:
-            hl2_ema_value = float(self.hl2_ema[0])
-            kama_value = float(self.kama[0])
-            return hl2_ema_value > kama_value
-        except:
-            return False
+        return self._hl2_ema_arr[self._i] > self._kama_arr[self._i]
 
     def _check_kama_exit_condition(self) -> bool:
         """
@@ -467,27 +517,19 @@ class SEDNAStrategy(bt.Strategy):
         - Entry: EMA > KAMA (bullish)
         - Exit: KAMA > EMA (bearish / trend lost)
         """
-        try:
-            hl2_ema_value = float(self.hl2_ema[0])
-            kama_value = float(self.kama[0])
-            return kama_value > hl2_ema_value
-        except:
-            return False
+        return self._kama_arr[self._i] > self._hl2_ema_arr[self._i]
 
     def _check_cci_condition(self) -> bool:
         """Check if CCI(HL2) > threshold and < max_threshold."""
         if not self.p.use_cci_filter:
             return True  # CCI disabled, always pass
         
-        try:
-            cci_val = self._calculate_cci_hl2()
-            if cci_val <= self.p.cci_threshold:
-                return False
-            if cci_val >= self.p.cci_max_threshold:
-                return False
-            return True
-        except:
+        cci_val = self._cci_now = self._calculate_cci_hl2()  # Reused by next() on a pass
+        if cci_val <= self.p.cci_threshold:
+            return False
+        if cci_val >= self.p.cci_max_threshold:
             return False
+        return True
 
     def _check_htf_filter(self) -> bool:
         """
@@ -502,26 +544,21 @@ class SEDNAStrategy(bt.Strategy):
         if not self.p.use_htf_filter:
             return True
         
-        try:
-            # Condition 1: ER >= threshold (trending market)
-            if self.htf_er is not None:
-                er_value = float(self.htf_er[0])
-                if not check_efficiency_ratio_filter(
-                    er_value=er_value,
-                    threshold=self.p.htf_er_threshold,
-                    enabled=True
-                ):
-                    return False
-            
-            # Condition 2: Close > KAMA (bullish direction)
-            close_price = float(self.data.close[0])
-            kama_value = float(self.kama[0])
-            if close_price <= kama_value:
+        # Condition 1: ER >= threshold (trending market)
+        if self._htf_er_arr is not None:
+            er_value = self._htf_er_arr[self._i]
+            if not check_efficiency_ratio_filter(
+                er_value=er_value,
+                threshold=self.p.htf_er_threshold,
+                enabled=True
+            ):
                 return False
-            
-            return True
-        except:
-            return True  # On error, allow entry
+        
+        # Condition 2: Close > KAMA (bullish direction)
+        if self._close_arr[self._i] <= self._kama_arr[self._i]:
+            return False
+        
+        return True
 
     def _check_pullback_condition(self) -> bool:
         """
@@ -600,29 +637,33 @@ class SEDNAStrategy(bt.Strategy):
         1. HTF TREND: ER >= threshold AND Close > KAMA
         2. PULLBACK: N bars without new HH, respects KAMA
         3. BREAKOUT: Handled in state machine (High > pullback HH + buffer)
+        
+        Checks run cheapest / most selective first: session bits, the HTF
+        array reads, the optional CCI band (rejects most bars when enabled),
+        then the pullback scan. Only a full pass uses pullback_data.
         """
         if self.position or self.order:
             return False
         
-        if not check_time_filter(dt, self.p.allowed_hours, self.p.use_time_filter):
+        if not (self._hour_mask >> dt.hour) & 1:
             return False
         
-        if not check_day_filter(dt, self.p.allowed_days, self.p.use_day_filter):
+        if not (self._day_mask >> dt.weekday()) & 1:
             return False
         
         # Phase 1: HTF filter (ER >= threshold AND Close > KAMA)
         if not self._check_htf_filter():
             return False
         
+        # CCI condition (optional, legacy support)
+        if not self._check_cci_condition():
+            return False
+        
         # Phase 2: Pullback detection (N bars without new HH, respects KAMA)
         if not self._check_pullback_condition():
             return False
         
         # Phase 3: Breakout handled in state machine
-        # CCI condition (optional, legacy support)
-        if not self._check_cci_condition():
-            return False
-        
         return True
 
     # =========================================================================
@@ -644,26 +685,24 @@ class SEDNAStrategy(bt.Strategy):
         
         Maintains rolling window of prices for reusable pullback filter.
         """
-        try:
-            # Get current bar values
-            current_high = float(self.data.high[0])
-            current_low = float(self.data.low[0])
-            current_close = float(self.data.close[0])
-            current_kama = float(self.kama[0])
-            
-            # Append to history
-            self.price_history['highs'].append(current_high)
-            self.price_history['lows'].append(current_low)
-            self.price_history['closes'].append(current_close)
-            self.price_history['kama'].append(current_kama)
-            
-            # Keep only what we need (max_bars + 5 buffer)
-            max_len = self.p.pullback_max_bars + 10
-            for key in self.price_history:
-                if len(self.price_history[key]) > max_len:
-                    self.price_history[key] = self.price_history[key][-max_len:]
-        except:
-            pass  # Skip on error (warmup period)
+        # Get current bar values
+        i = self._i
+        current_high = self._high_arr[i]
+        current_low = self._low_arr[i]
+        current_close = self._close_arr[i]
+        current_kama = self._kama_arr[i]
+        
+        # Append to history
+        self.price_history['highs'].append(current_high)
+        self.price_history['lows'].append(current_low)
+        self.price_history['closes'].append(current_close)
+        self.price_history['kama'].append(current_kama)
+        
+        # Keep only what we need (max_bars + 5 buffer)
+        max_len = self.p.pullback_max_bars + 10
+        for key in self.price_history:
+            if len(self.price_history[key]) > max_len:
+                self.price_history[key] = self.price_history[key][-max_len:]
 
     # =========================================================================
     # EXIT EXECUTION
@@ -692,7 +731,7 @@ class SEDNAStrategy(bt.Strategy):
         
         if self.p.print_signals:
             kama_val = float(self.kama[0])
-            ema_val = float(self.hl2_ema[0])
+            ema_val = self._hl2_ema_arr[self._i]
             print(f">>> SEDNA KAMA EXIT {dt:%Y-%m-%d %H:%M} "
                   f"KAMA={kama_val:.5f} > EMA={ema_val:.5f}")
 
@@ -706,7 +745,7 @@ class SEDNAStrategy(bt.Strategy):
         if not check_atr_filter(atr_avg, self.p.atr_min, self.p.atr_max, self.p.use_atr_filter):
             return
         
-        entry_price = float(self.data.close[0])
+        entry_price = self._close_arr[self._i]
         self.stop_level = entry_price - (atr_avg * self.p.atr_sl_multiplier)
         self.take_level = entry_price + (atr_avg * self.p.atr_tp_multiplier)
         
@@ -754,10 +793,16 @@ class SEDNAStrategy(bt.Strategy):
     
     def next(self):
         """Main loop with breakout window state machine."""
+        # Warm-up: backtrader gates next() on KAMA/ER minperiod only, the
+        # guard covers the precomputed arrays and the CCI window, so the checks
+        # below always have a full window and the previous bar (no try/except)
+        if len(self.data) < self._warmup:
+            return
+        self._i = len(self.data) - 1
         self._portfolio_values.append(self.broker.get_value())
         
-        # Track ATR history for averaging
-        current_atr = float(self.atr[0]) if not math.isnan(float(self.atr[0])) else 0
+        # Track ATR history for averaging (NaN during warm-up fails the > 0 test)
+        current_atr = self._atr_arr[self._i]
         if current_atr > 0:
             self.atr_history.append(current_atr)
         
@@ -782,13 +827,6 @@ class SEDNAStrategy(bt.Strategy):
             if self.state != "SCANNING":
                 self._reset_breakout_state()
             
-            # Update plot lines while position is open
-            self._update_plot_lines(
-                entry_price=self.last_entry_price,
-                stop_level=self.stop_level,
-                take_level=self.take_level
-            )
-            
             # Check KAMA exit condition (if enabled)
             if self.p.use_kama_exit and self._check_kama_exit_condition():
                 self._execute_kama_exit(dt)
@@ -803,7 +841,7 @@ class SEDNAStrategy(bt.Strategy):
         if self.p.use_breakout_window:
             if self.state == "SCANNING":
                 if self._check_entry_conditions(dt):
-                    cci_now = self._calculate_cci_hl2() if self.p.use_cci_filter else 0
+                    cci_now = self._cci_now if self.p.use_cci_filter else 0
                     
                     self.pattern_detected_bar = current_bar
                     offset = self.p.breakout_level_offset_pips * self.p.pip_value
@@ -812,7 +850,7 @@ class SEDNAStrategy(bt.Strategy):
                     if self.pullback_data and self.pullback_data.get('breakout_level'):
                         self.breakout_level = self.pullback_data['breakout_level'] + offset
                     else:
-                        self.breakout_level = float(self.data.high[0]) + offset
+                        self.breakout_level = self._high_arr[self._i] + offset
                     
                     self.pattern_atr = atr_avg  # Use average ATR
                     self.pattern_cci = cci_now
@@ -827,14 +865,14 @@ class SEDNAStrategy(bt.Strategy):
                     return
                 
                 # Check breakout using standard function
-                current_high = float(self.data.high[0])
+                current_high = self._high_arr[self._i]
                 if check_pullback_breakout(current_high, self.breakout_level, buffer_pips=0, pip_value=self.p.pip_value):
                     self._execute_entry(dt, self.pattern_atr, self.pattern_cci)
                     self._reset_breakout_state()
                     return
         else:
             if self._check_entry_conditions(dt):
-                cci_now = self._calculate_cci_hl2() if self.p.use_cci_filter else 0
+                cci_now = self._cci_now if self.p.use_cci_filter else 0
                 self._execute_entry(dt, atr_avg, cci_now)
 
     # =========================================================================
@@ -851,6 +889,8 @@ class SEDNAStrategy(bt.Strategy):
                 self.last_entry_price = order.executed.price
                 self.last_entry_bar = len(self)
                 self._entry_fill_bar = len(self)  # Track fill bar for EOD close race prevention
+                if self.entry_exit_lines:
+                    self._plot_start = len(self) - 1
                 
                 if self.p.print_signals:
                     print(f"[OK] SEDNA BUY EXECUTED at {order.executed.price:.5f} size={order.executed.size}")
@@ -900,8 +940,13 @@ class SEDNAStrategy(bt.Strategy):
                 if self.p.print_signals:
                     print(f"[EXIT] at {order.executed.price:.5f} reason={exit_reason}")
 
-                # Clear plot lines when position closes
-                self._update_plot_lines(None, None, None)
+                # Close the plot segment when position closes
+                if self._plot_start is not None:
+                    self._plot_segments.append(
+                        (self._plot_start, len(self) - 1, self.last_entry_price,
+                         self.stop_level, self.take_level)
+                    )
+                    self._plot_start = None
                 
                 self.stop_order = None
                 self.limit_order = None
@@ -917,12 +962,13 @@ class SEDNAStrategy(bt.Strategy):
             if self.order and order.ref == self.order.ref:
                 # Buy order rejected/margin — write N/A exit for orphan entry
                 if self._current_trade_idx is not None and self.trade_report_file:
-                    self.trade_report_file.write(f"EXIT #{self._current_trade_idx + 1}\n")
-                    self.trade_report_file.write("Time: N/A\n")
-                    self.trade_report_file.write(f"Exit Reason: {order.getstatusname()}\n")
-                    self.trade_report_file.write("P&L: $0.00\n")
-                    self.trade_report_file.write("=" * 80 + "\n\n")
-                    self.trade_report_file.flush()
+                    self.trade_report_file.write(
+                        f"EXIT #{self._current_trade_idx + 1}\n"
+                        "Time: N/A\n"
+                        f"Exit Reason: {order.getstatusname()}\n"
+                        "P&L: $0.00\n"
+                        + "=" * 80 + "\n\n"
+                    )
                 self._current_trade_idx = None
                 self.order = None
             if self.stop_order and order.ref == self.stop_order.ref: self.stop_order = None
@@ -944,16 +990,12 @@ class SEDNAStrategy(bt.Strategy):
             self.losses += 1
             self.gross_loss += abs(pnl)
         
-        self._trade_pnls.append({
-            'date': dt,
-            'year': dt.year,
-            'pnl': pnl,
-            'is_winner': pnl > 0
-        })
+        self._trade_dates.append(dt)
+        self._trade_pnl.append(pnl)
         
         # Determine exit reason based on actual P&L
         # This is more reliable than tracking order types
-        last_reason = getattr(self, 'last_exit_reason', None)
+        last_reason = self.last_exit_reason
         if last_reason and last_reason in ['KAMA_REVERSAL']:
             reason = last_reason  # Keep manual exit reasons
         elif pnl > 0:
@@ -966,12 +1008,21 @@ class SEDNAStrategy(bt.Strategy):
         # Reset for next trade
         self.last_exit_reason = None
 
+    @property
+    def _trade_pnls(self):
+        """Closed trades as date/year/pnl/is_winner dicts (read by external tools)."""
+        return [
+            {'date': dt, 'year': dt.year, 'pnl': pnl, 'is_winner': pnl > 0}
+            for dt, pnl in zip(self._trade_dates, self._trade_pnl)
+        ]
+
     # =========================================================================
     # STATISTICS
     # =========================================================================
     
     def stop(self):
         """Strategy end - print summary with advanced metrics."""
+        self._fill_plot_lines()
         final_value = self.broker.get_value()
         total_pnl = final_value - self._starting_cash
         win_rate = (self.wins / self.trades * 100) if self.trades > 0 else 0
@@ -1030,11 +1081,11 @@ class SEDNAStrategy(bt.Strategy):
         
         # CAGR
         cagr = 0.0
-        if self._portfolio_values and self._trade_pnls and self._starting_cash > 0:
+        if self._portfolio_values and self._trade_dates and self._starting_cash > 0:
             total_return = final_value / self._starting_cash
             if total_return > 0:
-                first_date = self._trade_pnls[0]['date']
-                last_date = self._trade_pnls[-1]['date']
+                first_date = self._trade_dates[0]
+                last_date = self._trade_dates[-1]
                 days = (last_date - first_date).days
                 years = max(days / 365.25, 0.1)
                 cagr = (pow(total_return, 1.0 / years) - 1.0) * 100.0
@@ -1045,9 +1096,9 @@ class SEDNAStrategy(bt.Strategy):
         # Monte Carlo Simulation
         monte_carlo_dd_95 = 0.0
         monte_carlo_dd_99 = 0.0
-        if len(self._trade_pnls) >= 20:
+        if len(self._trade_pnl) >= 20:
             n_simulations = 10000
-            pnl_list = [t['pnl'] for t in self._trade_pnls]
+            pnl_list = np.asarray(self._trade_pnl, dtype=np.float64)
             mc_max_drawdowns = []
             
             for _ in range(n_simulations):
@@ -1071,84 +1122,84 @@ class SEDNAStrategy(bt.Strategy):
             monte_carlo_dd_99 = np.percentile(mc_max_drawdowns, 99)
         
         # Yearly Statistics
-        yearly_stats = defaultdict(lambda: {
-            'trades': 0, 'wins': 0, 'pnl': 0.0,
-            'gross_profit': 0.0, 'gross_loss': 0.0
-        })
-        
-        for trade in self._trade_pnls:
-            year = trade['year']
-            yearly_stats[year]['trades'] += 1
-            yearly_stats[year]['pnl'] += trade['pnl']
-            if trade['is_winner']:
-                yearly_stats[year]['wins'] += 1
-                yearly_stats[year]['gross_profit'] += trade['pnl']
-            else:
-                yearly_stats[year]['gross_loss'] += abs(trade['pnl'])
-        
-        # Print Summary
-        print("\n" + "=" * 70)
-        print("=== SEDNA STRATEGY SUMMARY ===")
-        print("=" * 70)
-        
-        print(f"Total Trades: {self.trades}")
-        print(f"Wins: {self.wins} | Losses: {self.losses}")
-        print(f"Win Rate: {win_rate:.1f}%")
-        print(f"Profit Factor: {profit_factor:.2f}")
-        print(f"Gross Profit: ${self.gross_profit:,.2f}")
-        print(f"Gross Loss: ${self.gross_loss:,.2f}")
-        print(f"Net P&L: ${total_pnl:,.0f}")
-        print(f"Final Value: ${final_value:,.0f}")
-        
-        print(f"\n{'='*70}")
-        print("ADVANCED RISK METRICS")
-        print(f"{'='*70}")
-        print(f"Sharpe Ratio:        {sharpe_ratio:>8.2f}")
-        print(f"Sortino Ratio:       {sortino_ratio:>8.2f}")
-        print(f"CAGR:                {cagr:>7.2f}%")
-        print(f"Max Drawdown:        {max_drawdown_pct:>7.2f}%")
-        print(f"Calmar Ratio:        {calmar_ratio:>8.2f}")
+        # Dense year ids, then one bincount per column (sums in trade order)
+        trade_pnl = np.asarray(self._trade_pnl, dtype=np.float64)
+        trade_win = trade_pnl > 0
+        years, year_idx = np.unique(
+            np.fromiter((dt.year for dt in self._trade_dates), dtype=np.int64, count=trade_pnl.size),
+            return_inverse=True,
+        )
+        yr_trades = np.bincount(year_idx, minlength=years.size)
+        yr_wins = np.bincount(year_idx, weights=trade_win, minlength=years.size)
+        yr_pnl = np.bincount(year_idx, weights=trade_pnl, minlength=years.size)
+        yr_gp = np.bincount(year_idx, weights=np.where(trade_win, trade_pnl, 0.0), minlength=years.size)
+        yr_gl = np.bincount(year_idx, weights=np.where(trade_win, 0.0, np.abs(trade_pnl)), minlength=years.size)
+        
+        # Print Summary (lines collected, printed in one write)
+        out = []
+        out.append("\n" + "=" * 70)
+        out.append("=== SEDNA STRATEGY SUMMARY ===")
+        out.append("=" * 70)
+        
+        out.append(f"Total Trades: {self.trades}")
+        out.append(f"Wins: {self.wins} | Losses: {self.losses}")
+        out.append(f"Win Rate: {win_rate:.1f}%")
+        out.append(f"Profit Factor: {profit_factor:.2f}")
+        out.append(f"Gross Profit: ${self.gross_profit:,.2f}")
+        out.append(f"Gross Loss: ${self.gross_loss:,.2f}")
+        out.append(f"Net P&L: ${total_pnl:,.0f}")
+        out.append(f"Final Value: ${final_value:,.0f}")
+        
+        out.append(f"\n{'='*70}")
+        out.append("ADVANCED RISK METRICS")
+        out.append(f"{'='*70}")
+        out.append(f"Sharpe Ratio:        {sharpe_ratio:>8.2f}")
+        out.append(f"Sortino Ratio:       {sortino_ratio:>8.2f}")
+        out.append(f"CAGR:                {cagr:>7.2f}%")
+        out.append(f"Max Drawdown:        {max_drawdown_pct:>7.2f}%")
+        out.append(f"Calmar Ratio:        {calmar_ratio:>8.2f}")
         
         if monte_carlo_dd_95 > 0:
             mc_ratio = monte_carlo_dd_95 / max_drawdown_pct if max_drawdown_pct > 0 else 0
             mc_status = "Good" if mc_ratio < 1.5 else "Caution" if mc_ratio < 2.0 else "Warning"
-            print(f"\nMonte Carlo Analysis (10,000 simulations):")
-            print(f"  95th Percentile DD: {monte_carlo_dd_95:>6.2f}%  [{mc_status}]")
-            print(f"  99th Percentile DD: {monte_carlo_dd_99:>6.2f}%")
-            print(f"  Historical vs MC95: {mc_ratio:.2f}x")
-        print(f"{'='*70}")
+            out.append(f"\nMonte Carlo Analysis (10,000 simulations):")
+            out.append(f"  95th Percentile DD: {monte_carlo_dd_95:>6.2f}%  [{mc_status}]")
+            out.append(f"  99th Percentile DD: {monte_carlo_dd_99:>6.2f}%")
+            out.append(f"  Historical vs MC95: {mc_ratio:.2f}x")
+        out.append(f"{'='*70}")
         
         # Yearly Statistics
-        print(f"\n{'='*70}")
-        print("YEARLY STATISTICS")
-        print(f"{'='*70}")
-        print(f"{'Year':<6} {'Trades':>7} {'WR%':>7} {'PF':>7} {'PnL':>12}")
-        print(f"{'-'*45}")
+        out.append(f"\n{'='*70}")
+        out.append("YEARLY STATISTICS")
+        out.append(f"{'='*70}")
+        out.append(f"{'Year':<6} {'Trades':>7} {'WR%':>7} {'PF':>7} {'PnL':>12}")
+        out.append(f"{'-'*45}")
         
-        for year in sorted(yearly_stats.keys()):
-            stats = yearly_stats[year]
-            wr = (stats['wins'] / stats['trades'] * 100) if stats['trades'] > 0 else 0
-            year_pf = (stats['gross_profit'] / stats['gross_loss']) if stats['gross_loss'] > 0 else float('inf')
-            print(f"{year:<6} {stats['trades']:>7} {wr:>6.1f}% {year_pf:>7.2f} ${stats['pnl']:>10,.0f}")
+        for k, year in enumerate(years.tolist()):
+            year_trades = int(yr_trades[k])
+            wr = yr_wins[k] / year_trades * 100
+            year_pf = (yr_gp[k] / yr_gl[k]) if yr_gl[k] > 0 else float('inf')
+            out.append(f"{year:<6} {year_trades:>7} {wr:>6.1f}% {year_pf:>7.2f} ${yr_pnl[k]:>10,.0f}")
         
-        print(f"{'='*70}")
+        out.append(f"{'='*70}")
         
         # Active filters
-        print(f"\n{'='*70}")
-        print("STRATEGY CONFIGURATION")
-        print(f"{'='*70}")
-        print(f"  KAMA: period={self.p.kama_period}, fast={self.p.kama_fast}, slow={self.p.kama_slow}")
+        out.append(f"\n{'='*70}")
+        out.append("STRATEGY CONFIGURATION")
+        out.append(f"{'='*70}")
+        out.append(f"  KAMA: period={self.p.kama_period}, fast={self.p.kama_fast}, slow={self.p.kama_slow}")
         if self.p.use_cci_filter:
-            print(f"  CCI (HL2): {self.p.cci_threshold}-{self.p.cci_max_threshold}")
+            out.append(f"  CCI (HL2): {self.p.cci_threshold}-{self.p.cci_max_threshold}")
         else:
-            print("  CCI: DISABLED")
+            out.append("  CCI: DISABLED")
         if self.p.use_time_filter:
-            print(f"  Time Filter: hours {list(self.p.allowed_hours)}")
+            out.append(f"  Time Filter: hours {list(self.p.allowed_hours)}")
         if self.p.use_sl_pips_filter:
-            print(f"  SL Pips Filter: {self.p.sl_pips_min}-{self.p.sl_pips_max}")
+            out.append(f"  SL Pips Filter: {self.p.sl_pips_min}-{self.p.sl_pips_max}")
         if self.p.use_atr_filter:
-            print(f"  ATR Filter: {self.p.atr_min}-{self.p.atr_max} (avg {self.p.atr_avg_period})")
-        print("=" * 70)
+            out.append(f"  ATR Filter: {self.p.atr_min}-{self.p.atr_max} (avg {self.p.atr_avg_period})")
+        out.append("=" * 70)
+        print("\n".join(out))
         
         # Close report file
         if self.trade_report_file:
@@ -24,16 +24,21 @@ from datetime import datetime
 from pathlib import Path
 
 import backtrader as bt
+import numpy as np
 
 from lib.filters import (
-    check_time_filter,
-    check_day_filter,
+    hour_bitmask,
+    day_bitmask,
     check_atr_filter,
     check_angle_filter,
     check_sl_pips_filter,
     check_ema_price_filter,
 )
 from lib.position_sizing import calculate_position_size
+from lib.fast_indicators import emas_atr, is_preloaded, line_values
+
+# datetime.toordinal() of 1970-01-01 (backtrader float dates are ordinal days)
+_ORDINAL_1970 = 719163.0
 
 
 class SunsetOgleStrategy(bt.Strategy):
@@ -110,14 +115,83 @@ class SunsetOgleStrategy(bt.Strategy):
     def __init__(self):
         """Initialize indicators and state variables."""
         d = self.data
-        
-        # Technical indicators
-        self.ema_fast = bt.ind.EMA(d.close, period=self.p.ema_fast_length)
-        self.ema_medium = bt.ind.EMA(d.close, period=self.p.ema_medium_length)
-        self.ema_slow = bt.ind.EMA(d.close, period=self.p.ema_slow_length)
-        self.ema_confirm = bt.ind.EMA(d.close, period=self.p.ema_confirm_length)
-        self.ema_filter = bt.ind.EMA(d.close, period=self.p.ema_filter_price_length)
-        self.atr = bt.ind.ATR(d, period=self.p.atr_length)
+        if not is_preloaded(d):
+            raise ValueError(
+                '[SunsetOgle] ERROR: needs a preloaded feed (indicators and '
+                'signal masks are precomputed); base_timeframe_minutes / '
+                'htf_data_minutes resampling is not supported')
+        
+        # Technical indicators: precomputed in one fused pass over the preloaded
+        # feed and indexed by bar (self._i) in next(), same values as
+        # bt.ind.EMA/ATR (see lib/fast_indicators.py). Lists, so a lookup is a
+        # plain float
+        close = line_values(d.close)
+        high = line_values(d.high)
+        low = line_values(d.low)
+        emas, atr_arr = emas_atr(high, low, close, (
+            self.p.ema_fast_length,
+            self.p.ema_medium_length,
+            self.p.ema_slow_length,
+            self.p.ema_confirm_length,
+            self.p.ema_filter_price_length,
+        ), self.p.atr_length)
+        (self.ema_fast, self.ema_medium, self.ema_slow,
+         self.ema_confirm, self.ema_filter) = emas.tolist()
+        self.atr = atr_arr.tolist()
+        
+        # Bullish/bearish crossover of the confirm EMA over/under any of
+        # fast/medium/slow, one bool per bar: SCANNING bars without a bullish
+        # one skip the state machine entirely
+        confirm, lines = emas[3], emas[:3]
+        self._cross_up = [False] + (
+            (confirm[1:] > lines[:, 1:]) & (confirm[:-1] <= lines[:, :-1])
+        ).any(axis=0).tolist()
+        self._cross_down = [False] + (
+            (confirm[1:] < lines[:, 1:]) & (confirm[:-1] >= lines[:, :-1])
+        ).any(axis=0).tolist()
+        
+        # Scaled bar-to-bar rise of the confirm EMA for _angle (exact same
+        # floats as the scalar subtraction; atan stays in math so the angle
+        # filters see identical values)
+        self._angle_rise = [math.nan] + (np.diff(confirm) * self.p.angle_scale).tolist()
+        
+        # First bar where every indicator is valid (the minperiod backtrader
+        # derived from the indicator objects: EMA=period, ATR=period+1)
+        self._warmup = max(
+            self.p.ema_fast_length,
+            self.p.ema_medium_length,
+            self.p.ema_slow_length,
+            self.p.ema_confirm_length,
+            self.p.ema_filter_price_length,
+            self.p.atr_length + 1,
+        )
+        self._i = 0  # Current bar index into the indicator lists
+        
+        # Raw line buffers, indexed by bar (self._i) in the per-bar checks
+        # instead of going through LineBuffer.__getitem__ + float()
+        self._high_arr = d.high.array
+        self._low_arr = d.low.array
+        self._close_arr = d.close.array
+        
+        # Bearish (close < open) candles, one bool per bar, for the pullback
+        # count and the global invalidation
+        self._bearish = (close < line_values(d.open)).tolist()
+        
+        # Time/day filters as one bool per bar (hour and weekday bits of the
+        # allowed-hours/days masks), so a breakout never builds a datetime
+        # just to be filtered out. Timestamps truncated to the second with
+        # bt.num2date's 10us float-error tolerance, as in KOI
+        epoch_secs = np.floor(
+            (line_values(d.datetime) - _ORDINAL_1970) * 86400.0 + 1e-5
+        ).astype(np.int64)
+        hour = epoch_secs % 86400 // 3600
+        weekday = (epoch_secs // 86400 + 3) % 7  # 1970-01-01 was a Thursday
+        hour_mask = hour_bitmask(self.p.allowed_hours, self.p.use_time_filter)
+        day_mask = day_bitmask(self.p.allowed_days, self.p.use_day_filter)
+        self._session_ok = (
+            ((hour_mask >> hour) & 1).astype(np.bool_)
+            & ((day_mask >> weekday) & 1).astype(np.bool_)
+        ).tolist()
         
         # Order tracking
         self.order = None
@@ -154,8 +228,9 @@ class SunsetOgleStrategy(bt.Strategy):
         self.gross_profit = 0.0
         self.gross_loss = 0.0
         
-        # Trade tracking for yearly stats
-        self._trade_pnls = []
+        # Closed trades for yearly stats, as parallel columns (close datetime, P&L)
+        self._trade_dates = []
+        self._trade_pnl = []
         self._initial_cash = None
         self._portfolio_values = []  # Track equity curve for advanced metrics
         self._first_bar_dt = None
@@ -187,7 +262,7 @@ class SunsetOgleStrategy(bt.Strategy):
             filename = f'{asset_name}_trades_{timestamp}.txt'
             filepath = reports_dir / filename
             
-            self.trade_report_file = open(filepath, 'w')
+            self.trade_report_file = open(filepath, 'w', buffering=1 << 16)
             
             # Write header (same format as original)
             self.trade_report_file.write("=== SUNRISE STRATEGY TRADE REPORT ===\n")
@@ -215,37 +290,14 @@ class SunsetOgleStrategy(bt.Strategy):
             self.trade_report_file.write("=" * 80 + "\n")
             self.trade_report_file.write("TRADE DETAILS\n")
             self.trade_report_file.write("=" * 80 + "\n\n")
-            self.trade_report_file.flush()
             
         except Exception as e:
             print(f"Trade reporting init error: {e}")
             self.trade_report_file = None
     
-    def _cross_above(self, a, b):
-        """Check if line a crosses above line b."""
-        try:
-            return (float(a[0]) > float(b[0])) and (float(a[-1]) <= float(b[-1]))
-        except (IndexError, ValueError, TypeError):
-            return False
-    
-    def _cross_below(self, a, b):
-        """Check if line a crosses below line b."""
-        try:
-            return (float(a[0]) < float(b[0])) and (float(a[-1]) >= float(b[-1]))
-        except (IndexError, ValueError, TypeError):
-            return False
-    
-    def _angle(self):
-        """Calculate EMA angle in degrees."""
-        try:
-            rise = (float(self.ema_confirm[0]) - float(self.ema_confirm[-1])) * self.p.angle_scale
-            return math.degrees(math.atan(rise))
-        except (IndexError, ValueError, TypeError, ZeroDivisionError):
-            return float('nan')
-    
-    def _in_time_range(self, dt):
-        """Check if current hour is in the allowed hours list."""
-        return check_time_filter(dt, self.p.allowed_hours, self.p.use_time_filter)
+    def _angle(self, _atan=math.atan, _degrees=math.degrees):
+        """Calculate EMA angle in degrees (NaN while the EMA is warming up)."""
+        return _degrees(_atan(self._angle_rise[self._i]))
     
     def _reset_state(self):
         """Reset entry state machine to SCANNING."""
@@ -259,7 +311,7 @@ class SunsetOgleStrategy(bt.Strategy):
         self.window_start = None
         self.entry_window_start = None
     
-    def _check_eod_close(self, dt):
+    def _check_eod_close(self):
         """
         Check if position should be force-closed at end of day (ETFs only).
         
@@ -268,6 +320,7 @@ class SunsetOgleStrategy(bt.Strategy):
         if self.p.eod_close_hour is None or self.p.eod_close_minute is None:
             return False
         
+        dt = self.datas[0].datetime.datetime(0)
         current_minutes = dt.hour * 60 + dt.minute
         eod_minutes = self.p.eod_close_hour * 60 + self.p.eod_close_minute
         
@@ -299,22 +352,16 @@ class SunsetOgleStrategy(bt.Strategy):
     
     def _check_signal(self):
         """Phase 1: Check for valid EMA crossover signal."""
-        # Check for bullish EMA crossover pattern
-        cross_fast = self._cross_above(self.ema_confirm, self.ema_fast)
-        cross_medium = self._cross_above(self.ema_confirm, self.ema_medium)
-        cross_slow = self._cross_above(self.ema_confirm, self.ema_slow)
-        
-        cross_any = cross_fast or cross_medium or cross_slow
-        
-        if not cross_any:
+        # Check for bullish EMA crossover pattern (precomputed per bar)
+        if not self._cross_up[self._i]:
             return False
         
         # Price filter: close > EMA(70) - using shared filter
-        if not check_ema_price_filter(self.data.close[0], self.ema_filter[0]):
+        if not check_ema_price_filter(self._close_arr[self._i], self.ema_filter[self._i]):
             return False
         
         # ATR filter - using shared filter
-        atr = self.atr[0]
+        atr = self.atr[self._i]
         if not check_atr_filter(atr, self.p.atr_min, self.p.atr_max):
             return False
         
@@ -328,13 +375,12 @@ class SunsetOgleStrategy(bt.Strategy):
     
     def _check_pullback(self):
         """PHASE 2: Count bearish pullback candles."""
-        is_bearish = self.data.close[0] < self.data.open[0]
-        
-        if is_bearish:
+        i = self._i
+        if self._bearish[i]:
             self.pullback_count += 1
             if self.pullback_count >= self.p.pullback_candles:
-                self.pullback_high = float(self.data.high[0])
-                self.pullback_low = float(self.data.low[0])
+                self.pullback_high = self._high_arr[i]
+                self.pullback_low = self._low_arr[i]
                 return True
         else:
             # Non-pullback candle invalidates sequence
@@ -375,11 +421,11 @@ class SunsetOgleStrategy(bt.Strategy):
             return None
         
         # Success: high breaks above top level
-        if self.data.high[0] >= self.window_top:
+        if self._high_arr[self._i] >= self.window_top:
             return 'SUCCESS'
         
         # Failure: low breaks below bottom (instability)
-        if self.data.low[0] <= self.window_bottom:
+        if self._low_arr[self._i] <= self.window_bottom:
             self.entry_state = "ARMED_LONG"
             self.pullback_count = 0
             self.window_top = None
@@ -391,7 +437,7 @@ class SunsetOgleStrategy(bt.Strategy):
     def _validate_entry(self):
         """Validate all filters at breakout execution time."""
         # Price filter
-        if self.data.close[0] <= self.ema_filter[0]:
+        if self._close_arr[self._i] <= self.ema_filter[self._i]:
             return False
         
         # Angle filter - only if enabled
@@ -463,30 +509,32 @@ class SunsetOgleStrategy(bt.Strategy):
             
             # Write to file (same format as original)
             trade_num = len(self.trade_reports)
-            self.trade_report_file.write(f"ENTRY #{trade_num}\n")
-            self.trade_report_file.write(f"Time: {dt.strftime('%Y-%m-%d %H:%M:%S')}\n")
-            self.trade_report_file.write("Direction: LONG\n")
-            self.trade_report_file.write(f"ATR Current: {atr:.6f}\n")
             
             # ATR increment/decrement display
             if atr_increment >= 0:
-                self.trade_report_file.write(f"ATR Increment: {atr_increment:+.6f} (No Filter)\n")
+                atr_line = f"ATR Increment: {atr_increment:+.6f} (No Filter)\n"
             else:
-                self.trade_report_file.write(f"ATR Change: {atr_increment:+.6f} (Decrement Filter OFF)\n")
-            
-            self.trade_report_file.write(f"Angle Current: {angle:.2f} deg\n")
-            self.trade_report_file.write(f"Angle Filter: ENABLED | Range: {self.p.angle_min:.1f}-{self.p.angle_max:.1f} deg | Valid: True\n")
+                atr_line = f"ATR Change: {atr_increment:+.6f} (Decrement Filter OFF)\n"
             
             # SL pips info for optimization analysis
             sl_filter_status = "ENABLED" if self.p.use_sl_pips_filter else "DISABLED"
             if self.p.use_sl_pips_filter:
-                self.trade_report_file.write(f"SL Pips: {sl_pips:.1f} | Filter: {sl_filter_status} | Range: {self.p.sl_pips_min:.1f}-{self.p.sl_pips_max:.1f}\n")
+                sl_line = f"SL Pips: {sl_pips:.1f} | Filter: {sl_filter_status} | Range: {self.p.sl_pips_min:.1f}-{self.p.sl_pips_max:.1f}\n"
             else:
-                self.trade_report_file.write(f"SL Pips: {sl_pips:.1f} | Filter: {sl_filter_status}\n")
+                sl_line = f"SL Pips: {sl_pips:.1f} | Filter: {sl_filter_status}\n"
             
-            self.trade_report_file.write(f"Bars to Entry: {bars_to_entry}\n")
-            self.trade_report_file.write("-" * 50 + "\n\n")
-            self.trade_report_file.flush()
+            self.trade_report_file.write(
+                f"ENTRY #{trade_num}\n"
+                f"Time: {dt.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                "Direction: LONG\n"
+                f"ATR Current: {atr:.6f}\n"
+                f"{atr_line}"
+                f"Angle Current: {angle:.2f} deg\n"
+                f"Angle Filter: ENABLED | Range: {self.p.angle_min:.1f}-{self.p.angle_max:.1f} deg | Valid: True\n"
+                f"{sl_line}"
+                f"Bars to Entry: {bars_to_entry}\n"
+                + "-" * 50 + "\n\n"
+            )
             
         except Exception as e:
             print(f"Trade entry recording error: {e}")
@@ -533,14 +581,15 @@ class SunsetOgleStrategy(bt.Strategy):
             # Write to file only if report file exists
             if self.trade_report_file:
                 trade_num = len(self.trade_reports)
-                self.trade_report_file.write(f"EXIT #{trade_num}\n")
-                self.trade_report_file.write(f"Time: {dt.strftime('%Y-%m-%d %H:%M:%S')}\n")
-                self.trade_report_file.write(f"Exit Reason: {exit_reason}\n")
-                self.trade_report_file.write(f"P&L: {pnl:.2f}\n")
-                self.trade_report_file.write(f"Pips: {pips:.1f}\n")
-                self.trade_report_file.write(f"Duration: {duration_bars} bars ({duration_minutes} min)\n")
-                self.trade_report_file.write("=" * 80 + "\n\n")
-                self.trade_report_file.flush()
+                self.trade_report_file.write(
+                    f"EXIT #{trade_num}\n"
+                    f"Time: {dt.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                    f"Exit Reason: {exit_reason}\n"
+                    f"P&L: {pnl:.2f}\n"
+                    f"Pips: {pips:.1f}\n"
+                    f"Duration: {duration_bars} bars ({duration_minutes} min)\n"
+                    + "=" * 80 + "\n\n"
+                )
             
             # Mark trade as completed
             self._current_trade_idx = None
@@ -554,22 +603,30 @@ class SunsetOgleStrategy(bt.Strategy):
             return
         
         try:
+            # One pass over the reports (sequential sums, as sum() did)
             total_trades = len(self.trade_reports)
-            winning_trades = [t for t in self.trade_reports if t.get('pnl', 0) > 0]
-            losing_trades = [t for t in self.trade_reports if t.get('pnl', 0) <= 0]
-            
-            total_pnl = sum(t.get('pnl', 0) for t in self.trade_reports)
-            win_rate = (len(winning_trades) / total_trades * 100) if total_trades > 0 else 0
+            n_win = 0
+            total_pnl = win_pnl = loss_pnl = 0
+            for t in self.trade_reports:
+                pnl = t.get('pnl', 0)
+                total_pnl += pnl
+                if pnl > 0:
+                    n_win += 1
+                    win_pnl += pnl
+                else:
+                    loss_pnl += pnl
+            n_loss = total_trades - n_win
+            win_rate = (n_win / total_trades * 100) if total_trades > 0 else 0
             
-            avg_win = sum(t.get('pnl', 0) for t in winning_trades) / len(winning_trades) if winning_trades else 0
-            avg_loss = sum(t.get('pnl', 0) for t in losing_trades) / len(losing_trades) if losing_trades else 0
+            avg_win = win_pnl / n_win if n_win else 0
+            avg_loss = loss_pnl / n_loss if n_loss else 0
             
             self.trade_report_file.write("\n" + "=" * 80 + "\n")
             self.trade_report_file.write("SUMMARY\n")
             self.trade_report_file.write("=" * 80 + "\n")
             self.trade_report_file.write(f"Total Trades: {total_trades}\n")
-            self.trade_report_file.write(f"Winning Trades: {len(winning_trades)}\n")
-            self.trade_report_file.write(f"Losing Trades: {len(losing_trades)}\n")
+            self.trade_report_file.write(f"Winning Trades: {n_win}\n")
+            self.trade_report_file.write(f"Losing Trades: {n_loss}\n")
             self.trade_report_file.write(f"Win Rate: {win_rate:.2f}%\n")
             self.trade_report_file.write(f"Total P&L: {total_pnl:.2f}\n")
             self.trade_report_file.write(f"Average Win: {avg_win:.2f}\n")
@@ -584,14 +641,15 @@ class SunsetOgleStrategy(bt.Strategy):
     
     def _execute_entry(self, dt):
         """Execute entry order with position sizing and protective orders."""
-        atr = float(self.atr[0]) if not math.isnan(float(self.atr[0])) else 0.0
-        if atr <= 0:
+        atr = self.atr[self._i]
+        if math.isnan(atr) or atr <= 0:
             self._reset_state()
             return
         
-        entry_price = float(self.data.close[0])
-        bar_low = float(self.data.low[0])
-        bar_high = float(self.data.high[0])
+        i = self._i
+        entry_price = self._close_arr[i]
+        bar_low = self._low_arr[i]
+        bar_high = self._high_arr[i]
         
         # Calculate SL/TP levels
         self.stop_level = bar_low - atr * self.p.sl_mult
@@ -640,6 +698,11 @@ class SunsetOgleStrategy(bt.Strategy):
     
     def next(self):
         """Main strategy logic - 4-phase state machine."""
+        # Indicator warm-up (backtrader no longer gates next() on minperiod)
+        if len(self.data) < self._warmup:
+            return
+        self._i = len(self.data) - 1
+        
         # Capture initial cash on first bar
         if self._initial_cash is None:
             self._initial_cash = self.broker.get_value()
@@ -647,12 +710,11 @@ class SunsetOgleStrategy(bt.Strategy):
         # Track portfolio value for advanced metrics
         self._portfolio_values.append(self.broker.get_value())
         
-        dt = self.datas[0].datetime.datetime(0)
-        
-        # Track date range for data-driven annualization
+        # Track date range for data-driven annualization (the last bar's
+        # datetime is taken once in stop(); datetime objects are only built
+        # on the branches that use them, not on every bar)
         if self._first_bar_dt is None:
-            self._first_bar_dt = dt
-        self._last_bar_dt = dt
+            self._first_bar_dt = self.datas[0].datetime.datetime(0)
         
         # Wait for pending entry orders (KOI pattern - simple wait, no cancellation)
         if self.order:
@@ -661,24 +723,21 @@ class SunsetOgleStrategy(bt.Strategy):
         # EOD forced close for ETFs
         # Skip on the bar where buy just filled to avoid cancel() race condition
         # (SL placed same bar isn't yet in broker pending → cancel fails → phantom short)
-        if self.position and len(self) != self._entry_fill_bar and self._check_eod_close(dt):
+        if self.position and len(self) != self._entry_fill_bar and self._check_eod_close():
             return
         
         # Skip entry logic if in position
         if self.position:
             return
         
+        # Nothing can happen while SCANNING on a bar without a crossover
+        if self.entry_state == "SCANNING" and not self._cross_up[self._i]:
+            return
+        
         # GLOBAL INVALIDATION: Reset only if opposing crossover WITH bearish previous candle
         if self.entry_state == "ARMED_LONG":
-            try:
-                prev_bear = self.data.close[-1] < self.data.open[-1]
-                cross_any = (self._cross_below(self.ema_confirm, self.ema_fast) or
-                            self._cross_below(self.ema_confirm, self.ema_medium) or
-                            self._cross_below(self.ema_confirm, self.ema_slow))
-                if prev_bear and cross_any:
-                    self._reset_state()
-            except IndexError:
-                pass
+            if self._bearish[self._i - 1] and self._cross_down[self._i]:
+                self._reset_state()
         
         # STATE MACHINE ROUTER
         if self.entry_state == "SCANNING":
@@ -686,6 +745,7 @@ class SunsetOgleStrategy(bt.Strategy):
                 self.entry_state = "ARMED_LONG"
                 self.pullback_count = 0
                 if self.p.print_signals:
+                    dt = self.datas[0].datetime.datetime(0)
                     print(f'{dt} [{self.data._name}] Phase: SCANNING -> ARMED (Angle: {self._angle():.1f})')
         
         elif self.entry_state == "ARMED_LONG":
@@ -696,13 +756,8 @@ class SunsetOgleStrategy(bt.Strategy):
             result = self._monitor_window()
             
             if result == 'SUCCESS':
-                # Time filter check
-                if not self._in_time_range(dt):
-                    self._reset_state()
-                    return
-                
-                # Day filter check
-                if not check_day_filter(dt, self.p.allowed_days, self.p.use_day_filter):
+                # Time and day filter check (precomputed per bar)
+                if not self._session_ok[self._i]:
                     self._reset_state()
                     return
                 
@@ -711,7 +766,7 @@ class SunsetOgleStrategy(bt.Strategy):
                     self._reset_state()
                     return
                 
-                self._execute_entry(dt)
+                self._execute_entry(self.datas[0].datetime.datetime(0))
     
     def notify_order(self, order):
         """Handle order notifications."""
@@ -801,12 +856,8 @@ class SunsetOgleStrategy(bt.Strategy):
             self.gross_loss += abs(pnl)
         
         # Store for yearly stats
-        self._trade_pnls.append({
-            'date': dt,
-            'year': dt.year,
-            'pnl': pnl,
-            'is_winner': pnl > 0,
-        })
+        self._trade_dates.append(dt)
+        self._trade_pnl.append(pnl)
         
         # Calculate exit price
         entry_price = self.last_entry_price if self.last_entry_price else trade.price
@@ -826,10 +877,21 @@ class SunsetOgleStrategy(bt.Strategy):
         self.take_level = None
         self.last_entry_price = None
     
+    @property
+    def _trade_pnls(self):
+        """Closed trades as date/year/pnl/is_winner dicts (read by external tools)."""
+        return [
+            {'date': dt, 'year': dt.year, 'pnl': pnl, 'is_winner': pnl > 0}
+            for dt, pnl in zip(self._trade_dates, self._trade_pnl)
+        ]
+    
     def stop(self):
         """Strategy end - print summary and close reporting."""
         import numpy as np
-        from collections import defaultdict
+        
+        # Last bar seen by next() (the feed is still positioned on it)
+        if self._first_bar_dt is not None:
+            self._last_bar_dt = self.datas[0].datetime.datetime(0)
         
         # Close any open positions
         if self.position:
@@ -898,9 +960,9 @@ class SunsetOgleStrategy(bt.Strategy):
         # Calculate CAGR
         if len(self._portfolio_values) > 1 and initial_cash > 0:
             total_return = final_value / initial_cash
-            if self._trade_pnls:
-                first_date = self._trade_pnls[0]['date']
-                last_date = self._trade_pnls[-1]['date']
+            if self._trade_dates:
+                first_date = self._trade_dates[0]
+                last_date = self._trade_dates[-1]
                 days = (last_date - first_date).days
                 years = max(days / 365.25, 0.1)
             else:
@@ -930,9 +992,9 @@ class SunsetOgleStrategy(bt.Strategy):
             calmar_ratio = cagr / max_drawdown_pct
         
         # Monte Carlo Simulation
-        if len(self._trade_pnls) >= 20:
+        if len(self._trade_pnl) >= 20:
             n_simulations = 10000
-            pnl_list = [t['pnl'] for t in self._trade_pnls]
+            pnl_list = np.asarray(self._trade_pnl, dtype=np.float64)
             mc_max_drawdowns = []
             
             for _ in range(n_simulations):
@@ -958,48 +1020,48 @@ class SunsetOgleStrategy(bt.Strategy):
         # =================================================================
         # YEARLY STATISTICS WITH SHARPE/SORTINO
         # =================================================================
-        yearly_stats = defaultdict(lambda: {
-            'trades': 0, 'wins': 0, 'losses': 0, 'pnl': 0.0,
-            'gross_profit': 0.0, 'gross_loss': 0.0, 'pnls': []
-        })
-        
-        for trade in self._trade_pnls:
-            year = trade['year']
-            yearly_stats[year]['trades'] += 1
-            yearly_stats[year]['pnl'] += trade['pnl']
-            yearly_stats[year]['pnls'].append(trade['pnl'])
-            if trade['is_winner']:
-                yearly_stats[year]['wins'] += 1
-                yearly_stats[year]['gross_profit'] += trade['pnl']
-            else:
-                yearly_stats[year]['losses'] += 1
-                yearly_stats[year]['gross_loss'] += abs(trade['pnl'])
-        
-        # Calculate yearly Sharpe and Sortino
-        for year in yearly_stats:
-            pnls = yearly_stats[year]['pnls']
-            if len(pnls) > 1:
-                pnl_array = np.array(pnls)
-                mean_pnl = np.mean(pnl_array)
-                std_pnl = np.std(pnl_array)
-                
-                if std_pnl > 0:
-                    yearly_stats[year]['sharpe'] = (mean_pnl / std_pnl) * np.sqrt(len(pnls))
-                else:
-                    yearly_stats[year]['sharpe'] = 0.0
-                
-                neg_pnls = pnl_array[pnl_array < 0]
-                if len(neg_pnls) > 0:
-                    downside_std = np.std(neg_pnls)
-                    if downside_std > 0:
-                        yearly_stats[year]['sortino'] = (mean_pnl / downside_std) * np.sqrt(len(pnls))
-                    else:
-                        yearly_stats[year]['sortino'] = 0.0
-                else:
-                    yearly_stats[year]['sortino'] = float('inf') if mean_pnl > 0 else 0.0
-            else:
-                yearly_stats[year]['sharpe'] = 0.0
-                yearly_stats[year]['sortino'] = 0.0
+        # Dense year ids, then per-year columns with one bincount each
+        trade_pnl = np.asarray(self._trade_pnl, dtype=np.float64)
+        trade_win = trade_pnl > 0
+        trade_neg = trade_pnl < 0
+        years, year_idx = np.unique(
+            np.fromiter((dt.year for dt in self._trade_dates), dtype=np.int64, count=trade_pnl.size),
+            return_inverse=True,
+        )
+        n_years = years.size
+        yr_trades = np.bincount(year_idx, minlength=n_years)
+        yr_wins = np.bincount(year_idx, weights=trade_win, minlength=n_years)
+        yr_pnl = np.bincount(year_idx, weights=trade_pnl, minlength=n_years)
+        yr_gp = np.bincount(year_idx, weights=np.where(trade_win, trade_pnl, 0.0), minlength=n_years)
+        yr_gl = np.bincount(year_idx, weights=np.where(trade_win, 0.0, np.abs(trade_pnl)), minlength=n_years)
+        
+        # Yearly Sharpe/Sortino on trade P&L: population std (as np.std) from
+        # squared deviations around each year's mean, downside over losers only
+        yr_sharpe = np.zeros(n_years)
+        yr_sortino = np.zeros(n_years)
+        if n_years:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                yr_mean = yr_pnl / yr_trades
+                yr_std = np.sqrt(np.bincount(
+                    year_idx, weights=(trade_pnl - yr_mean[year_idx]) ** 2, minlength=n_years
+                ) / yr_trades)
+                yr_neg = np.bincount(year_idx, weights=trade_neg, minlength=n_years)
+                neg_mean = np.bincount(
+                    year_idx, weights=np.where(trade_neg, trade_pnl, 0.0), minlength=n_years
+                ) / yr_neg
+                yr_downside = np.sqrt(np.bincount(
+                    year_idx, weights=np.where(trade_neg, (trade_pnl - neg_mean[year_idx]) ** 2, 0.0),
+                    minlength=n_years,
+                ) / yr_neg)
+                root_n = np.sqrt(yr_trades)
+                multi = yr_trades > 1
+                yr_sharpe = np.where(multi & (yr_std > 0), yr_mean / yr_std * root_n, 0.0)
+                yr_sortino = np.where(
+                    yr_neg > 0,
+                    np.where(yr_downside > 0, yr_mean / yr_downside * root_n, 0.0),
+                    np.where(yr_mean > 0, np.inf, 0.0),
+                )
+                yr_sortino = np.where(multi, yr_sortino, 0.0)
         
         # =================================================================
         # PRINT SUMMARY
@@ -1048,23 +1110,23 @@ class SunsetOgleStrategy(bt.Strategy):
         print(f"{'='*70}")
         
         # Yearly Statistics
-        if yearly_stats:
+        if n_years:
             print(f"\n{'='*70}")
             print('YEARLY STATISTICS')
             print(f"{'='*70}")
             print(f"{'Year':<6} {'Trades':>7} {'WR%':>7} {'PF':>7} {'PnL':>12} {'Sharpe':>8} {'Sortino':>8}")
             print(f"{'-'*70}")
             
-            for year in sorted(yearly_stats.keys()):
-                stats = yearly_stats[year]
-                wr = (stats['wins'] / stats['trades'] * 100) if stats['trades'] > 0 else 0
-                year_pf = (stats['gross_profit'] / stats['gross_loss']) if stats['gross_loss'] > 0 else float('inf')
-                year_sharpe = stats.get('sharpe', 0.0)
-                year_sortino = stats.get('sortino', 0.0)
+            for k, year in enumerate(years.tolist()):
+                year_trades = int(yr_trades[k])
+                wr = yr_wins[k] / year_trades * 100
+                year_pf = (yr_gp[k] / yr_gl[k]) if yr_gl[k] > 0 else float('inf')
+                year_sharpe = yr_sharpe[k]
+                year_sortino = yr_sortino[k]
                 
                 sortino_str = f"{year_sortino:>7.2f}" if year_sortino != float('inf') else "    inf"
                 
-                print(f"{year:<6} {stats['trades']:>7} {wr:>6.1f}% {year_pf:>7.2f} ${stats['pnl']:>10,.0f} {year_sharpe:>8.2f} {sortino_str}")
+                print(f"{year:<6} {year_trades:>7} {wr:>6.1f}% {year_pf:>7.2f} ${yr_pnl[k]:>10,.0f} {year_sharpe:>8.2f} {sortino_str}")
             
             print(f"{'='*70}")
         
@@ -552,7 +552,7 @@ class VEGAStrategy(bt.Strategy):
             report_dir.mkdir(exist_ok=True)
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             report_path = report_dir / f"VEGA_trades_{timestamp}.txt"
-            self.trade_report_file = open(report_path, 'w', encoding='utf-8')
+            self.trade_report_file = open(report_path, 'w', encoding='utf-8', buffering=1 << 16)
             self.trade_report_file.write("=== VEGA STRATEGY TRADE REPORT ===\n")
             self.trade_report_file.write(f"Generated: {datetime.now()}\n\n")
             self.trade_report_file.write("=== CONFIGURATION ===\n")
@@ -606,26 +606,21 @@ class VEGAStrategy(bt.Strategy):
                 'stop_level': self.protective_stop_b,
             }
             self.trade_reports.append(entry)
-            self.trade_report_file.write(f"ENTRY #{len(self.trade_reports)}\n")
+            stop_line = (
+                f"Protective Stop: {self.protective_stop_b:.2f}\n"
+                if self.protective_stop_b is not None else "")
             self.trade_report_file.write(
-                f"Time: {dt.strftime('%Y-%m-%d %H:%M:%S')}\n")
-            self.trade_report_file.write(
-                f"Direction: {entry['direction']}\n")
-            self.trade_report_file.write(
-                f"Entry Price: {entry_price:.2f}\n")
-            self.trade_report_file.write(
-                f"Size: {size} contracts\n")
-            self.trade_report_file.write(
-                f"Spread: {spread:.4f}\n")
-            self.trade_report_file.write(
-                f"Forecast: {forecast:.1f}\n")
-            self.trade_report_file.write(
-                f"ATR(B): {atr_b:.2f}\n")
-            if self.protective_stop_b is not None:
-                self.trade_report_file.write(
-                    f"Protective Stop: {self.protective_stop_b:.2f}\n")
-            self.trade_report_file.write("-" * 50 + "\n\n")
-            self.trade_report_file.flush()
+                f"ENTRY #{len(self.trade_reports)}\n"
+                f"Time: {dt.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"Direction: {entry['direction']}\n"
+                f"Entry Price: {entry_price:.2f}\n"
+                f"Size: {size} contracts\n"
+                f"Spread: {spread:.4f}\n"
+                f"Forecast: {forecast:.1f}\n"
+                f"ATR(B): {atr_b:.2f}\n"
+                f"{stop_line}"
+                + "-" * 50 + "\n\n"
+            )
         except Exception:
             pass
 
@@ -638,15 +633,12 @@ class VEGAStrategy(bt.Strategy):
             self.trade_reports[-1]['exit_reason'] = reason
             self.trade_reports[-1]['exit_time'] = dt
             self.trade_report_file.write(
-                f"EXIT #{len(self.trade_reports)}\n")
-            self.trade_report_file.write(
-                f"Time: {dt.strftime('%Y-%m-%d %H:%M:%S')}\n")
-            self.trade_report_file.write(
-                f"Exit Reason: {reason}\n")
-            self.trade_report_file.write(
-                f"P&L: ${pnl:.2f}\n")
-            self.trade_report_file.write("=" * 80 + "\n\n")
-            self.trade_report_file.flush()
+                f"EXIT #{len(self.trade_reports)}\n"
+                f"Time: {dt.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"Exit Reason: {reason}\n"
+                f"P&L: ${pnl:.2f}\n"
+                + "=" * 80 + "\n\n"
+            )
         except Exception:
             pass
 
@@ -658,11 +650,10 @@ class VEGAStrategy(bt.Strategy):
         """Update entry/exit plot lines on chart."""
         if not self.entry_exit_lines:
             return
-        nan = float('nan')
         self.entry_exit_lines.lines.entry[0] = (
-            entry_price if entry_price else nan)
+            entry_price if entry_price else math.nan)
         self.entry_exit_lines.lines.stop_loss[0] = (
-            stop_level if stop_level else nan)
+            stop_level if stop_level else math.nan)
 
     # =========================================================================
     # ENTRY EXECUTION
@@ -0,0 +1,427 @@
+"""
+Shared trade log parsing and stats for the KOI / SEDNA log analyzers.
+
+Both strategies write the same ENTRY/EXIT block layout (KOI adds a CCI
+line, SEDNA labels its ATR as "ATR (avg)"), so one compiled pattern and
+one set of column-based stats serve every analyzer.
+
+Trades are held as parallel NumPy columns (TradeArrays) so every
+group/range filter is a vectorised mask or slice.
+
+Usage:
+    from tools._trade_log import load_trade_log, calculate_stats
+
+    trades = load_trade_log(filepath)     # parse, or reuse <log>.npz
+    stats = calculate_stats(trades, trades.hour == 10)
+"""
+import re
+import os
+import sys
+import math
+import mmap
+import hashlib
+from collections import namedtuple
+
+import numpy as np
+
+# Optional: numba for the scalar streak loop (falls back to plain Python)
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+# Trade log blocks: one alternation, compiled once per process and scanned
+# in a single finditer pass. Exits accept both normal timestamps and N/A.
+# Every field is anchored to its line (no DOTALL, no .*?), and variable
+# fields are length-bounded, so a malformed block fails fast instead of
+# backtracking across the rest of the file.
+_TIMESTAMP = rb'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}'
+_TRADE_RE = re.compile(
+    rb'ENTRY #(?P<entry_id>\d{1,9})\nTime: (?P<entry_time>' + _TIMESTAMP + rb')\n'
+    rb'Entry Price: [\d.]{1,24}\nStop Loss: [\d.]{1,24}\nTake Profit: [\d.]{1,24}\n'
+    rb'SL Pips: (?P<sl_pips>[\d.]{1,24})\nATR(?: \(avg\))?: (?P<atr>[\d.]{1,24})'
+    rb'(?:\nCCI(?: \(HL2\))?: (?P<cci>[\d.-]{1,24}))?'
+    rb'|EXIT #(?P<exit_id>\d{1,9})\nTime: (?P<exit_time>' + _TIMESTAMP + rb'|N/A)\n'
+    rb'Exit Reason: (?P<reason>[^\n]{1,64})\nP&L: \$(?P<pnl>[-\d,.]{1,24})'
+)
+_ENTRY_MARK_RE = re.compile(rb'ENTRY #')
+
+TradeArrays = namedtuple(
+    'TradeArrays',
+    'atr sl_pips cci hour weekday year pnl duration_min exit_reason closed win loss',
+)
+TradeArrays.__doc__ = """Parallel per-trade columns.
+
+cci, pnl and duration_min are NaN where absent (no CCI line / no exit);
+exit_reason is an object array ('UNKNOWN' for open trades); closed, win
+and loss are precomputed boolean masks.
+"""
+
+
+def auto_ranges(values, num_bins=8):
+    """Generate adaptive range bins based on actual data distribution."""
+    if len(values) == 0:
+        return []
+    lo, hi = float(np.min(values)), float(np.max(values))
+    if lo == hi:
+        return [(lo, lo + 1)]
+    spread = hi - lo
+    raw_step = spread / num_bins
+    magnitude = 10 ** math.floor(math.log10(raw_step))
+    residual = raw_step / magnitude
+    if residual <= 1.0:
+        nice = 1.0
+    elif residual <= 2.0:
+        nice = 2.0
+    elif residual <= 2.5:
+        nice = 2.5
+    elif residual <= 5.0:
+        nice = 5.0
+    else:
+        nice = 10.0
+    step = nice * magnitude
+    bin_lo = math.floor(lo / step) * step
+    bins = []
+    while bin_lo < hi:
+        bin_hi = bin_lo + step
+        bins.append((bin_lo, bin_hi))
+        bin_lo = bin_hi
+    return bins
+
+
+def find_latest_log(log_dir, prefix, asset_filter=None):
+    """Find the most recent trade log file by modification time.
+
+    Args:
+        log_dir: Directory containing log files.
+        prefix: Log name prefix, e.g. 'KOI_trades_'.
+        asset_filter: Optional asset name (e.g. 'USDJPY') to filter.
+    """
+    logs = [f for f in os.listdir(log_dir) if f.startswith(prefix) and f.endswith('.txt')]
+    if asset_filter:
+        logs = [f for f in logs if f'{prefix}{asset_filter}' in f]
+    if not logs:
+        return None
+    logs.sort(key=lambda f: os.path.getmtime(os.path.join(log_dir, f)), reverse=True)
+    return logs[0]
+
+
+def parse_trade_log(filepath):
+    """Parse a KOI/SEDNA trade log file into TradeArrays.
+
+    Matches entries to exits by trade ID (not array index) to handle
+    incomplete trades (N/A exits) that would otherwise cause a cascading
+    mismatch in the data.
+    """
+    # Map the log rather than reading it into a str; logs are ASCII so the
+    # bytes pattern scans the mapping directly and pages in on demand
+    with open(filepath, 'rb') as f:
+        content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return _parse_mapped(content)
+    finally:
+        content.close()
+
+
+def _log_key(filepath):
+    """Short content key for a log: hash of its first 4 KiB plus size."""
+    with open(filepath, 'rb') as f:
+        head = f.read(4096)
+    digest = hashlib.sha1(head + str(os.path.getsize(filepath)).encode())
+    return digest.hexdigest()[:16]
+
+
+def load_trade_log(filepath):
+    """Return TradeArrays for a log, reusing a <log>.npz cache when fresh.
+
+    The cache is valid when it is at least as new as the log and its
+    stored key matches the log's current key (see _log_key), so edited
+    or regrown logs are re-parsed. A cache that cannot be written (e.g.
+    read-only log directory) is simply skipped.
+    """
+    cache_path = filepath + '.npz'
+    key = _log_key(filepath)
+    if (os.path.exists(cache_path)
+            and os.path.getmtime(cache_path) >= os.path.getmtime(filepath)):
+        with np.load(cache_path) as cached:
+            if str(cached['key']) == key:
+                return TradeArrays(**{name: cached[name] for name in TradeArrays._fields})
+
+    trades = parse_trade_log(filepath)
+    columns = trades._asdict()
+    # Plain unicode so the cache loads without pickle
+    columns['exit_reason'] = trades.exit_reason.astype(str)
+    try:
+        np.savez_compressed(cache_path, key=np.array(key), **columns)
+    except OSError:
+        pass
+    return trades
+
+
+def _parse_mapped(content):
+    """Fill trade columns from a mapped (bytes-like) log buffer."""
+    # Upper bound on rows; exits are matched back to entries by trade ID
+    n = len(_ENTRY_MARK_RE.findall(content))
+    entry_id = np.empty(n, dtype=np.int32)
+    atr = np.empty(n, dtype=np.float64)
+    sl_pips = np.empty(n, dtype=np.float64)
+    cci = np.full(n, np.nan, dtype=np.float64)
+    # P&L kept as ASCII and converted in one C cast after the scan
+    pnl_text = np.full(n, b'nan', dtype='S24')
+    exit_reason = np.full(n, 'UNKNOWN', dtype=object)
+    # Timestamps parsed by NumPy's C datetime64 parser, no datetime objects
+    entry_time = np.empty(n, dtype='datetime64[s]')
+    exit_time = np.full(n, np.datetime64('NaT'), dtype='datetime64[s]')
+    # Exit columns, filled in log order and joined to entries after the scan
+    exit_id = np.empty(n, dtype=np.int32)
+    exit_open = np.zeros(n, dtype=bool)
+    exit_time_col = np.full(n, np.datetime64('NaT'), dtype='datetime64[s]')
+    exit_reason_col = np.full(n, 'UNKNOWN', dtype=object)
+    exit_pnl_text = np.full(n, b'nan', dtype='S24')
+
+    i = 0
+    j = 0
+    for m in _TRADE_RE.finditer(content):
+        if m['entry_id'] is not None:
+            entry_id[i] = int(m['entry_id'])
+            entry_time[i] = m['entry_time'].decode()
+            sl_pips[i] = float(m['sl_pips'])
+            atr[i] = float(m['atr'])
+            if m['cci'] is not None:
+                cci[i] = float(m['cci'])
+            i += 1
+            continue
+        if j == n:
+            continue
+        exit_id[j] = int(m['exit_id'])
+        exit_time_str = m['exit_time'].decode().strip()
+        reason = m['reason'].decode().strip()
+        # Incomplete trades (still open at end of backtest) are dropped below
+        if exit_time_str == 'N/A' or reason == 'N/A':
+            exit_open[j] = True
+        else:
+            exit_time_col[j] = exit_time_str
+            exit_reason_col[j] = reason
+            exit_pnl_text[j] = m['pnl'].replace(b',', b'')
+        j += 1
+
+    # Join exits to entries by trade ID in one searchsorted pass
+    if not i:
+        j = 0
+    ids = entry_id[:i]
+    order = np.argsort(ids, kind='stable')
+    pos = np.searchsorted(ids, exit_id[:j], sorter=order)
+    pos = order[np.minimum(pos, i - 1)]
+    hit = ids[pos] == exit_id[:j]
+    rows = pos[hit]
+    exit_open = exit_open[:j][hit]
+
+    keep = np.ones(i, dtype=bool)
+    keep[rows[exit_open]] = False
+    skipped = int(np.count_nonzero(exit_open))
+    if skipped:
+        print(f'  (Skipped {skipped} incomplete trades with N/A exit)')
+
+    done = rows[~exit_open]
+    src = np.flatnonzero(hit)[~exit_open]
+    exit_time[done] = exit_time_col[src]
+    exit_reason[done] = exit_reason_col[src]
+    pnl_text[done] = exit_pnl_text[src]
+
+    pnl = pnl_text[:i][keep].astype(np.float64)
+    entry_time = entry_time[:i][keep]
+    exit_time = exit_time[:i][keep]
+
+    # Calendar fields straight from the epoch offsets (1970-01-01 was a Thursday)
+    days = entry_time.astype('datetime64[D]').astype(np.int64)
+    hours = entry_time.astype('datetime64[h]').astype(np.int64)
+    years = entry_time.astype('datetime64[Y]').astype(np.int64) + 1970
+    duration_min = np.where(
+        np.isnat(exit_time),
+        np.nan,
+        (exit_time - entry_time).astype(np.int64) / 60.0,
+    )
+    return TradeArrays(
+        atr=atr[:i][keep],
+        sl_pips=sl_pips[:i][keep],
+        cci=cci[:i][keep],
+        hour=(hours % 24).astype(np.int16),
+        weekday=((days + 3) % 7).astype(np.int16),
+        year=years.astype(np.int16),
+        pnl=pnl,
+        duration_min=duration_min,
+        exit_reason=exit_reason[:i][keep],
+        closed=~np.isnan(pnl),
+        win=pnl > 0,
+        loss=pnl < 0,
+    )
+
+
+@njit(cache=True)
+def _max_streaks(pnl):
+    max_wins = max_losses = curr_wins = curr_losses = 0
+    for i in range(pnl.size):
+        if pnl[i] > 0:
+            curr_wins += 1
+            curr_losses = 0
+            if curr_wins > max_wins:
+                max_wins = curr_wins
+        else:
+            curr_losses += 1
+            curr_wins = 0
+            if curr_losses > max_losses:
+                max_losses = curr_losses
+    return max_wins, max_losses
+
+
+def max_streaks(trades):
+    """Return (max consecutive wins, max consecutive losses) over closed trades.
+
+    Break-even trades count as losses.
+    """
+    return _max_streaks(np.ascontiguousarray(trades.pnl[trades.closed]))
+
+
+def _summarize(total, wins, losses, gross_profit, gross_loss):
+    """Build the stats dict from already-reduced counts and sums."""
+    if not total:
+        return None
+    gross_profit = float(gross_profit)
+    gross_loss = float(gross_loss)
+    return {
+        'total': int(total),
+        'wins': int(wins),
+        'losses': int(losses),
+        'win_rate': wins / total * 100,
+        'gross_profit': gross_profit,
+        'gross_loss': gross_loss,
+        'net_pnl': gross_profit - gross_loss,
+        'profit_factor': gross_profit / gross_loss if gross_loss > 0 else float('inf'),
+    }
+
+
+def _reduce(pnl, closed, win, loss):
+    """Reduce P&L under precomputed masks (no boolean-index copies)."""
+    return _summarize(
+        np.count_nonzero(closed),
+        np.count_nonzero(win),
+        np.count_nonzero(loss),
+        pnl.sum(where=win),
+        -pnl.sum(where=loss),
+    )
+
+
+def _grouped(codes, size, pnl, win, loss):
+    """Per-code (counts, wins, losses, gross profit, gross loss) arrays.
+
+    The grouped equivalent of _reduce: one np.bincount per column over
+    integer group codes, with positive/negative P&L split up front so no
+    per-group Python work is needed.
+    """
+    return (
+        np.bincount(codes, minlength=size),
+        np.bincount(codes, weights=win.astype(np.float64), minlength=size),
+        np.bincount(codes, weights=loss.astype(np.float64), minlength=size),
+        np.bincount(codes, weights=np.maximum(pnl, 0.0), minlength=size),
+        np.bincount(codes, weights=np.maximum(-pnl, 0.0), minlength=size),
+    )
+
+
+def calculate_stats(trades, mask=None):
+    """Calculate basic statistics for the closed trades selected by mask.
+
+    Reuses the parse-time closed/win/loss masks; a selection only ANDs
+    them with mask.
+    """
+    if mask is None:
+        return _reduce(trades.pnl, trades.closed, trades.win, trades.loss)
+    return _reduce(trades.pnl, trades.closed & mask, trades.win & mask, trades.loss & mask)
+
+
+def emit(rows):
+    """Write a block of output lines with a single stdout write."""
+    sys.stdout.write('\n'.join(rows))
+    sys.stdout.write('\n')
+
+
+def format_stats_row(label, stats):
+    """Format one 'label | Trades | Win% | PF | Net P&L' table row."""
+    pf_str = f'{stats["profit_factor"]:.2f}' if stats['profit_factor'] < 100 else 'INF'
+    return f'{label} | {stats["total"]:6d} | {stats["win_rate"]:4.0f}% | {pf_str:>4} | ${stats["net_pnl"]:>10,.0f}'
+
+
+def print_section(title):
+    """Print section header."""
+    emit([f'\n{"=" * 60}', title, "=" * 60])
+
+
+def analyze_by_group(trades, keys, group_name, format_func=str):
+    """Generic analysis by grouping key array (one key per trade).
+
+    Keys are mapped to small integer codes (offset for integer keys,
+    np.unique otherwise) and every per-group sum comes from _grouped,
+    so there is no per-group filtering or Python dispatch.
+    """
+    rows = [f'\n{group_name:15} | Trades | Win%  | PF   | Net P&L', '-' * 55]
+
+    closed = trades.closed
+    keys = keys[closed]
+    if not keys.size:
+        emit(rows)
+        return
+    pnl = trades.pnl[closed]
+
+    if keys.dtype.kind in 'iu':
+        base = int(keys.min())
+        codes = keys.astype(np.int64) - base
+        labels = np.arange(int(codes.max()) + 1) + base
+    else:
+        labels, codes = np.unique(keys, return_inverse=True)
+
+    counts, wins, losses, gross_profit, gross_loss = _grouped(
+        codes, len(labels), pnl, trades.win[closed], trades.loss[closed]
+    )
+
+    for j in np.flatnonzero(counts):
+        stats = _summarize(counts[j], wins[j], losses[j], gross_profit[j], gross_loss[j])
+        rows.append(format_stats_row(f'{format_func(labels[j]):15}', stats))
+    emit(rows)
+
+
+def analyze_by_range(trades, values, ranges, range_name, decimals=0):
+    """Analyze by value ranges over a per-trade value array.
+
+    Closed trades are sorted by value once; each [low, high) range is
+    then a contiguous slice located with np.searchsorted.
+    """
+    rows = [f'\n{range_name:15} | Trades | Win%  | PF   | Net P&L', '-' * 55]
+
+    closed = trades.closed
+    order = np.argsort(values[closed], kind='stable')
+    sorted_values = values[closed][order]
+    pnl = trades.pnl[closed][order]
+    win = trades.win[closed][order]
+    loss = trades.loss[closed][order]
+
+    for low, high in ranges:
+        a, b = np.searchsorted(sorted_values, (low, high))
+        bucket = slice(a, b)
+        stats = _summarize(
+            b - a,
+            np.count_nonzero(win[bucket]),
+            np.count_nonzero(loss[bucket]),
+            pnl[bucket].sum(where=win[bucket]),
+            -pnl[bucket].sum(where=loss[bucket]),
+        )
+        if stats:
+            if decimals > 0:
+                label = f'{low:.{decimals}f}-{high:.{decimals}f}'
+            else:
+                label = f'{int(low):3d}-{int(high):3d}'
+            rows.append(format_stats_row(f'{label:15}', stats))
+    emit(rows)
+
@@ -205,31 +205,42 @@ def parse_helix_log(filepath: str) -> List[Dict]:
 
 def calculate_stats(trades: List[Dict]) -> Optional[Dict]:
     """Calculate statistics for a list of trades."""
-    closed = [t for t in trades if 'pnl' in t]
-    if not closed:
+    # Single pass: running counts/sums instead of re-filtering per metric
+    total = wins = losses = 0
+    gross_profit = gross_loss = 0.0
+    max_win = float('-inf')
+    max_loss = float('inf')
+    for t in trades:
+        if 'pnl' not in t:
+            continue
+        pnl = t['pnl']
+        total += 1
+        if pnl > 0:
+            wins += 1
+            gross_profit += pnl
+        elif pnl < 0:
+            losses += 1
+            gross_loss -= pnl
+        if pnl > max_win:
+            max_win = pnl
+        if pnl < max_loss:
+            max_loss = pnl
+    if not total:
         return None
     
-    winners = [t for t in closed if t['pnl'] > 0]
-    losers = [t for t in closed if t['pnl'] < 0]
-    
-    gross_profit = sum(t['pnl'] for t in winners)
-    gross_loss = sum(abs(t['pnl']) for t in losers)
-    
-    pnl_list = [t['pnl'] for t in closed]
-    
     return {
-        'total': len(closed),
-        'wins': len(winners),
-        'losses': len(losers),
-        'win_rate': len(winners) / len(closed) * 100 if closed else 0,
+        'total': total,
+        'wins': wins,
+        'losses': losses,
+        'win_rate': wins / total * 100,
         'gross_profit': gross_profit,
         'gross_loss': gross_loss,
         'net_pnl': gross_profit - gross_loss,
         'profit_factor': gross_profit / gross_loss if gross_loss > 0 else float('inf'),
-        'avg_win': gross_profit / len(winners) if winners else 0,
-        'avg_loss': gross_loss / len(losers) if losers else 0,
-        'max_win': max(pnl_list) if pnl_list else 0,
-        'max_loss': min(pnl_list) if pnl_list else 0,
+        'avg_win': gross_profit / wins if wins else 0,
+        'avg_loss': gross_loss / losses if losses else 0,
+        'max_win': max_win,
+        'max_loss': max_loss,
     }
 
 
@@ -9,198 +9,33 @@ Analyzes KOI trade logs to find patterns by:
 - CCI ranges
 - Yearly breakdown
 
+Parsing and stats live in tools/_trade_log.py (shared with the other
+log analyzers).
+
 Usage:
     python analyze_koi.py                    # Analyze latest log
     python analyze_koi.py KOI_trades_xxx.txt  # Analyze specific log
 """
-import re
 import os
 import sys
 import math
-from datetime import datetime
-from collections import defaultdict
-
-
-def _auto_ranges(values, num_bins=8):
-    """Generate adaptive range bins based on actual data distribution."""
-    if not values:
-        return []
-    lo, hi = min(values), max(values)
-    if lo == hi:
-        return [(lo, lo + 1)]
-    spread = hi - lo
-    raw_step = spread / num_bins
-    magnitude = 10 ** math.floor(math.log10(raw_step))
-    residual = raw_step / magnitude
-    if residual <= 1.0:
-        nice = 1.0
-    elif residual <= 2.0:
-        nice = 2.0
-    elif residual <= 2.5:
-        nice = 2.5
-    elif residual <= 5.0:
-        nice = 5.0
-    else:
-        nice = 10.0
-    step = nice * magnitude
-    bin_lo = math.floor(lo / step) * step
-    bins = []
-    while bin_lo < hi:
-        bin_hi = bin_lo + step
-        bins.append((bin_lo, bin_hi))
-        bin_lo = bin_hi
-    return bins
-
 
-def find_latest_log(log_dir, asset_filter=None):
-    """Find the most recent KOI log file by modification time.
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, '..'))
+sys.path.insert(0, PROJECT_ROOT)
 
-    Args:
-        log_dir: Directory containing log files.
-        asset_filter: Optional asset name (e.g. 'USDJPY') to filter.
-    """
-    logs = [f for f in os.listdir(log_dir) if f.startswith('KOI_trades_') and f.endswith('.txt')]
-    if asset_filter:
-        logs = [f for f in logs if f'KOI_trades_{asset_filter}' in f]
-    if not logs:
-        return None
-    logs.sort(key=lambda f: os.path.getmtime(os.path.join(log_dir, f)), reverse=True)
-    return logs[0]
-
-
-def parse_log(filepath):
-    """Parse KOI trade log file.
-
-    Matches entries to exits by trade ID (not array index) to handle
-    incomplete trades (N/A exits) that would otherwise cause a cascading
-    mismatch in the data.
-    """
-    with open(filepath, 'r') as f:
-        content = f.read()
-    
-    # Parse entries (KOI format includes CCI)
-    entries = re.findall(
-        r'ENTRY #(\d+)\nTime: ([\d-]+ [\d:]+)\nEntry Price: ([\d.]+)\n'
-        r'Stop Loss: ([\d.]+)\nTake Profit: ([\d.]+)\nSL Pips: ([\d.]+)\n'
-        r'ATR: ([\d.]+)\nCCI: ([\d.-]+)',
-        content
-    )
-    
-    # Parse exits — accept both normal timestamps and N/A
-    exits_raw = re.findall(
-        r'EXIT #(\d+)\nTime: ([^\n]+)\nExit Reason: ([^\n]+)\n'
-        r'P&L: \$([-\d,.]+)',
-        content
-    )
-    
-    # Index exits by trade ID for correct matching
-    exits_by_id = {}
-    for ex in exits_raw:
-        exits_by_id[int(ex[0])] = ex
-    
-    # Build trades list
-    trades = []
-    skipped = 0
-    for entry in entries:
-        trade_id = int(entry[0])
-        trade = {
-            'id': trade_id,
-            'entry_time': datetime.strptime(entry[1], '%Y-%m-%d %H:%M:%S'),
-            'entry_price': float(entry[2]),
-            'sl': float(entry[3]),
-            'tp': float(entry[4]),
-            'sl_pips': float(entry[5]),
-            'atr': float(entry[6]),
-            'cci': float(entry[7]),
-        }
-        ex = exits_by_id.get(trade_id)
-        if ex:
-            exit_time_str = ex[1].strip()
-            exit_reason = ex[2].strip()
-            # Skip incomplete trades (still open at end of backtest)
-            if exit_time_str == 'N/A' or exit_reason == 'N/A':
-                skipped += 1
-                continue
-            trade['exit_time'] = datetime.strptime(exit_time_str, '%Y-%m-%d %H:%M:%S')
-            trade['exit_reason'] = exit_reason
-            trade['pnl'] = float(ex[3].replace(',', ''))
-            trade['duration_min'] = (trade['exit_time'] - trade['entry_time']).total_seconds() / 60
-            trade['win'] = trade['pnl'] > 0
-        trades.append(trade)
-    
-    if skipped:
-        print(f'  (Skipped {skipped} incomplete trades with N/A exit)')
-    
-    return trades
-
-
-def calculate_stats(trades):
-    """Calculate basic statistics for a list of trades."""
-    if not trades:
-        return None
-    
-    closed = [t for t in trades if 'pnl' in t]
-    if not closed:
-        return None
-    
-    winners = [t for t in closed if t['pnl'] > 0]
-    losers = [t for t in closed if t['pnl'] < 0]
-    
-    gross_profit = sum(t['pnl'] for t in winners)
-    gross_loss = sum(abs(t['pnl']) for t in losers)
-    
-    return {
-        'total': len(closed),
-        'wins': len(winners),
-        'losses': len(losers),
-        'win_rate': len(winners) / len(closed) * 100 if closed else 0,
-        'gross_profit': gross_profit,
-        'gross_loss': gross_loss,
-        'net_pnl': gross_profit - gross_loss,
-        'profit_factor': gross_profit / gross_loss if gross_loss > 0 else float('inf'),
-    }
-
-
-def print_section(title):
-    """Print section header."""
-    print(f'\n{"=" * 60}')
-    print(f'{title}')
-    print("=" * 60)
-
-
-def analyze_by_group(trades, key_func, group_name, format_func=str):
-    """Generic analysis by grouping key."""
-    groups = defaultdict(list)
-    for t in trades:
-        if 'pnl' in t:
-            key = key_func(t)
-            groups[key].append(t)
-    
-    print(f'\n{group_name:15} | Trades | Win%  | PF   | Net P&L')
-    print('-' * 55)
-    
-    for key in sorted(groups.keys()):
-        stats = calculate_stats(groups[key])
-        if stats:
-            pf_str = f'{stats["profit_factor"]:.2f}' if stats['profit_factor'] < 100 else 'INF'
-            print(f'{format_func(key):15} | {stats["total"]:6d} | {stats["win_rate"]:4.0f}% | {pf_str:>4} | ${stats["net_pnl"]:>10,.0f}')
-
-
-def analyze_by_range(trades, value_func, ranges, range_name, decimals=0):
-    """Analyze by value ranges."""
-    print(f'\n{range_name:15} | Trades | Win%  | PF   | Net P&L')
-    print('-' * 55)
-    
-    for low, high in ranges:
-        filtered = [t for t in trades if 'pnl' in t and low <= value_func(t) < high]
-        if filtered:
-            stats = calculate_stats(filtered)
-            pf_str = f'{stats["profit_factor"]:.2f}' if stats['profit_factor'] < 100 else 'INF'
-            if decimals > 0:
-                label = f'{low:.{decimals}f}-{high:.{decimals}f}'
-            else:
-                label = f'{int(low):3d}-{int(high):3d}'
-            print(f'{label:15} | {stats["total"]:6d} | {stats["win_rate"]:4.0f}% | {pf_str:>4} | ${stats["net_pnl"]:>10,.0f}')
+from tools._trade_log import (
+    auto_ranges,
+    find_latest_log,
+    load_trade_log,
+    calculate_stats,
+    max_streaks,
+    print_section,
+    emit,
+    format_stats_row,
+    analyze_by_group,
+    analyze_by_range,
+)
 
 
 def main():
@@ -215,12 +50,12 @@ def main():
         if arg.endswith('.txt'):
             log_file = arg
         else:
-            log_file = find_latest_log(log_dir, asset_filter=arg.upper())
+            log_file = find_latest_log(log_dir, 'KOI_trades_', asset_filter=arg.upper())
             if not log_file:
                 print(f'No KOI log files found for asset "{arg}" in {log_dir}')
                 return
     else:
-        log_file = find_latest_log(log_dir)
+        log_file = find_latest_log(log_dir, 'KOI_trades_')
         if not log_file:
             print(f'No KOI log files found in {log_dir}')
             return
@@ -233,67 +68,57 @@ def main():
     print(f'Analyzing: {log_file}')
     
     # Parse trades
-    trades = parse_log(filepath)
-    print(f'Total Entries: {len(trades)}')
+    trades = load_trade_log(filepath)
+    print(f'Total Entries: {len(trades.atr)}')
     
     # Overall stats
     print_section('OVERALL STATISTICS')
     stats = calculate_stats(trades)
     if stats:
-        print(f'Total Trades:   {stats["total"]}')
-        print(f'Winners:        {stats["wins"]} ({stats["win_rate"]:.1f}%)')
-        print(f'Losers:         {stats["losses"]} ({100-stats["win_rate"]:.1f}%)')
-        print(f'Gross Profit:   ${stats["gross_profit"]:,.0f}')
-        print(f'Gross Loss:     ${stats["gross_loss"]:,.0f}')
-        print(f'Net P&L:        ${stats["net_pnl"]:,.0f}')
-        print(f'Profit Factor:  {stats["profit_factor"]:.2f}')
+        emit([
+            f'Total Trades:   {stats["total"]}',
+            f'Winners:        {stats["wins"]} ({stats["win_rate"]:.1f}%)',
+            f'Losers:         {stats["losses"]} ({100-stats["win_rate"]:.1f}%)',
+            f'Gross Profit:   ${stats["gross_profit"]:,.0f}',
+            f'Gross Loss:     ${stats["gross_loss"]:,.0f}',
+            f'Net P&L:        ${stats["net_pnl"]:,.0f}',
+            f'Profit Factor:  {stats["profit_factor"]:.2f}',
+        ])
     
     # Consecutive wins/losses
-    max_wins, max_losses = 0, 0
-    curr_wins, curr_losses = 0, 0
-    for t in trades:
-        if t.get('pnl', 0) > 0:
-            curr_wins += 1
-            max_wins = max(max_wins, curr_wins)
-            curr_losses = 0
-        elif 'pnl' in t:
-            curr_losses += 1
-            max_losses = max(max_losses, curr_losses)
-            curr_wins = 0
+    max_wins, max_losses = max_streaks(trades)
     print(f'\nMax Consecutive Wins:   {max_wins}')
     print(f'Max Consecutive Losses: {max_losses}')
     
-    # ATR stats
-    atrs = [t['atr'] for t in trades]
-    winners = [t for t in trades if t.get('pnl', 0) > 0]
-    losers = [t for t in trades if t.get('pnl', 0) < 0]
-    print(f'\nATR - Min: {min(atrs):.5f}, Max: {max(atrs):.5f}, Avg: {sum(atrs)/len(atrs):.5f}')
-    if winners:
-        print(f'ATR Winners Avg: {sum(t["atr"] for t in winners)/len(winners):.5f}')
-    if losers:
-        print(f'ATR Losers Avg:  {sum(t["atr"] for t in losers)/len(losers):.5f}')
-    
-    # CCI stats
-    ccis = [t['cci'] for t in trades]
-    print(f'\nCCI - Min: {min(ccis):.1f}, Max: {max(ccis):.1f}, Avg: {sum(ccis)/len(ccis):.1f}')
-    if winners:
-        print(f'CCI Winners Avg: {sum(t["cci"] for t in winners)/len(winners):.1f}')
-    if losers:
-        print(f'CCI Losers Avg:  {sum(t["cci"] for t in losers)/len(losers):.1f}')
-    
-    # SL Pips stats
-    sl_pips = [t['sl_pips'] for t in trades]
-    print(f'\nSL Pips - Min: {min(sl_pips):.1f}, Max: {max(sl_pips):.1f}, Avg: {sum(sl_pips)/len(sl_pips):.1f}')
-    if winners:
-        print(f'SL Pips Winners Avg: {sum(t["sl_pips"] for t in winners)/len(winners):.1f}')
-    if losers:
-        print(f'SL Pips Losers Avg:  {sum(t["sl_pips"] for t in losers)/len(losers):.1f}')
+    # ATR / CCI / SL Pips stats
+    win = trades.win
+    loss = trades.loss
+    atrs = trades.atr
+    print(f'\nATR - Min: {atrs.min():.5f}, Max: {atrs.max():.5f}, Avg: {atrs.mean():.5f}')
+    if win.any():
+        print(f'ATR Winners Avg: {atrs[win].mean():.5f}')
+    if loss.any():
+        print(f'ATR Losers Avg:  {atrs[loss].mean():.5f}')
+    
+    ccis = trades.cci
+    print(f'\nCCI - Min: {ccis.min():.1f}, Max: {ccis.max():.1f}, Avg: {ccis.mean():.1f}')
+    if win.any():
+        print(f'CCI Winners Avg: {ccis[win].mean():.1f}')
+    if loss.any():
+        print(f'CCI Losers Avg:  {ccis[loss].mean():.1f}')
+    
+    sl_pips = trades.sl_pips
+    print(f'\nSL Pips - Min: {sl_pips.min():.1f}, Max: {sl_pips.max():.1f}, Avg: {sl_pips.mean():.1f}')
+    if win.any():
+        print(f'SL Pips Winners Avg: {sl_pips[win].mean():.1f}')
+    if loss.any():
+        print(f'SL Pips Losers Avg:  {sl_pips[loss].mean():.1f}')
     
     # By Hour
     print_section('ANALYSIS BY ENTRY HOUR')
     analyze_by_group(
         trades,
-        lambda t: t['entry_time'].hour,
+        trades.hour,
         'Hour',
         lambda h: f'{h:02d}:00'
     )
@@ -303,7 +128,7 @@ def main():
     dow_names = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
     analyze_by_group(
         trades,
-        lambda t: t['entry_time'].weekday(),
+        trades.weekday,
         'Day',
         lambda d: dow_names[d]
     )
@@ -312,40 +137,39 @@ def main():
     print_section('ANALYSIS BY YEAR')
     analyze_by_group(
         trades,
-        lambda t: t['entry_time'].year,
+        trades.year,
         'Year',
         str
     )
     
+    closed = trades.closed
+    
     # By SL Pips ranges (adaptive bins)
     print_section('ANALYSIS BY SL PIPS')
-    sl_vals = [t['sl_pips'] for t in trades if 'pnl' in t]
-    if sl_vals:
-        sl_ranges = _auto_ranges(sl_vals)
-        analyze_by_range(trades, lambda t: t['sl_pips'], sl_ranges, 'SL Pips')
+    if closed.any():
+        sl_ranges = auto_ranges(sl_pips[closed])
+        analyze_by_range(trades, sl_pips, sl_ranges, 'SL Pips')
     
     # By ATR ranges (adaptive bins)
     print_section('ANALYSIS BY ATR')
-    atr_vals = [t['atr'] for t in trades if 'pnl' in t]
-    if atr_vals:
-        atr_ranges = _auto_ranges(atr_vals)
+    if closed.any():
+        atr_ranges = auto_ranges(atrs[closed])
         # Auto-detect decimal places from step size
         step = atr_ranges[0][1] - atr_ranges[0][0] if atr_ranges else 0.01
         decimals_atr = max(0, -math.floor(math.log10(step))) + 1 if step > 0 else 2
-        analyze_by_range(trades, lambda t: t['atr'], atr_ranges, 'ATR Range', decimals=decimals_atr)
+        analyze_by_range(trades, atrs, atr_ranges, 'ATR Range', decimals=decimals_atr)
     
     # By CCI ranges (adaptive bins)
     print_section('ANALYSIS BY CCI')
-    cci_vals = [t['cci'] for t in trades if 'pnl' in t and 'cci' in t]
-    if cci_vals:
-        cci_ranges = _auto_ranges(cci_vals)
-        analyze_by_range(trades, lambda t: t['cci'], cci_ranges, 'CCI Range')
+    if closed.any():
+        cci_ranges = auto_ranges(ccis[closed])
+        analyze_by_range(trades, ccis, cci_ranges, 'CCI Range')
     
     # By Exit Reason
     print_section('ANALYSIS BY EXIT REASON')
     analyze_by_group(
         trades,
-        lambda t: t.get('exit_reason', 'UNKNOWN'),
+        trades.exit_reason,
         'Exit Reason',
         str
     )
@@ -358,15 +182,13 @@ def main():
     ]
     duration_labels = ['<1h', '1-4h', '4-8h', '8-24h', '1-2d', '>2d']
     
-    print(f'\n{"Duration":15} | Trades | Win%  | PF   | Net P&L')
-    print('-' * 55)
-    
+    rows = [f'\n{"Duration":15} | Trades | Win%  | PF   | Net P&L', '-' * 55]
+    duration = trades.duration_min
     for i, (low, high) in enumerate(duration_ranges):
-        filtered = [t for t in trades if 'duration_min' in t and low <= t['duration_min'] < high]
-        if filtered:
-            stats = calculate_stats(filtered)
-            pf_str = f'{stats["profit_factor"]:.2f}' if stats['profit_factor'] < 100 else 'INF'
-            print(f'{duration_labels[i]:15} | {stats["total"]:6d} | {stats["win_rate"]:4.0f}% | {pf_str:>4} | ${stats["net_pnl"]:>10,.0f}')
+        stats = calculate_stats(trades, (duration >= low) & (duration < high))
+        if stats:
+            rows.append(format_stats_row(f'{duration_labels[i]:15}', stats))
+    emit(rows)
     
     print('\n' + '=' * 60)
 
@@ -160,24 +160,28 @@ def parse_log(filepath):
 
 def calculate_stats(trades):
     """Calculate basic statistics for a list of trades."""
-    if not trades:
-        return None
-
-    closed = [t for t in trades if 'pnl' in t]
-    if not closed:
+    # Single pass: running counts/sums instead of re-filtering per metric
+    total = wins = losses = 0
+    gross_profit = gross_loss = 0.0
+    for t in trades:
+        if 'pnl' not in t:
+            continue
+        pnl = t['pnl']
+        total += 1
+        if pnl > 0:
+            wins += 1
+            gross_profit += pnl
+        elif pnl < 0:
+            losses += 1
+            gross_loss -= pnl
+    if not total:
         return None
 
-    winners = [t for t in closed if t['pnl'] > 0]
-    losers = [t for t in closed if t['pnl'] < 0]
-
-    gross_profit = sum(t['pnl'] for t in winners)
-    gross_loss = sum(abs(t['pnl']) for t in losers)
-
     return {
-        'total': len(closed),
-        'wins': len(winners),
-        'losses': len(losers),
-        'win_rate': len(winners) / len(closed) * 100 if closed else 0,
+        'total': total,
+        'wins': wins,
+        'losses': losses,
+        'win_rate': wins / total * 100,
         'gross_profit': gross_profit,
         'gross_loss': gross_loss,
         'net_pnl': gross_profit - gross_loss,
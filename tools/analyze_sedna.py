@@ -8,197 +8,31 @@ Analyzes SEDNA trade logs to find patterns by:
 - ATR ranges
 - Yearly breakdown
 
+Parsing and stats live in tools/_trade_log.py (shared with the other
+log analyzers).
+
 Usage:
     python analyze_sedna.py                    # Analyze latest log
     python analyze_sedna.py SEDNA_trades_xxx.txt  # Analyze specific log
 """
-import re
 import os
 import sys
-import math
-from datetime import datetime
-from collections import defaultdict
-
-
-def _auto_ranges(values, num_bins=8):
-    """Generate adaptive range bins based on actual data distribution."""
-    if not values:
-        return []
-    lo, hi = min(values), max(values)
-    if lo == hi:
-        return [(lo, lo + 1)]
-    spread = hi - lo
-    raw_step = spread / num_bins
-    magnitude = 10 ** math.floor(math.log10(raw_step))
-    residual = raw_step / magnitude
-    if residual <= 1.0:
-        nice = 1.0
-    elif residual <= 2.0:
-        nice = 2.0
-    elif residual <= 2.5:
-        nice = 2.5
-    elif residual <= 5.0:
-        nice = 5.0
-    else:
-        nice = 10.0
-    step = nice * magnitude
-    bin_lo = math.floor(lo / step) * step
-    bins = []
-    while bin_lo < hi:
-        bin_hi = bin_lo + step
-        bins.append((bin_lo, bin_hi))
-        bin_lo = bin_hi
-    return bins
-
-
-def find_latest_log(log_dir, asset_filter=None):
-    """Find the most recent SEDNA log file by modification time.
-
-    Args:
-        log_dir: Directory containing log files.
-        asset_filter: Optional asset name (e.g. 'EURUSD') to filter.
-    """
-    logs = [f for f in os.listdir(log_dir) if f.startswith('SEDNA_trades_') and f.endswith('.txt')]
-    if asset_filter:
-        logs = [f for f in logs if f'SEDNA_trades_{asset_filter}' in f]
-    if not logs:
-        return None
-    logs.sort(key=lambda f: os.path.getmtime(os.path.join(log_dir, f)), reverse=True)
-    return logs[0]
-
 
-def parse_log(filepath):
-    """Parse SEDNA trade log file.
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, '..'))
+sys.path.insert(0, PROJECT_ROOT)
 
-    Matches entries to exits by trade ID (not array index) to handle
-    incomplete trades (N/A exits) that would otherwise cause a cascading
-    mismatch in the data.
-    """
-    with open(filepath, 'r') as f:
-        content = f.read()
-    
-    # Parse entries
-    entries = re.findall(
-        r'ENTRY #(\d+)\nTime: ([\d-]+ [\d:]+)\nEntry Price: ([\d.]+)\n'
-        r'Stop Loss: ([\d.]+)\nTake Profit: ([\d.]+)\nSL Pips: ([\d.]+)\n'
-        r'ATR \(avg\): ([\d.]+)',
-        content
-    )
-    
-    # Parse exits — accept both normal timestamps and N/A
-    exits_raw = re.findall(
-        r'EXIT #(\d+)\nTime: ([^\n]+)\nExit Reason: ([^\n]+)\n'
-        r'P&L: \$([-\d,.]+)',
-        content
-    )
-    
-    # Index exits by trade ID for correct matching
-    exits_by_id = {}
-    for ex in exits_raw:
-        exits_by_id[int(ex[0])] = ex
-    
-    # Build trades list
-    trades = []
-    skipped = 0
-    for entry in entries:
-        trade_id = int(entry[0])
-        trade = {
-            'id': trade_id,
-            'entry_time': datetime.strptime(entry[1], '%Y-%m-%d %H:%M:%S'),
-            'entry_price': float(entry[2]),
-            'sl': float(entry[3]),
-            'tp': float(entry[4]),
-            'sl_pips': float(entry[5]),
-            'atr': float(entry[6]),
-        }
-        ex = exits_by_id.get(trade_id)
-        if ex:
-            exit_time_str = ex[1].strip()
-            exit_reason = ex[2].strip()
-            # Skip incomplete trades (still open at end of backtest)
-            if exit_time_str == 'N/A' or exit_reason == 'N/A':
-                skipped += 1
-                continue
-            trade['exit_time'] = datetime.strptime(exit_time_str, '%Y-%m-%d %H:%M:%S')
-            trade['exit_reason'] = exit_reason
-            trade['pnl'] = float(ex[3].replace(',', ''))
-            trade['duration_min'] = (trade['exit_time'] - trade['entry_time']).total_seconds() / 60
-            trade['win'] = trade['pnl'] > 0
-        trades.append(trade)
-    
-    if skipped:
-        print(f'  (Skipped {skipped} incomplete trades with N/A exit)')
-    
-    return trades
-
-
-def calculate_stats(trades):
-    """Calculate basic statistics for a list of trades."""
-    if not trades:
-        return None
-    
-    closed = [t for t in trades if 'pnl' in t]
-    if not closed:
-        return None
-    
-    winners = [t for t in closed if t['pnl'] > 0]
-    losers = [t for t in closed if t['pnl'] < 0]
-    
-    gross_profit = sum(t['pnl'] for t in winners)
-    gross_loss = sum(abs(t['pnl']) for t in losers)
-    
-    return {
-        'total': len(closed),
-        'wins': len(winners),
-        'losses': len(losers),
-        'win_rate': len(winners) / len(closed) * 100 if closed else 0,
-        'gross_profit': gross_profit,
-        'gross_loss': gross_loss,
-        'net_pnl': gross_profit - gross_loss,
-        'profit_factor': gross_profit / gross_loss if gross_loss > 0 else float('inf'),
-    }
-
-
-def print_section(title):
-    """Print section header."""
-    print(f'\n{"=" * 60}')
-    print(f'{title}')
-    print("=" * 60)
-
-
-def analyze_by_group(trades, key_func, group_name, format_func=str):
-    """Generic analysis by grouping key."""
-    groups = defaultdict(list)
-    for t in trades:
-        if 'pnl' in t:
-            key = key_func(t)
-            groups[key].append(t)
-    
-    print(f'\n{group_name:15} | Trades | Win%  | PF   | Net P&L')
-    print('-' * 55)
-    
-    for key in sorted(groups.keys()):
-        stats = calculate_stats(groups[key])
-        if stats:
-            pf_str = f'{stats["profit_factor"]:.2f}' if stats['profit_factor'] < 100 else 'INF'
-            print(f'{format_func(key):15} | {stats["total"]:6d} | {stats["win_rate"]:4.0f}% | {pf_str:>4} | ${stats["net_pnl"]:>10,.0f}')
-
-
-def analyze_by_range(trades, value_func, ranges, range_name, decimals=0):
-    """Analyze by value ranges."""
-    print(f'\n{range_name:15} | Trades | Win%  | PF   | Net P&L')
-    print('-' * 55)
-    
-    for low, high in ranges:
-        filtered = [t for t in trades if 'pnl' in t and low <= value_func(t) < high]
-        if filtered:
-            stats = calculate_stats(filtered)
-            pf_str = f'{stats["profit_factor"]:.2f}' if stats['profit_factor'] < 100 else 'INF'
-            if decimals > 0:
-                label = f'{low:.{decimals}f}-{high:.{decimals}f}'
-            else:
-                label = f'{int(low):3d}-{int(high):3d}'
-            print(f'{label:15} | {stats["total"]:6d} | {stats["win_rate"]:4.0f}% | {pf_str:>4} | ${stats["net_pnl"]:>10,.0f}')
+from tools._trade_log import (
+    auto_ranges,
+    find_latest_log,
+    load_trade_log,
+    calculate_stats,
+    max_streaks,
+    print_section,
+    emit,
+    analyze_by_group,
+    analyze_by_range,
+)
 
 
 def main():
@@ -213,12 +47,12 @@ def main():
         if arg.endswith('.txt'):
             log_file = arg
         else:
-            log_file = find_latest_log(log_dir, asset_filter=arg.upper())
+            log_file = find_latest_log(log_dir, 'SEDNA_trades_', asset_filter=arg.upper())
             if not log_file:
                 print(f'No SEDNA log files found for asset "{arg}" in {log_dir}')
                 return
     else:
-        log_file = find_latest_log(log_dir)
+        log_file = find_latest_log(log_dir, 'SEDNA_trades_')
         if not log_file:
             print(f'No SEDNA log files found in {log_dir}')
             return
@@ -231,51 +65,41 @@ def main():
     print(f'Analyzing: {log_file}')
     
     # Parse trades
-    trades = parse_log(filepath)
-    print(f'Total Entries: {len(trades)}')
+    trades = load_trade_log(filepath)
+    print(f'Total Entries: {len(trades.atr)}')
     
     # Overall stats
     print_section('OVERALL STATISTICS')
     stats = calculate_stats(trades)
     if stats:
-        print(f'Total Trades:   {stats["total"]}')
-        print(f'Winners:        {stats["wins"]} ({stats["win_rate"]:.1f}%)')
-        print(f'Losers:         {stats["losses"]} ({100-stats["win_rate"]:.1f}%)')
-        print(f'Gross Profit:   ${stats["gross_profit"]:,.0f}')
-        print(f'Gross Loss:     ${stats["gross_loss"]:,.0f}')
-        print(f'Net P&L:        ${stats["net_pnl"]:,.0f}')
-        print(f'Profit Factor:  {stats["profit_factor"]:.2f}')
+        emit([
+            f'Total Trades:   {stats["total"]}',
+            f'Winners:        {stats["wins"]} ({stats["win_rate"]:.1f}%)',
+            f'Losers:         {stats["losses"]} ({100-stats["win_rate"]:.1f}%)',
+            f'Gross Profit:   ${stats["gross_profit"]:,.0f}',
+            f'Gross Loss:     ${stats["gross_loss"]:,.0f}',
+            f'Net P&L:        ${stats["net_pnl"]:,.0f}',
+            f'Profit Factor:  {stats["profit_factor"]:.2f}',
+        ])
     
     # Consecutive wins/losses
-    max_wins, max_losses = 0, 0
-    curr_wins, curr_losses = 0, 0
-    for t in trades:
-        if t.get('pnl', 0) > 0:
-            curr_wins += 1
-            max_wins = max(max_wins, curr_wins)
-            curr_losses = 0
-        elif 'pnl' in t:
-            curr_losses += 1
-            max_losses = max(max_losses, curr_losses)
-            curr_wins = 0
+    max_wins, max_losses = max_streaks(trades)
     print(f'\nMax Consecutive Wins:   {max_wins}')
     print(f'Max Consecutive Losses: {max_losses}')
     
     # ATR stats
-    atrs = [t['atr'] for t in trades]
-    winners = [t for t in trades if t.get('pnl', 0) > 0]
-    losers = [t for t in trades if t.get('pnl', 0) < 0]
-    print(f'\nATR - Min: {min(atrs):.4f}, Max: {max(atrs):.4f}, Avg: {sum(atrs)/len(atrs):.4f}')
-    if winners:
-        print(f'ATR Winners Avg: {sum(t["atr"] for t in winners)/len(winners):.4f}')
-    if losers:
-        print(f'ATR Losers Avg:  {sum(t["atr"] for t in losers)/len(losers):.4f}')
+    atrs = trades.atr
+    print(f'\nATR - Min: {atrs.min():.4f}, Max: {atrs.max():.4f}, Avg: {atrs.mean():.4f}')
+    if trades.win.any():
+        print(f'ATR Winners Avg: {atrs[trades.win].mean():.4f}')
+    if trades.loss.any():
+        print(f'ATR Losers Avg:  {atrs[trades.loss].mean():.4f}')
     
     # By Hour
     print_section('ANALYSIS BY ENTRY HOUR')
     analyze_by_group(
         trades,
-        lambda t: t['entry_time'].hour,
+        trades.hour,
         'Hour',
         lambda h: f'{h:02d}:00'
     )
@@ -285,7 +109,7 @@ def main():
     dow_names = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
     analyze_by_group(
         trades,
-        lambda t: t['entry_time'].weekday(),
+        trades.weekday,
         'Day',
         lambda d: dow_names[d]
     )
@@ -294,23 +118,22 @@ def main():
     print_section('ANALYSIS BY YEAR')
     analyze_by_group(
         trades,
-        lambda t: t['entry_time'].year,
+        trades.year,
         'Year',
         str
     )
     
     # By SL Pips ranges (auto-adaptive)
     print_section('ANALYSIS BY SL PIPS')
-    sl_values = [t['sl_pips'] for t in trades if 'sl_pips' in t]
-    sl_ranges = _auto_ranges(sl_values)
-    analyze_by_range(trades, lambda t: t['sl_pips'], sl_ranges, 'SL Pips')
+    sl_ranges = auto_ranges(trades.sl_pips)
+    analyze_by_range(trades, trades.sl_pips, sl_ranges, 'SL Pips')
     
     # By ATR ranges (auto-adaptive)
     print_section('ANALYSIS BY ATR')
-    atr_values = [t['atr'] for t in trades if 'atr' in t]
-    atr_ranges = _auto_ranges(atr_values)
-    atr_decimals = 5 if max(atr_values) < 0.01 else (4 if max(atr_values) < 0.1 else 2)
-    analyze_by_range(trades, lambda t: t['atr'], atr_ranges, 'ATR Range', decimals=atr_decimals)
+    atr_values = trades.atr
+    atr_ranges = auto_ranges(atr_values)
+    atr_decimals = 5 if atr_values.max() < 0.01 else (4 if atr_values.max() < 0.1 else 2)
+    analyze_by_range(trades, atr_values, atr_ranges, 'ATR Range', decimals=atr_decimals)
     
     print('\n' + '=' * 60)
 
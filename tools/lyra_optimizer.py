@@ -15,6 +15,10 @@ Usage:
     python tools/lyra_optimizer.py --phase entry
     python tools/lyra_optimizer.py --phase holding
     python tools/lyra_optimizer.py --index NDX        # single index only
+    python tools/lyra_optimizer.py --jobs 4           # limit worker processes
+
+Backtests are independent, so they run in a process pool (default: one
+worker per CPU); results still print in combo order.
 
 Output: logs/LYRA_optimizer_<phase>_<timestamp>.json
 """
@@ -26,6 +30,7 @@ import math
 import contextlib
 import warnings
 import itertools
+import multiprocessing
 from datetime import datetime
 from pathlib import Path
 from collections import defaultdict
@@ -210,6 +215,11 @@ def run_single_backtest(asset_name, asset_cfg, param_overrides):
         return {'error': str(e)}
 
 
+def _run_task(task):
+    """Pool entry point: one (asset_name, asset_cfg, overrides) backtest."""
+    return run_single_backtest(*task)
+
+
 def _extract_metrics(strat, cerebro):
     """Extract trades, PF, WR, DD, Sharpe, exit reasons from backtest result."""
     final_value = cerebro.broker.getvalue()
@@ -350,6 +360,7 @@ def main():
     phase_name = 'sl'
     index_filter = None
     cli_fixed = {}
+    jobs = os.cpu_count() or 1
 
     i = 1
     while i < len(sys.argv):
@@ -360,6 +371,9 @@ def main():
         elif arg == '--index' and i + 1 < len(sys.argv):
             index_filter = sys.argv[i + 1].upper()
             i += 2
+        elif arg in ('--jobs', '-j') and i + 1 < len(sys.argv):
+            jobs = max(1, int(sys.argv[i + 1]))
+            i += 2
         elif arg == '--fixed' and i + 1 < len(sys.argv):
             for pair in sys.argv[i + 1].split(','):
                 k, v = pair.split('=')
@@ -397,55 +411,66 @@ def main():
         print('Fixed overrides: %s' % ', '.join(
             '%s=%s' % (k, v) for k, v in cli_fixed.items()))
     print('Sweep: %s' % ', '.join(sweep_keys))
-    print('Combinations: %d x %d indices = %d backtests'
-          % (len(grid), len(asset_names), total_bt))
+    jobs = max(1, min(jobs, total_bt))
+    print('Combinations: %d x %d indices = %d backtests (%d worker%s)'
+          % (len(grid), len(asset_names), total_bt, jobs,
+             '' if jobs == 1 else 's'))
     print('-' * 80)
 
-    all_combos = []
-    bt_count = 0
-
-    for i, overrides in enumerate(grid):
-        label = ', '.join('%s=%s' % (k, overrides[k]) for k in sweep_keys)
-        print('\n[Combo %d/%d] %s' % (i + 1, len(grid), label))
-
-        asset_results = {}
-        for asset_name in asset_names:
-            bt_count += 1
-            asset_cfg = ASSETS[asset_name]
-
-            m = run_single_backtest(asset_name, asset_cfg, overrides)
-            asset_results[asset_name] = m
-
-            if 'error' in m:
-                print('  %-8s -> ERROR: %s' % (asset_name, m['error']))
-            else:
-                exits = m.get('exit_reasons', {})
-                regime = exits.get('REGIME_EXIT', 0)
-                sl = exits.get('PROT_STOP', 0)
-                tp = exits.get('TP_EXIT', 0)
-                time = exits.get('TIME_EXIT', 0)
-                print('  %-8s -> T=%3d PF=%5s WR=%4.1f%% DD=%5.2f%% '
-                      'PnL=$%8.0f  SL=%d TP=%d RG=%d TM=%d'
-                      % (asset_name, m['trades'], fmt_pf(m['pf']),
-                         m['wr'], m['max_dd'], m['net_pnl'],
-                         sl, tp, regime, time))
-
-        score, summary = score_combo(asset_results)
-        all_combos.append({
-            'overrides': overrides,
-            'asset_results': asset_results,
-            'score': score,
-            'summary': summary,
-        })
-
-        if summary:
-            print('  --- SCORE=%.3f | medPF=%s | profitable=%d/%d | '
-                  'meanWR=%.1f%% | worstDD=%.1f%%'
-                  % (score, fmt_pf(summary['median_pf']),
-                     summary['profitable_count'],
-                     summary['total_assets'],
-                     summary['mean_wr'],
-                     summary['worst_dd']))
+    # Every (combo, index) backtest is independent: run them all in a pool
+    # and consume the results in submission order, so the per-combo output
+    # below reads the same as a sequential run
+    tasks = [(asset_name, ASSETS[asset_name], overrides)
+             for overrides in grid for asset_name in asset_names]
+    # The pool is torn down on exit even if a worker raises or on Ctrl-C
+    with (multiprocessing.Pool(jobs) if jobs > 1
+          else contextlib.nullcontext()) as pool:
+        if pool is not None:
+            results = pool.imap(_run_task, tasks)
+        else:
+            results = map(_run_task, tasks)
+
+        all_combos = []
+
+        for i, overrides in enumerate(grid):
+            label = ', '.join('%s=%s' % (k, overrides[k]) for k in sweep_keys)
+            print('\n[Combo %d/%d] %s' % (i + 1, len(grid), label))
+
+            asset_results = {}
+            for asset_name in asset_names:
+                m = next(results)
+                asset_results[asset_name] = m
+
+                if 'error' in m:
+                    print('  %-8s -> ERROR: %s' % (asset_name, m['error']))
+                else:
+                    exits = m.get('exit_reasons', {})
+                    regime = exits.get('REGIME_EXIT', 0)
+                    sl = exits.get('PROT_STOP', 0)
+                    tp = exits.get('TP_EXIT', 0)
+                    time = exits.get('TIME_EXIT', 0)
+                    print('  %-8s -> T=%3d PF=%5s WR=%4.1f%% DD=%5.2f%% '
+                          'PnL=$%8.0f  SL=%d TP=%d RG=%d TM=%d'
+                          % (asset_name, m['trades'], fmt_pf(m['pf']),
+                             m['wr'], m['max_dd'], m['net_pnl'],
+                             sl, tp, regime, time))
+
+            score, summary = score_combo(asset_results)
+            all_combos.append({
+                'overrides': overrides,
+                'asset_results': asset_results,
+                'score': score,
+                'summary': summary,
+            })
+
+            if summary:
+                print('  --- SCORE=%.3f | medPF=%s | profitable=%d/%d | '
+                      'meanWR=%.1f%% | worstDD=%.1f%%'
+                      % (score, fmt_pf(summary['median_pf']),
+                         summary['profitable_count'],
+                         summary['total_assets'],
+                         summary['mean_wr'],
+                         summary['worst_dd']))
 
     # Sort by score descending
     all_combos.sort(key=lambda x: x['score'], reverse=True)
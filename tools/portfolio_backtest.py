@@ -15,11 +15,14 @@ Usage:
     python tools/portfolio_backtest.py -p -q --from-date 2025-12-01 --to-date 2026-02-14  # Walk-forward
     python tools/portfolio_backtest.py --vega -p -q                  # VEGA portfolio (from settings_vega)
     python tools/portfolio_backtest.py --vega -p -q --from-date 2024-01-01 --to-date 2026-04-11  # VEGA walk-forward
+    python tools/portfolio_backtest.py -p -q -j 4         # 4 configs at a time (one process each)
 """
 import sys
 import os
 import argparse
+import contextlib
 import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 from collections import defaultdict
 from pathlib import Path
@@ -39,7 +42,7 @@ from strategies.sedna_strategy import SEDNAStrategy
 from strategies.gemini_strategy import GEMINIStrategy
 from strategies.luyten_strategy import LUYTENStrategy
 from strategies.vega_strategy import VEGAStrategy
-from lib.commission import ForexCommission, ETFCommission, CFDIndexCommission, ETFCSVData
+from lib.commission import ForexCommission, ETFCommission, CFDIndexCommission, ETFCSVData, ForexCSVData
 
 # Optional: VEGA private settings (gitignored)
 try:
@@ -188,7 +191,7 @@ def run_single_backtest(config_name, config, silent=False, use_portfolio=False,
     else:
         feed_kwargs['timeframe'] = bt.TimeFrame.Minutes
         feed_kwargs['compression'] = 5
-        data = bt.feeds.GenericCSVData(**feed_kwargs)
+        data = ForexCSVData(**feed_kwargs)
     
     # Get params early (needed for resampling decisions)
     params = config.get('params', {}).copy()
@@ -229,7 +232,7 @@ def run_single_backtest(config_name, config, silent=False, use_portfolio=False,
         else:
             ref_kwargs['timeframe'] = bt.TimeFrame.Minutes
             ref_kwargs['compression'] = 5
-            ref_data = bt.feeds.GenericCSVData(**ref_kwargs)
+            ref_data = ForexCSVData(**ref_kwargs)
         
         # Resample reference if requested (VEGA: M5->H4)
         resample_ref = params.get('resample_reference_minutes')
@@ -394,6 +397,33 @@ def run_single_backtest(config_name, config, silent=False, use_portfolio=False,
     }
 
 
+def run_config(name, cfg, quiet=False, **kwargs):
+    """Run one config with the per-config banner/summary; None on error."""
+    if not quiet:
+        print(f"\n{'-'*80}")
+        print(f"  Running: {name}")
+        print(f"{'-'*80}")
+    
+    try:
+        result = run_single_backtest(name, cfg, silent=quiet, **kwargs)
+        if not quiet:
+            print_config_summary(result)
+        return result
+    except Exception as e:
+        print(f"  ERROR running {name}: {e}")
+        import traceback
+        traceback.print_exc(file=sys.stdout)
+        return None
+
+
+def _run_config_captured(name, cfg, quiet, kwargs):
+    """Worker entry point: run_config with its output captured as text."""
+    buffer = StringIO()
+    with contextlib.redirect_stdout(buffer):
+        result = run_config(name, cfg, quiet=quiet, **kwargs)
+    return result, buffer.getvalue()
+
+
 def print_config_summary(result):
     """Print summary for a single config."""
     print(f"\n{'='*70}")
@@ -571,6 +601,7 @@ Examples:
   python tools/portfolio_backtest.py --assets USDJPY EURJPY DIA
   python tools/portfolio_backtest.py --exclude TLT_KOI TLT_PRO
   python tools/portfolio_backtest.py --vega -p -q              # VEGA portfolio
+  python tools/portfolio_backtest.py -p -q -j 1          # Sequential, live output
         """
     )
     
@@ -596,6 +627,8 @@ Examples:
                         help='Override end date for all configs (e.g., 2026-02-14)')
     parser.add_argument('--vega', action='store_true',
                         help='Run VEGA portfolio from config/settings_vega.py')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='Worker processes, one config each (default: CPU count)')
     
     args = parser.parse_args()
     
@@ -692,30 +725,40 @@ Examples:
             print(f"    . {name} ({cfg['asset_name']} - {cfg['strategy_name']})")
     
     # Run backtests
-    results = []
-    for name in sorted(configs_to_run.keys()):
-        cfg = configs_to_run[name]
-        
-        if not args.quiet:
-            print(f"\n{'-'*80}")
-            print(f"  Running: {name}")
-            print(f"{'-'*80}")
+    names = sorted(configs_to_run.keys())
+    run_kwargs = dict(use_portfolio=args.portfolio, from_date=date_from,
+                      to_date=date_to, vega_mode=vega_mode)
+    jobs = min(args.jobs or os.cpu_count() or 1, len(names))
+    
+    if jobs == 1:
+        results = [run_config(name, configs_to_run[name], quiet=args.quiet, **run_kwargs)
+                   for name in names]
+    else:
+        # Each config is an independent cerebro run: one process per config,
+        # output captured in the worker and replayed below in config order
+        print(f"\n  Running {len(names)} configs with {jobs} worker(s)")
+        outcomes = {}
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {
+                executor.submit(_run_config_captured, name, configs_to_run[name],
+                                args.quiet, run_kwargs): name
+                for name in names
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                name = futures[future]
+                try:
+                    outcomes[name] = future.result()
+                except Exception as e:
+                    # Worker died (e.g. result not picklable) - report like a failed run
+                    outcomes[name] = (None, f"  ERROR running {name}: {e}\n")
+                print(f"  [{done}/{len(names)}] {name} done", flush=True)
         
-        try:
-            result = run_single_backtest(name, cfg, silent=args.quiet,
-                                         use_portfolio=args.portfolio,
-                                         from_date=date_from,
-                                         to_date=date_to,
-                                         vega_mode=vega_mode)
+        results = []
+        for name in names:
+            result, output = outcomes[name]
+            sys.stdout.write(output)
             results.append(result)
-            
-            if not args.quiet:
-                print_config_summary(result)
-                
-        except Exception as e:
-            print(f"  ERROR running {name}: {e}")
-            import traceback
-            traceback.print_exc()
+    results = [r for r in results if r is not None]
     
     # Print combined summary
     print_portfolio_summary(results)